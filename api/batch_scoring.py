@@ -0,0 +1,288 @@
+import time
+
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+from api.recommendation import (
+    Compound,
+    Condition,
+    Product,
+    COMPOUND_REGISTRY,
+    compound_trait,
+    calculate_thermal_availability,
+    empty_match,
+    get_thermal_safety_zone,
+    product_vector,
+    TRAIT_COGNITIVE,
+    TRAIT_SOMATIC,
+    TRAIT_ANXIETY,
+    TRAIT_CANNFLAVIN,
+    CANNFLAVIN_BONUS_STYLES,
+)
+from api.metrics import STAGE_THERMAL, StageTimings
+from api.condition_classifier import (
+    classify_conditions,
+    PROFILE_RECREATIONAL,
+    PROFILE_COGNITIVE,
+    PROFILE_SOMATIC,
+    PROFILE_ANXIETY,
+    PROFILE_CANNFLAVIN_TARGET,
+)
+
+
+def build_compound_matrix(products: List[Product]) -> Dict[str, Any]:
+    """
+    Flatten a product list into a products × compounds matrix in coordinate form.
+    One (row, col, val) triple per compound entry, in request order; columns are the
+    distinct compound names of the request. Keeping entries (rather than merging
+    duplicates) lets row reductions accumulate in exactly the per-product order.
+    """
+    vocab: Dict[str, int] = {}
+    grows: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    vals: List[float] = []
+    grow_idx = np.zeros(len(products), dtype=np.intp)
+
+    for i, product in enumerate(products):
+        grow_idx[i] = grows.setdefault(product.growStyle, len(grows))
+        vector = product_vector(product)
+        for name, val in zip(vector.names, vector.vals):
+            rows.append(i)
+            cols.append(vocab.setdefault(name, len(vocab)))
+            vals.append(val)
+
+    names = list(vocab)
+    row_arr = np.asarray(rows, dtype=np.intp)
+    col_arr = np.asarray(cols, dtype=np.intp)
+    val_arr = np.asarray(vals, dtype=np.float64)
+    is_thc = np.array([COMPOUND_REGISTRY.canonical(n) == 'THC' for n in names], dtype=bool)
+
+    # THC uses the last THC entry of each product (dict semantics of the scalar engine)
+    thc = np.zeros(len(products))
+    thc_entries = np.nonzero(is_thc[col_arr])[0] if len(col_arr) else np.zeros(0, dtype=np.intp)
+    if len(thc_entries):
+        last_rows, first_rev = np.unique(row_arr[thc_entries][::-1], return_index=True)
+        thc[last_rows] = val_arr[thc_entries][::-1][first_rev]
+
+    return {
+        "shape": (len(products), len(names)),
+        "names": names,
+        "grow_styles": list(grows),
+        "grow_idx": grow_idx,
+        "rows": row_arr,
+        "cols": col_arr,
+        "vals": val_arr,
+        "is_thc": is_thc,
+        "thc": thc,
+    }
+
+
+def _row_sum(matrix: Dict[str, Any], weights: np.ndarray) -> np.ndarray:
+    """Sum per-entry weights into their product rows, sequentially in entry order."""
+    return np.bincount(matrix["rows"], weights=weights, minlength=matrix["shape"][0])
+
+
+def _entourage_table(max_active: int) -> List[float]:
+    """Entourage multipliers indexed by active-compound count (see calculate_entourage_effect)."""
+    return [round(1.0 + (n - 1) * 0.1, 2) if n >= 2 else 1.0 for n in range(max_active + 1)]
+
+
+def score_products_vectorized(conditions: List[Condition], products: List[Product], temp_f: float,
+                              profiles: Optional[List[int]] = None,
+                              dedupe_warnings: bool = True,
+                              timings: Optional[StageTimings] = None) -> List[Dict[str, Any]]:
+    """
+    Batch equivalent of calculate_quantum_match for a whole product list.
+    Thermal availability, cultivation modifiers, profile signals, penalties and
+    the entourage multiplier are evaluated as array operations over the
+    products × compounds matrix. Returns one analysis dict per product, in order,
+    matching the per-product engine's output.
+    With dedupe_warnings=False warnings are left in raw insertion order, for
+    callers that dedupe them in another process (set order is per-process).
+    The thermal availability step is added to `timings`, when given.
+    """
+    if not products:
+        return []
+
+    if not conditions:
+        return [empty_match(temp_f) for _ in products]
+
+    matrix = build_compound_matrix(products)
+    names = matrix["names"]
+    cols = matrix["cols"]
+    vals = matrix["vals"]
+    thc = matrix["thc"]
+
+    # 1. Per-compound traits and thermal availability (once per distinct name)
+    traits = [[compound_trait(n, grow) for n in names] for grow in matrix["grow_styles"]]
+    flags = np.array([flag for _, flag, _ in traits[0]], dtype=np.intp)
+
+    started = time.perf_counter()
+    thermal_data = calculate_thermal_availability([Compound(name=n, val=0.0) for n in names], temp_f)
+    details = thermal_data["details"]
+    avail = np.array([thermal_data["availability"][n] for n in names], dtype=np.float64)
+    entry_avail = avail[cols]
+    if timings is not None:
+        timings.add(STAGE_THERMAL, time.perf_counter() - started)
+
+    # 2. Cultivation modifiers: one multiplier row per distinct grow style
+    modifiers = np.array([
+        [factor for _, _, factor in grow_traits] for grow_traits in traits
+    ], dtype=np.float64).reshape(len(matrix["grow_styles"]), len(names))
+    weighted = vals * modifiers[matrix["grow_idx"][matrix["rows"]], cols] * entry_avail
+
+    cognitive_mask = ((flags & TRAIT_COGNITIVE) > 0).astype(np.float64)
+    somatic_mask = ((flags & TRAIT_SOMATIC) > 0).astype(np.float64)
+    anxiety_mask = ((flags & TRAIT_ANXIETY) > 0).astype(np.float64)
+    cannflavin_mask = (flags & TRAIT_CANNFLAVIN) > 0
+    entry_cannflavin = cannflavin_mask[cols]
+
+    cognitive_signal = _row_sum(matrix, weighted * cognitive_mask[cols])
+    somatic_signal = _row_sum(matrix, weighted * somatic_mask[cols])
+    anxiety_signal = _row_sum(matrix, weighted * anxiety_mask[cols])
+    general_signal = _row_sum(matrix, weighted) * 3
+
+    # Cannflavin A research check (raw value, not cultivation-modified), folded into
+    # the somatic signal entry by entry so accumulation order matches the scalar loop
+    somatic_cannflavin_signal = _row_sum(matrix, np.where(entry_cannflavin, vals * entry_avail * 5.0,
+                                                          weighted * somatic_mask[cols]))
+    has_cannflavin = _row_sum(matrix, entry_cannflavin.astype(np.float64)) > 0
+    cannflavin_active = _row_sum(matrix, (entry_cannflavin & (entry_avail > 0)).astype(np.float64)) > 0
+    soil_grown = np.array(
+        [g.lower() in CANNFLAVIN_BONUS_STYLES for g in matrix["grow_styles"]], dtype=bool
+    )[matrix["grow_idx"]]
+
+    # 3. Condition-independent gates: thermal lock and entourage synergy
+    locked = _row_sum(matrix, ((vals > 0.5) & (entry_avail < 0.5)).astype(np.float64)) > 0
+    thermal_mult = np.where(locked, 0.8, 1.0)
+    active_count = _row_sum(matrix, (entry_avail > 0.5).astype(np.float64)).astype(np.intp)
+    entourage_mult = np.asarray(_entourage_table(int(active_count.max(initial=0))))[active_count]
+
+    # 4. Per-condition scores as product vectors
+    total_score = np.zeros(len(products))
+    total_weight = 0.0
+    per_condition = []
+    if profiles is None:
+        profiles = classify_conditions(conditions)
+
+    for condition, profile in zip(conditions, profiles):
+        severity = condition.severity
+
+        if profile & PROFILE_RECREATIONAL:
+            total_score = total_score + 100.0 * severity
+            total_weight += severity
+            per_condition.append({"condition": condition, "mode": "recreational"})
+            continue
+
+        entry = {"condition": condition, "mode": "integrated_clinical"}
+        applicable = []
+
+        if profile & PROFILE_COGNITIVE:
+            applicable.append(cognitive_signal * 40 - np.maximum(0, (thc - 10) * 3.0))
+            entry["cognitive"] = True
+
+        if profile & PROFILE_SOMATIC:
+            signal = somatic_signal
+            boost = np.ones(len(products))
+            if profile & PROFILE_CANNFLAVIN_TARGET:
+                signal = somatic_cannflavin_signal
+                boost = np.where(cannflavin_active, 30.0, 1.0)
+                entry["cannflavin"] = True
+            f_bonus = np.where(soil_grown & (boost > 1.0), 1.3, 1.0)
+            applicable.append(((signal * 8) + (thc * 1.2)) * f_bonus * boost)
+            entry["somatic"] = (signal, boost)
+
+        if profile & PROFILE_ANXIETY:
+            applicable.append(anxiety_signal * 15 - np.maximum(0, (thc - 5) * 2.0))
+            entry["anxiety"] = True
+
+        if not applicable:
+            condition_score = general_signal
+            entry["mode"] = "general_wellness"
+        else:
+            condition_score = applicable[0]
+            for score in applicable[1:]:
+                condition_score = condition_score + score
+            condition_score = condition_score / len(applicable)
+
+        condition_score = condition_score * thermal_mult * entourage_mult
+        entry["score"] = condition_score.tolist()
+        per_condition.append(entry)
+
+        total_score = total_score + condition_score * severity
+        total_weight += severity
+
+    non_thc_total = _row_sum(matrix, np.where(matrix["is_thc"][cols], 0.0, vals)).tolist()
+
+    # 5. Assemble per-product result packages
+    safety = get_thermal_safety_zone(temp_f)
+    thc_list = thc.tolist()
+    total_list = total_score.tolist()
+    cognitive_list = cognitive_signal.tolist()
+    anxiety_list = anxiety_signal.tolist()
+    has_cannflavin_list = has_cannflavin.tolist()
+    cannflavin_names = {n for n, is_cannflavin in zip(names, cannflavin_mask.tolist()) if is_cannflavin}
+    for entry in per_condition:
+        if "somatic" in entry:
+            signal, boost = entry["somatic"]
+            entry["somatic"] = (signal.tolist(), boost.tolist())
+
+    results = []
+    for i, product in enumerate(products):
+        if not product.compounds:
+            results.append(empty_match(temp_f))
+            continue
+
+        p_thc = thc_list[i]
+        warnings = list(safety["warnings"])
+        breakdown = {}
+        for entry in per_condition:
+            condition = entry["condition"]
+            if entry["mode"] == "recreational":
+                breakdown[condition.name] = {"score": 100.0, "mode": "recreational"}
+                continue
+
+            profile_details = {}
+            if "cognitive" in entry:
+                penalty = max(0, (p_thc - 10) * 3.0)
+                profile_details["cognitive"] = {"signal": round(cognitive_list[i], 2), "penalty": round(penalty, 1)}
+                if p_thc > 20:
+                    warnings.append(f"⚠️ High THC ({p_thc}%) may impair focus for {condition.name}")
+            if "somatic" in entry:
+                signal, boost = entry["somatic"]
+                if "cannflavin" in entry and has_cannflavin_list[i]:
+                    for name in product_vector(product).names:
+                        if name not in cannflavin_names:
+                            continue
+                        if thermal_data["availability"][name] > 0:
+                            warnings.append(f"✓ Cannflavin A active (30x potency) for {condition.name}")
+                        else:
+                            bp = details.get(name, {}).get("boiling_point_f", 0)
+                            warnings.append(f"🔒 Cannflavin A locked (needs {bp}°F) for {condition.name}")
+                profile_details["somatic"] = {"signal": round(signal[i], 2), "boost": boost[i]}
+            if "anxiety" in entry:
+                penalty = max(0, (p_thc - 5) * 2.0)
+                profile_details["anxiety"] = {"signal": round(anxiety_list[i], 2), "penalty": round(penalty, 1)}
+                if p_thc > 15:
+                    warnings.append(f"⚠️ High THC ({p_thc}%) may exacerbate anxiety for {condition.name}")
+
+            profile_details["mode"] = entry["mode"]
+            profile_details["score"] = round(entry["score"][i], 1)
+            breakdown[condition.name] = profile_details
+
+        final_score = round(min(100.0, max(0.0, total_list[i] / total_weight)), 1) if total_weight > 0 else 0.0
+
+        if p_thc > 25 and non_thc_total[i] < 2.0:
+            warnings.append("⚠️ MARKET REALITY: High THC, low therapeutic compound profile")
+
+        results.append({
+            "score": final_score,
+            "breakdown": breakdown,
+            "warnings": list(set(warnings)) if dedupe_warnings else warnings,
+            "thermal_details": {name: details[name] for name in product_vector(product).names},
+            "safety_zone": safety,
+            "cultivation_modifiers_applied": True
+        })
+
+    return results
@@ -0,0 +1,97 @@
+import json
+from array import array
+from typing import List
+
+from fastapi import APIRouter, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from typing_extensions import TypedDict
+
+from api.fast_json import FastJSONResponse
+from api.recommendation import (
+    CompoundList,
+    Product,
+    RecommendationRequest,
+    EXECUTOR,
+    respond_cached,
+    respond_recommendations,
+)
+
+router = APIRouter(prefix="/api/v1")
+
+
+class CompoundRecord(TypedDict):
+    name: str
+    val: float
+
+
+class ProductRecord(TypedDict):
+    name: str
+    growStyle: str
+    compounds: List[CompoundRecord]
+
+
+class BulkRecommendationRequest(RecommendationRequest):
+    """
+    /recommend body validated into plain records instead of Product and
+    Compound models. Same fields, types and coercions as RecommendationRequest;
+    the schema is compiled once with the class.
+    """
+    product_list: List[ProductRecord]
+
+
+def compact_product(record: ProductRecord) -> Product:
+    """Product whose compounds stay packed (a CompoundList) until something reads them."""
+    compounds = record["compounds"]
+    return Product.model_construct(
+        name=record["name"],
+        growStyle=record["growStyle"],
+        compounds=CompoundList(tuple(c["name"] for c in compounds), array('d', [c["val"] for c in compounds])),
+    )
+
+
+def parse_bulk_request(body: bytes) -> RecommendationRequest:
+    """
+    Validate a raw /recommend body in one pass (JSON parsing included) and
+    build the request around compact products (blocking; run via EXECUTOR).
+    Raises pydantic.ValidationError when the body does not validate.
+    """
+    parsed = BulkRecommendationRequest.model_validate_json(body)
+    fields = dict(parsed)
+    fields["product_list"] = [compact_product(record) for record in parsed.product_list]
+    return RecommendationRequest.model_construct(**fields)
+
+
+def parse_standard_request(body: bytes) -> RecommendationRequest:
+    """/recommend's own parsing (json.loads, then model validation), raising the same RequestValidationError."""
+    try:
+        content = json.loads(body) if body else None
+    except json.JSONDecodeError as exc:
+        raise RequestValidationError([{"type": "json_invalid", "loc": ("body", exc.pos), "msg": "JSON decode error",
+                                       "input": {}, "ctx": {"error": exc.msg}}])
+    if content is None:
+        raise RequestValidationError([{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}])
+    try:
+        return RecommendationRequest.model_validate(content, from_attributes=True)
+    except ValidationError as exc:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])}
+                                      for error in exc.errors(include_url=False)])
+
+
+# The body is read raw, so its schema is declared by hand (same as /recommend)
+BULK_OPENAPI = {"requestBody": {"required": True, "content": {"application/json": {
+    "schema": RecommendationRequest.model_json_schema(ref_template="#/components/schemas/{model}")}}}}
+
+
+@router.post("/recommend/bulk", openapi_extra=BULK_OPENAPI)
+async def recommend_bulk(request: Request):
+    """/recommend for large inventories: single-pass validation and a faster encoder, same response bytes."""
+    body = await request.body()
+    try:
+        data = await EXECUTOR.run(parse_bulk_request, body)
+    except ValidationError:
+        # Rare path: let the standard parser decide, so its 422 (or acceptance) is matched exactly
+        data = await EXECUTOR.run(parse_standard_request, body)
+    if data.stream:
+        return await respond_recommendations(data)
+    return await respond_cached(data, request, FastJSONResponse)
@@ -0,0 +1,175 @@
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from api.recommendation import (
+    Compound,
+    Product,
+    RecommendationRequest,
+    DB_POOL,
+    EXECUTOR,
+    COMPOUND_REGISTRY,
+    CATALOG_COLUMNS,
+    catalog_row_to_compounds,
+    respond_recommendations,
+    validate_recommendation_request,
+)
+
+router = APIRouter(prefix="/api/v1")
+
+
+class CatalogRecommendationRequest(BaseModel):
+    user_profile: Dict[str, Any]
+    grow_styles: Optional[List[str]] = None  # Only these grow styles (case-insensitive)
+    archetypes: Optional[List[str]] = None  # Only these archetypes (case-insensitive)
+    scoring_mode: str = "standard"  # Also "materialized": rank from the precomputed score table
+    top_k: Optional[int] = None
+    cursor: Optional[str] = None
+    stream: bool = False
+    include_summary: bool = True
+
+
+def load_catalog_rows() -> List[tuple]:
+    """Every product_catalog row in a stable order (strain, grow style)."""
+    conn = DB_POOL.connection()
+    if conn is None:
+        return []
+    try:
+        return conn.execute(
+            f"SELECT {CATALOG_COLUMNS} FROM product_catalog ORDER BY strain_name, grow_style"
+        ).fetchall()
+    except sqlite3.Error:
+        return []
+
+
+class ProductCatalog:
+    """
+    Columnar in-memory copy of product_catalog.
+
+    Each column is a parallel list indexed by catalog position, and the
+    Product models are built once per load, so requests skip both SQLite and
+    Pydantic parsing. Grow style and archetype are indexed (lowercased) to
+    the positions holding them; filters within a field are OR'ed and fields
+    are AND'ed, and results keep catalog order.
+
+    The catalog is reloaded when `signature` changes (polled at most once per
+    check_interval seconds); a reload builds a new column set and swaps it in
+    whole.
+    """
+
+    def __init__(self, loader: Callable[[], List[tuple]], signature: Callable[[], Any],
+                 check_interval: float = 0.0):
+        self._loader = loader
+        self._signature = signature
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._source_sig = None
+        self._checked_at = None
+        self._loaded = False
+        self._columns: Dict[str, Any] = self._empty_columns()
+
+    @staticmethod
+    def _empty_columns() -> Dict[str, Any]:
+        return {"strain_name": [], "grow_style": [], "archetype": [], "vsc_present": [], "product": [],
+                "by_grow_style": {}, "by_archetype": {}}
+
+    def _build(self, rows: List[tuple]) -> Dict[str, Any]:
+        columns = self._empty_columns()
+        for row in rows:
+            try:
+                compounds = [Compound(**c) for c in catalog_row_to_compounds(row)]
+            except TypeError:
+                continue  # NULL chemotype values
+            index = len(columns["product"])
+            columns["strain_name"].append(row[0])
+            columns["grow_style"].append(row[1])
+            columns["archetype"].append(row[2])
+            columns["vsc_present"].append(bool(row[15]))
+            columns["product"].append(Product(name=row[0], growStyle=row[1], compounds=compounds))
+            columns["by_grow_style"].setdefault(str(row[1]).lower(), []).append(index)
+            columns["by_archetype"].setdefault(str(row[2]).lower(), []).append(index)
+        return columns
+
+    @property
+    def columns(self) -> Dict[str, Any]:
+        """Current column snapshot; treat as read-only."""
+        self.refresh()
+        return self._columns
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload if the source changed; returns True when the catalog was rebuilt."""
+        now = time.monotonic()
+        if not force and self._loaded and self._checked_at is not None \
+                and now - self._checked_at < self._check_interval:
+            return False
+
+        with self._lock:
+            self._checked_at = now
+            sig = self._signature()
+            if not force and self._loaded and sig == self._source_sig:
+                return False
+            self._columns = self._build(self._loader())
+            self._source_sig = sig
+            self._loaded = True
+        return True
+
+    @staticmethod
+    def _matching(index: Dict[str, List[int]], values: Optional[List[str]]) -> Optional[set]:
+        if values is None:
+            return None
+        positions = set()
+        for value in values:
+            positions.update(index.get(value.lower(), ()))
+        return positions
+
+    def select(self, grow_styles: Optional[List[str]] = None,
+               archetypes: Optional[List[str]] = None) -> List[Product]:
+        """Catalog products matching the filters, in catalog order."""
+        columns = self.columns
+        selected = None
+        for positions in (self._matching(columns["by_grow_style"], grow_styles),
+                          self._matching(columns["by_archetype"], archetypes)):
+            if positions is not None:
+                selected = positions if selected is None else selected & positions
+        if selected is None:
+            return columns["product"]
+        return [columns["product"][i] for i in sorted(selected)]
+
+    def __len__(self) -> int:
+        return len(self._columns["product"])
+
+
+# Reloaded whenever the compound registry sees the database change
+PRODUCT_CATALOG = ProductCatalog(load_catalog_rows, lambda: COMPOUND_REGISTRY.source_signature)
+
+
+@router.post("/recommend/catalog")
+async def recommend_from_catalog(data: CatalogRecommendationRequest):
+    """Score the stored Phase 1 catalog (optionally filtered) for a user profile."""
+    products = await EXECUTOR.run(PRODUCT_CATALOG.select, data.grow_styles, data.archetypes)
+    if not len(PRODUCT_CATALOG):
+        return {"error": "Product catalog is empty", "results": []}
+
+    materialized = data.scoring_mode == "materialized"
+    request = RecommendationRequest.model_construct(
+        user_profile=data.user_profile,
+        product_list=products,
+        scoring_mode="standard" if materialized else data.scoring_mode,
+        top_k=data.top_k,
+        cursor=data.cursor,
+        stream=data.stream,
+        include_summary=data.include_summary,
+    )
+    if materialized:
+        error = validate_recommendation_request(request)
+        if not error and data.stream:
+            error = "stream is not supported with materialized scoring"
+        if error:
+            return {"error": error, "results": []}
+        from api.materialized_scores import build_materialized_recommendations
+        return await EXECUTOR.run(build_materialized_recommendations, request)
+    return await respond_recommendations(request)
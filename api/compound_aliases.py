@@ -0,0 +1,78 @@
+import re
+import unicodedata
+from typing import Dict, Iterable, Optional
+
+# Optional table of extra aliases (alias TEXT PRIMARY KEY, canonical TEXT)
+ALIAS_TABLE = "compound_aliases"
+
+# Spellings used by the catalog, the dashboard pick lists and the research notes,
+# mapped to the compound-table name they stand for
+DEFAULT_COMPOUND_ALIASES = {
+    "Pinene": "Alpha-Pinene",
+    "α-Pinene": "Alpha-Pinene",
+    "a-Pinene": "Alpha-Pinene",
+    "β-Caryophyllene": "Caryophyllene",
+    "Beta-Caryophyllene": "Caryophyllene",
+    "b-Caryophyllene": "Caryophyllene",
+    "BCP": "Caryophyllene",
+    "β-Myrcene": "Myrcene",
+    "Beta-Myrcene": "Myrcene",
+    "D-Limonene": "Limonene",
+    "α-Humulene": "Humulene",
+    "Alpha-Humulene": "Humulene",
+    "β-Ocimene": "Ocimene",
+    "Δ9-THC": "THC",
+    "Delta-9-THC": "THC",
+    "D9-THC": "THC",
+    "Tetrahydrocannabinol": "THC",
+    "Cannabidiol": "CBD",
+    "Cannabinol": "CBN",
+    "Cannabigerol": "CBG",
+    "Cannabichromene": "CBC",
+    "Tetrahydrocannabivarin": "THCV",
+    "Tetrahydrocannabiphorol": "THCP",
+}
+
+# Spaces, underscores and hyphen/dash variants all compare as one hyphen
+_SEPARATORS = re.compile(r"[\s_\-‐-―]+")
+
+
+def alias_key(name: str) -> str:
+    """Spelling-insensitive form of a compound name (NFKC, casefolded, separators folded)."""
+    return _SEPARATORS.sub("-", unicodedata.normalize("NFKC", name).casefold()).strip("-")
+
+
+class AliasIndex:
+    """
+    Hash index from alias_key(spelling) to a canonical compound key (the
+    uppercased compound-table name, as used by the registry and THERMAL_LUT).
+
+    Built once per registry snapshot. Precedence, lowest first: the given
+    default aliases, the compound names themselves, then `overrides` (rows of
+    the optional alias table). Names the index does not know keep their
+    uppercased spelling, so unknown compounds behave as before.
+    """
+
+    def __init__(self, aliases: Dict[str, str], names: Iterable[str] = (),
+                 overrides: Optional[Dict[str, str]] = None):
+        index: Dict[str, str] = {}
+        for alias, canonical in aliases.items():
+            index[alias_key(alias)] = canonical.upper()
+        for name in names:
+            index[alias_key(name)] = name.upper()
+        for alias, canonical in (overrides or {}).items():
+            index[alias_key(alias)] = canonical.upper()
+        # Follow chains (β-Ocimene → Ocimene → an override's target); cycles stop where they close
+        for key, target in index.items():
+            seen = {key}
+            while alias_key(target) in index and alias_key(target) not in seen:
+                seen.add(alias_key(target))
+                target = index[alias_key(target)]
+            index[key] = target
+        self._index = index
+
+    def canonical(self, name: str) -> str:
+        return self._index.get(alias_key(name), name.upper())
+
+    def __len__(self) -> int:
+        return len(self._index)
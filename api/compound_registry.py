@@ -0,0 +1,314 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+
+from api.cache import LRUCache
+from api.compound_aliases import AliasIndex
+from api.db_pool import ConnectionPool
+
+RowMapper = Callable[[tuple, List[str], str], Dict[str, Any]]
+
+# Keep IN (...) lists well under SQLITE_MAX_VARIABLE_NUMBER on older builds
+IN_QUERY_CHUNK = 500
+# Distinct compound spellings given integer IDs (request data is unbounded)
+MAX_INTERNED_NAMES = 65536
+# Spellings whose canonical key is memoized per snapshot
+CANONICAL_MEMO_SIZE = 65536
+
+
+class CompoundRegistry:
+    """
+    In-memory snapshot of every compound table, bulk-loaded in one pass.
+
+    Compounds are keyed by uppercased name; when a name appears in several
+    tables the first table in `tables` wins (same priority as a per-name scan).
+    A change marker built from the DB file stats (main file and WAL) and
+    `PRAGMA data_version` is polled at most once per check_interval seconds.
+    When it moves, a new snapshot is built off to the side and swapped in
+    atomically, and `version` is bumped so dependants can rebuild.
+
+    With preload=False (very large compound databases) nothing is loaded up
+    front: names are resolved on demand with one batched IN query per table,
+    found compounds are kept, and names confirmed absent go to a bounded
+    negative cache so repeat unknowns never reach SQLite. The version is also
+    bumped whenever on-demand resolution adds compounds.
+
+    Callbacks registered with add_reload_listener() run after every reload so
+    dependent caches can invalidate. Loads use `pool` connections when given.
+
+    canonical() maps any spelling of a compound (case, Unicode form,
+    separators, known aliases and synonyms) to one key through an AliasIndex
+    rebuilt with each snapshot; every lookup goes through it, so all
+    spellings share one cache entry and one database lookup. Aliases come
+    from `aliases` and, when present, the `alias_table` database table. In
+    on-demand mode only the tables' name column is read for the index.
+
+    intern() maps compound names (exact spelling) to small integer IDs that
+    stay valid for the life of the process, independent of reloads, so
+    hot loops can index per-compound tables instead of hashing names.
+    """
+
+    def __init__(self, db_path: str, tables: List[Tuple[str, str]], row_to_data: RowMapper,
+                 check_interval: float = 1.0, preload: bool = True, negative_cache_size: int = 4096,
+                 negative_cache_ttl: Optional[float] = None, pool: Optional[ConnectionPool] = None,
+                 aliases: Optional[Dict[str, str]] = None, alias_table: Optional[str] = None):
+        self.db_path = db_path
+        self._pool = pool
+        self._tables = tables
+        self._row_to_data = row_to_data
+        self._check_interval = check_interval
+        self.preload = preload
+        self.negative_cache = LRUCache(negative_cache_size, negative_cache_ttl, name="compound_negative")
+        self._listeners: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._compounds: Optional[Dict[str, Dict[str, Any]]] = None
+        self._version = 0
+        self._source_sig = None
+        self._checked_at = None
+        self._watch_conn: Optional[sqlite3.Connection] = None
+        self._watch_ino = None
+        self._aliases = aliases or {}
+        self._alias_table = alias_table
+        self._alias_index = AliasIndex(self._aliases)
+        self._canonical_memo: Dict[str, str] = {}
+        self._intern_lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._id_names: List[str] = []
+
+    def _data_version(self, ino) -> Optional[int]:
+        """PRAGMA data_version from a long-lived watch connection (reopened if the file is replaced)."""
+        try:
+            if self._watch_conn is None or ino != self._watch_ino:
+                if self._watch_conn is not None:
+                    self._watch_conn.close()
+                self._watch_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._watch_ino = ino
+            return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            self._watch_conn = None
+            return None
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        try:
+            wal = os.stat(self.db_path + "-wal")
+            wal_sig = (wal.st_mtime_ns, wal.st_size)
+        except OSError:
+            wal_sig = None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size, wal_sig, self._data_version(stat.st_ino))
+
+    def _load(self, names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Read every compound, or only `names` (batched IN query per table)."""
+        compounds: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.db_path):
+            return compounds
+
+        conn = None
+        try:
+            conn = self._pool.connection() if self._pool else sqlite3.connect(self.db_path)
+            if conn is None:
+                return compounds
+            cursor = conn.cursor()
+            for table, c_type in self._tables:
+                try:
+                    # Dynamically fetch columns to handle schema variations
+                    cursor.execute(f"PRAGMA table_info({table})")
+                    cols = [c[1] for c in cursor.fetchall()]
+                    if names is None:
+                        cursor.execute(f"SELECT * FROM {table}")
+                        rows = cursor.fetchall()
+                    else:
+                        rows = []
+                        for i in range(0, len(names), IN_QUERY_CHUNK):
+                            chunk = names[i:i + IN_QUERY_CHUNK]
+                            placeholders = ",".join("?" * len(chunk))
+                            cursor.execute(
+                                f"SELECT * FROM {table} WHERE name COLLATE NOCASE IN ({placeholders})", chunk
+                            )
+                            rows.extend(cursor.fetchall())
+                except sqlite3.Error:
+                    continue
+                for row in rows:
+                    try:
+                        data = self._row_to_data(row, cols, c_type)
+                    except (TypeError, ValueError):
+                        continue
+                    compounds.setdefault(str(row[0]).upper(), data)
+            return compounds
+        finally:
+            if conn and not self._pool:
+                conn.close()
+
+    def _load_names(self) -> List[str]:
+        """Every compound name (without its row), for the alias index in on-demand mode."""
+        if not os.path.exists(self.db_path):
+            return []
+        conn = None
+        try:
+            conn = self._pool.connection() if self._pool else sqlite3.connect(self.db_path)
+            if conn is None:
+                return []
+            names = []
+            for table, _ in self._tables:
+                try:
+                    names.extend(str(row[0]) for row in conn.execute(f"SELECT name FROM {table}") if row[0])
+                except sqlite3.Error:
+                    continue
+            return names
+        finally:
+            if conn and not self._pool:
+                conn.close()
+
+    def _load_aliases(self) -> Dict[str, str]:
+        """{alias: canonical} rows of the alias table, if the database has one."""
+        if not self._alias_table or not os.path.exists(self.db_path):
+            return {}
+        conn = None
+        try:
+            conn = self._pool.connection() if self._pool else sqlite3.connect(self.db_path)
+            if conn is None:
+                return {}
+            return {str(alias): str(canonical) for alias, canonical in
+                    conn.execute(f"SELECT alias, canonical FROM {self._alias_table}") if alias and canonical}
+        except sqlite3.Error:
+            return {}
+        finally:
+            if conn and not self._pool:
+                conn.close()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload the snapshot if the database changed; returns True when a new snapshot was swapped in."""
+        now = time.monotonic()
+        if not force and self._compounds is not None and self._checked_at is not None \
+                and now - self._checked_at < self._check_interval:
+            return False
+
+        with self._lock:
+            self._checked_at = now
+            sig = self._signature()
+            if not force and self._compounds is not None and sig == self._source_sig:
+                return False
+            self._compounds = self._load() if self.preload else {}
+            names = self._compounds if self.preload else self._load_names()
+            self._alias_index = AliasIndex(self._aliases, names, self._load_aliases())
+            self._canonical_memo = {}
+            self.negative_cache.clear()
+            self._source_sig = sig
+            self._version += 1
+
+        for listener in self._listeners:
+            listener()
+        return True
+
+    def intern(self, name: str) -> Optional[int]:
+        """Integer ID for a compound name, or None once MAX_INTERNED_NAMES are taken."""
+        compound_id = self._ids.get(name)
+        if compound_id is None:
+            with self._intern_lock:
+                compound_id = self._ids.get(name)
+                if compound_id is None:
+                    if len(self._id_names) >= MAX_INTERNED_NAMES:
+                        return None
+                    compound_id = len(self._id_names)
+                    self._id_names.append(sys.intern(name))
+                    self._ids[self._id_names[-1]] = compound_id
+        return compound_id
+
+    def name_of(self, compound_id: int) -> str:
+        """Compound name an interned ID stands for."""
+        return self._id_names[compound_id]
+
+    def add_reload_listener(self, listener: Callable[[], None]) -> None:
+        """Call `listener()` whenever a new snapshot is swapped in."""
+        self._listeners.append(listener)
+
+    @property
+    def version(self) -> int:
+        """Snapshot generation (checks for database changes first)."""
+        self.refresh()
+        return self._version
+
+    @property
+    def source_signature(self):
+        """Change marker of the database state the snapshot was built from."""
+        self.refresh()
+        return self._source_sig
+
+    @property
+    def refresh_due(self) -> bool:
+        """True when the next refresh() would poll the database (or load the first snapshot)."""
+        return self._compounds is None or self._checked_at is None \
+            or time.monotonic() - self._checked_at >= self._check_interval
+
+    @property
+    def cached_signature(self):
+        """source_signature as of the last check, without polling the database."""
+        return self._source_sig
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current {NAME: data} mapping; treat as read-only."""
+        self.refresh()
+        return self._compounds
+
+    def canonical(self, compound_name: str) -> str:
+        """Registry key of a compound spelling (see AliasIndex)."""
+        self.refresh()
+        memo = self._canonical_memo
+        key = memo.get(compound_name)
+        if key is None:
+            key = self._alias_index.canonical(compound_name)
+            if len(memo) >= CANONICAL_MEMO_SIZE:
+                memo.clear()
+            memo[compound_name] = key
+        return key
+
+    def get(self, compound_name: str) -> Optional[Dict[str, Any]]:
+        data = self.snapshot().get(self.canonical(compound_name))
+        if data is not None or self.preload:
+            return data
+        return self.resolve([compound_name])[compound_name]
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Resolve many compound names at once ({name: data or None}).
+        In on-demand mode all misses share one batched query per table.
+        """
+        compounds = self.snapshot()
+        result: Dict[str, Optional[Dict[str, Any]]] = {}
+        pending: Dict[str, List[str]] = {}
+
+        for name in names:
+            key = self.canonical(name)
+            data = compounds.get(key)
+            if data is not None or self.preload:
+                result[name] = data
+            elif self.negative_cache.get(key):
+                result[name] = None
+            else:
+                pending.setdefault(key, []).append(name)
+
+        if not pending:
+            return result
+
+        found = self._load(list(pending))
+        with self._lock:
+            if found:
+                self._compounds = {**self._compounds, **found}
+                self._version += 1
+        for key in pending:
+            if key not in found:
+                self.negative_cache.put(key, True)
+
+        for key, spellings in pending.items():
+            for name in spellings:
+                result[name] = found.get(key)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._compounds or {})
@@ -0,0 +1,61 @@
+import re
+from functools import lru_cache
+from typing import List
+
+# Condition keyword taxonomy (matched as substrings of the lowercased condition name)
+RECREATIONAL_GOALS = ["blitzed", "high", "stoned", "faded", "blasted", "get high"]
+COGNITIVE_NEEDS = ["adhd", "focus", "clarity", "studying", "concentration", "memory"]
+SOMATIC_NEEDS = ["sleep", "insomnia", "pain", "inflammation", "nerve", "neuropathic", "migraine"]
+ANXIETY_NEEDS = ["anxiety", "stress", "panic", "worry"]
+# Research: Cannflavin A anti-inflammatory activity only counts toward these conditions
+CANNFLAVIN_TARGETS = ["pain", "inflammation"]
+
+# Profile IDs (bit flags, combined per condition)
+PROFILE_RECREATIONAL = 1
+PROFILE_COGNITIVE = 2
+PROFILE_SOMATIC = 4
+PROFILE_ANXIETY = 8
+PROFILE_CANNFLAVIN_TARGET = 16
+
+PROFILE_NAMES = {
+    PROFILE_RECREATIONAL: "recreational",
+    PROFILE_COGNITIVE: "cognitive",
+    PROFILE_SOMATIC: "somatic",
+    PROFILE_ANXIETY: "anxiety",
+    PROFILE_CANNFLAVIN_TARGET: "cannflavin_target",
+}
+
+
+def _compile(keywords: List[str]) -> re.Pattern:
+    """Single alternation matching any keyword as a substring."""
+    return re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+
+_MATCHERS = [
+    (PROFILE_RECREATIONAL, _compile(RECREATIONAL_GOALS)),
+    (PROFILE_COGNITIVE, _compile(COGNITIVE_NEEDS)),
+    (PROFILE_SOMATIC, _compile(SOMATIC_NEEDS)),
+    (PROFILE_ANXIETY, _compile(ANXIETY_NEEDS)),
+    (PROFILE_CANNFLAVIN_TARGET, _compile(CANNFLAVIN_TARGETS)),
+]
+
+
+@lru_cache(maxsize=4096)
+def classify_condition(condition_name: str) -> int:
+    """Resolve a free-text condition name to its profile bit set (memoized)."""
+    cond_name = condition_name.lower()
+    profile = 0
+    for flag, matcher in _MATCHERS:
+        if matcher.search(cond_name):
+            profile |= flag
+    return profile
+
+
+def classify_conditions(conditions) -> List[int]:
+    """Profile bit sets for a list of Condition models, in order."""
+    return [classify_condition(c.name) for c in conditions]
+
+
+def describe_profile(profile: int) -> List[str]:
+    """Readable profile names for a bit set."""
+    return [name for flag, name in PROFILE_NAMES.items() if profile & flag]
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+# Read connection tuning
+MMAP_SIZE = 256 * 1024 * 1024     # Map up to 256 MB of the DB file
+CACHE_SIZE_KIB = 16 * 1024        # 16 MB page cache per connection
+CACHED_STATEMENTS = 256           # Prepared statements kept per connection
+
+
+class ConnectionPool:
+    """
+    Per-thread SQLite read connections, opened once and reused.
+
+    Each thread gets its own connection, so no connection is shared across
+    threads. Connections run in WAL mode with memory-mapped I/O and a larger
+    page cache, and keep prepared statements for repeated SQL text.
+    A connection is reopened if the DB file is replaced (e.g. a reseed).
+    """
+
+    def __init__(self, db_path: str, mmap_size: int = MMAP_SIZE, cache_size_kib: int = CACHE_SIZE_KIB,
+                 cached_statements: int = CACHED_STATEMENTS):
+        self.db_path = db_path
+        self.mmap_size = mmap_size
+        self.cache_size_kib = cache_size_kib
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all: List[sqlite3.Connection] = []
+
+    def _open(self) -> sqlite3.Connection:
+        # check_same_thread is off only so close_all() can run from the shutdown thread
+        conn = sqlite3.connect(self.db_path, cached_statements=self.cached_statements,
+                               check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error:
+            pass  # Read-only media: keep the existing journal mode
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kib)}")
+        conn.execute("PRAGMA query_only=1")
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """This thread's read connection, or None if the database does not exist."""
+        try:
+            ino = os.stat(self.db_path).st_ino
+        except OSError:
+            return None
+
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.ino != ino:
+            self._discard(conn)
+            conn = None
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.ino = ino
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._local.conn = None
+
+    def close_all(self) -> None:
+        """Close every pooled connection (e.g. at shutdown)."""
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
@@ -0,0 +1,87 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Worker threads for blocking work (SQLite I/O, scoring); numpy and sqlite3 release the GIL
+EXECUTOR_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+# Jobs allowed in flight at once; further requests wait on the event loop, not in the pool queue
+EXECUTOR_MAX_PENDING = 64
+
+
+class BlockingExecutor:
+    """
+    Bounded thread pool that async endpoints await for blocking work.
+
+    Keeps sqlite3 queries and CPU-bound scoring off the event loop, so cheap
+    endpoints (health checks, static tables) are served while a large
+    /recommend is still running. At most max_pending jobs are submitted at
+    once; the rest wait on an asyncio semaphore instead of piling up in the
+    pool's unbounded queue. The pool is created on first use and can be
+    shut down and recreated (e.g. across app restarts in tests).
+    """
+
+    def __init__(self, max_workers: int = EXECUTOR_WORKERS, max_pending: int = EXECUTOR_MAX_PENDING,
+                 thread_name_prefix: str = "greenforge-worker"):
+        if max_workers <= 0 or max_pending <= 0:
+            raise ValueError("max_workers and max_pending must be positive")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._thread_name_prefix = thread_name_prefix
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # asyncio.Semaphore binds to one event loop; keep one per loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.active = 0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix=self._thread_name_prefix)
+            return self._pool
+
+    def _get_semaphore(self, loop) -> asyncio.Semaphore:
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on a worker thread and await its result."""
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore(loop):
+            self.submitted += 1
+            self.active += 1
+            try:
+                result = await loop.run_in_executor(self._get_pool(), functools.partial(fn, *args, **kwargs))
+            except BaseException:
+                self.failed += 1
+                raise
+            finally:
+                self.active -= 1
+            self.completed += 1
+            return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads; the next run() starts a fresh pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "active": self.active,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
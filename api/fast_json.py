@@ -0,0 +1,44 @@
+import json
+import re
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional: without it every body is encoded by the stdlib
+    orjson = None
+
+# orjson output that json.dumps may spell differently: exponent floats (1e-7 vs
+# 1e-07, 1e16 vs 1e+16), small floats written out (0.00001 vs 1e-05) and null,
+# which is also how orjson writes NaN/Infinity (rejected by JSONResponse).
+# Strings that happen to match only cost a fallback.
+_ORJSON_EXPONENT = re.compile(rb"e-?[0-9]")
+_AMBIGUOUS_TOKENS = (b"0.0000", b"null")
+# Types orjson would encode natively but the stdlib rejects are handed back
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+
+def encode_json(content: Any) -> bytes:
+    """
+    Exactly the bytes JSONResponse renders for `content` (compact separators,
+    UTF-8, NaN rejected), encoded by orjson when its output provably matches
+    and by the stdlib otherwise.
+    """
+    if orjson is not None:
+        try:
+            body = orjson.dumps(content, option=_ORJSON_OPTIONS)
+        except TypeError:  # Non-str keys, ints past 64 bits, unsupported types
+            body = None
+        if (body is not None and not any(token in body for token in _AMBIGUOUS_TOKENS)
+                and not _ORJSON_EXPONENT.search(body)):
+            return body
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with encode_json: same body, less time for large payloads."""
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
@@ -0,0 +1,293 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.cache import LRUCache
+from api.catalog import PRODUCT_CATALOG
+from api.ranking import TopK, decode_cursor, encode_cursor
+from api.recommendation import (
+    Condition,
+    Product,
+    RecommendationRequest,
+    DB_PATH,
+    DB_POOL,
+    COMPOUND_REGISTRY,
+    PROFILE_RECREATIONAL,
+    build_recommendations,
+    build_result,
+    calculate_quantum_match,
+    classify_conditions,
+    compile_product,
+    evaluate_condition,
+    get_compound_data,
+    product_vector,
+    recommendation_summary,
+    resolve_request_compounds,
+)
+from api.thermal_lut import DEVICE_MIN_F, DEVICE_MAX_F, DEVICE_STEP_F
+
+# Bump when scoring logic changes so every stored row is recomputed
+SCORE_MODEL_VERSION = "v2.0-pharmacognosy/2"
+
+# Temperature buckets: the device's whole-degree slider steps
+MATERIALIZED_TEMPS = list(range(DEVICE_MIN_F, DEVICE_MAX_F + 1, DEVICE_STEP_F))
+# Every non-recreational profile bit set (recreational conditions always score 100)
+MATERIALIZED_PROFILES = [p for p in range(32) if not p & PROFILE_RECREATIONAL]
+# Temperature buckets of stored scores kept in memory
+SCORE_BUCKET_CACHE_SIZE = 16
+
+# Placeholder condition: evaluate_condition only uses the name for warning text
+_PROFILE_CONDITION = Condition(name="", severity=1)
+
+ProductKey = Tuple[str, str]  # (strain_name, grow_style)
+
+
+def ensure_score_tables(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_scores (
+            temp_f INTEGER,
+            strain_name TEXT,
+            grow_style TEXT,
+            profile INTEGER,
+            score REAL,
+            PRIMARY KEY (temp_f, strain_name, grow_style, profile)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_score_rows (
+            strain_name TEXT,
+            grow_style TEXT,
+            fingerprint TEXT,
+            PRIMARY KEY (strain_name, grow_style)
+        )
+    """)
+
+
+def product_fingerprint(product: Product) -> str:
+    """Hash of everything a stored score depends on: compounds, their metadata and the model version."""
+    parts: List[Any] = [SCORE_MODEL_VERSION, MATERIALIZED_TEMPS[0], MATERIALIZED_TEMPS[-1], DEVICE_STEP_F,
+                        product.growStyle]
+    vector = product_vector(product)
+    for name, val in zip(vector.names, vector.vals):
+        data = get_compound_data(name)
+        parts.append([name, val, data.get("type") if data else None,
+                      data.get("boiling_point_f") if data else None])
+    return hashlib.sha1(json.dumps(parts).encode()).hexdigest()
+
+
+def compute_product_scores(product: Product) -> List[Tuple[int, int, float]]:
+    """(temp_f, profile, condition score) for every bucket and profile of one product."""
+    rows = []
+    vector = product_vector(product)
+    for temp_f in MATERIALIZED_TEMPS:
+        compiled = compile_product(vector, float(temp_f), product.growStyle)
+        for profile in MATERIALIZED_PROFILES:
+            score, _ = evaluate_condition(compiled, _PROFILE_CONDITION, profile, [])
+            rows.append((temp_f, profile, score))
+    return rows
+
+
+def materialize_scores(db_path: str = DB_PATH, force: bool = False) -> Dict[str, int]:
+    """
+    Bring catalog_scores up to date with product_catalog.
+
+    Only products whose fingerprint changed (new rows, edited compounds,
+    changed boiling points or types) are recomputed; rows for products no
+    longer in the catalog are dropped. Runs in one transaction.
+    """
+    PRODUCT_CATALOG.refresh(force=True)
+    products = PRODUCT_CATALOG.columns["product"]
+    resolve_request_compounds(products)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_score_tables(conn)
+        stored = {(row[0], row[1]): row[2] for row in
+                  conn.execute("SELECT strain_name, grow_style, fingerprint FROM catalog_score_rows")}
+
+        recomputed = 0
+        rows_written = 0
+        current = set()
+        for product in products:
+            key = (product.name, product.growStyle)
+            current.add(key)
+            fingerprint = product_fingerprint(product)
+            if not force and stored.get(key) == fingerprint:
+                continue
+            scores = compute_product_scores(product)
+            conn.execute("DELETE FROM catalog_scores WHERE strain_name = ? AND grow_style = ?", key)
+            conn.executemany(
+                "INSERT INTO catalog_scores (temp_f, strain_name, grow_style, profile, score) VALUES (?,?,?,?,?)",
+                [(temp_f, key[0], key[1], profile, score) for temp_f, profile, score in scores]
+            )
+            conn.execute("INSERT OR REPLACE INTO catalog_score_rows VALUES (?,?,?)", (*key, fingerprint))
+            recomputed += 1
+            rows_written += len(scores)
+
+        removed = [key for key in stored if key not in current]
+        for key in removed:
+            conn.execute("DELETE FROM catalog_scores WHERE strain_name = ? AND grow_style = ?", key)
+            conn.execute("DELETE FROM catalog_score_rows WHERE strain_name = ? AND grow_style = ?", key)
+
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {"products": len(products), "recomputed": recomputed, "removed": len(removed),
+            "rows_written": rows_written}
+
+
+class MaterializedScores:
+    """
+    Read side of catalog_scores.
+
+    Stored condition scores for one temperature bucket are loaded with a
+    single query and kept in a small LRU. A product's stored scores are only
+    used while its stored fingerprint matches the current one; stale or
+    missing products are scored live. Everything is dropped when the
+    database changes.
+    """
+
+    def __init__(self, cache_size: int = SCORE_BUCKET_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._buckets = LRUCache(cache_size, name="materialized_scores")
+        self._source_sig = None
+        self._fresh: Optional[set] = None
+        self._fresh_for = None
+
+    def _sync(self) -> None:
+        sig = COMPOUND_REGISTRY.source_signature
+        if sig != self._source_sig:
+            with self._lock:
+                self._buckets.clear()
+                self._fresh = None
+                self._source_sig = sig
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        conn = DB_POOL.connection()
+        if conn is None:
+            return []
+        try:
+            return conn.execute(sql, params).fetchall()
+        except sqlite3.Error:
+            return []  # Job has not run yet
+
+    def fresh_keys(self, products: List[Product]) -> set:
+        """Catalog products whose stored scores are current."""
+        self._sync()
+        marker = (id(products), COMPOUND_REGISTRY.version)
+        if self._fresh is None or self._fresh_for != marker:
+            stored = {(row[0], row[1]): row[2] for row in
+                      self._query("SELECT strain_name, grow_style, fingerprint FROM catalog_score_rows")}
+            self._fresh = {(p.name, p.growStyle) for p in products
+                           if stored.get((p.name, p.growStyle)) == product_fingerprint(p)}
+            self._fresh_for = marker
+        return self._fresh
+
+    @staticmethod
+    def bucket(temp_f: float) -> Optional[int]:
+        """Stored temperature bucket for temp_f, or None when it must be scored live."""
+        if not float(temp_f).is_integer():
+            return None
+        temp = int(temp_f)
+        return temp if DEVICE_MIN_F <= temp <= DEVICE_MAX_F and (temp - DEVICE_MIN_F) % DEVICE_STEP_F == 0 else None
+
+    def scores_at(self, temp: int) -> Dict[ProductKey, Dict[int, float]]:
+        """{(strain, grow_style): {profile: condition score}} for one bucket."""
+        self._sync()
+
+        def load():
+            scores: Dict[ProductKey, Dict[int, float]] = {}
+            for strain, grow, profile, score in self._query(
+                    "SELECT strain_name, grow_style, profile, score FROM catalog_scores WHERE temp_f = ?", (temp,)):
+                scores.setdefault((strain, grow), {})[profile] = score
+            return scores
+
+        return self._buckets.get_or_load(temp, load)
+
+    @staticmethod
+    def blend(stored: Dict[int, float], conditions: List[Condition], profiles: List[int]) -> float:
+        """Request score from stored condition scores, weighted by severity as in calculate_quantum_match."""
+        total_score = 0.0
+        total_weight = 0.0
+        for condition, profile in zip(conditions, profiles):
+            condition_score = 100.0 if profile & PROFILE_RECREATIONAL else stored[profile]
+            total_score += condition_score * condition.severity
+            total_weight += condition.severity
+        return round(min(100.0, max(0.0, total_score / total_weight)), 1) if total_weight > 0 else 0.0
+
+
+MATERIALIZED_SCORES = MaterializedScores()
+
+
+def build_materialized_recommendations(data: RecommendationRequest) -> Dict[str, Any]:
+    """
+    /recommend/catalog in materialized mode (blocking; run via EXECUTOR).
+
+    Products are ranked from stored scores, and full result rows (breakdown,
+    warnings, thermal details) are computed only for the products returned.
+    Off-grid temperatures, or a catalog that was never materialized, fall
+    back to live scoring; the materialized stats then report every product
+    as live.
+    """
+    temp_f = float(data.user_profile['interface_temp'])
+    bucket = MATERIALIZED_SCORES.bucket(temp_f)
+    products = data.product_list
+    stored_scores = MATERIALIZED_SCORES.scores_at(bucket) if bucket is not None else {}
+    if not stored_scores:
+        response = build_recommendations(data)
+        response["materialized"] = {"temp_bucket_f": bucket, "stored": 0, "live": len(products)}
+        return response
+
+    conditions = [Condition(**c) for c in data.user_profile['conditions']]
+    profiles = classify_conditions(conditions)
+    fresh = MATERIALIZED_SCORES.fresh_keys(PRODUCT_CATALOG.columns["product"])
+    resolve_request_compounds(products)
+
+    analyses: Dict[int, Dict[str, Any]] = {}
+
+    def analyse(index: int) -> Dict[str, Any]:
+        if index not in analyses:
+            product = products[index]
+            analyses[index] = calculate_quantum_match(conditions, product_vector(product), temp_f,
+                                                      product.growStyle, profiles)
+        return analyses[index]
+
+    scores = []
+    live = 0
+    for index, product in enumerate(products):
+        stored = stored_scores.get((product.name, product.growStyle))
+        if stored is not None and product.compounds and (product.name, product.growStyle) in fresh:
+            scores.append(MATERIALIZED_SCORES.blend(stored, conditions, profiles))
+        else:
+            scores.append(analyse(index)["score"])
+            live += 1
+
+    if data.top_k is not None:
+        selector = TopK(data.top_k + 1, decode_cursor(data.cursor) if data.cursor else None)
+        for index, score in enumerate(scores):
+            selector.push(score, index, index)
+        entries = selector.ranked_entries()
+        page = entries[:data.top_k]
+        order = [index for _, index in page]
+        next_cursor = encode_cursor(page[-1][0]) if len(entries) > data.top_k else None
+    else:
+        order = sorted(range(len(products)), key=lambda i: -scores[i])
+
+    response = {
+        "results": [build_result(products[i], analyse(i)) for i in order],
+        **recommendation_summary(temp_f, conditions),
+    }
+    if data.top_k is not None:
+        response["next_cursor"] = next_cursor
+    response["materialized"] = {"temp_bucket_f": bucket, "stored": len(products) - live, "live": live}
+    return response
+
+
+if __name__ == "__main__":
+    COMPOUND_REGISTRY.refresh(force=True)
+    stats = materialize_scores()
+    print(f"✅ Materialized scores: {stats['recomputed']}/{stats['products']} products recomputed, "
+          f"{stats['removed']} removed, {stats['rows_written']} rows written")
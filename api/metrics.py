@@ -0,0 +1,264 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request and stage latency buckets (seconds)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Products per /recommend request
+PRODUCT_BUCKETS = (1, 5, 10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+
+# Engine stages timed per request (see StageTimings)
+STAGE_COMPOUND_RESOLUTION = "compound_resolution"
+STAGE_THERMAL = "thermal_availability"
+STAGE_SCORING = "profile_scoring"
+STAGE_SORTING = "sorting"
+STAGE_SERIALIZATION = "serialization"
+
+# Route label for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+# scope key naming the route of a request answered before routing
+ROUTE_LABEL_SCOPE = "metrics_route"
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter family, one value per label set."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_label_text(self.labels, labels)} {_number(value)}" for labels, value in values)
+        return lines
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram family, one series per label set.
+
+    observe() is a bisect and three additions under the family lock; buckets
+    are stored per interval and only made cumulative when rendered.
+    """
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, labels: Labels = ()) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((labels, (list(counts), total, count))
+                            for labels, (counts, total, count) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, labels)} {count}")
+        return lines
+
+
+def cache_collector(caches: Iterable[Any]) -> Callable[[], List[str]]:
+    """
+    Scrape-time exposition of LRUCache.stats() for each of `caches`: hits,
+    misses and evictions as counters, hit ratio and size as gauges. Nothing
+    is recorded on the lookup path.
+    """
+    families = (
+        ("greenforge_cache_hits_total", "counter", "Cache lookups answered from the cache", "hits"),
+        ("greenforge_cache_misses_total", "counter", "Cache lookups that missed", "misses"),
+        ("greenforge_cache_evictions_total", "counter", "Entries evicted for capacity", "evictions"),
+        ("greenforge_cache_hit_ratio", "gauge", "Hits over lookups since start", "hit_rate"),
+        ("greenforge_cache_entries", "gauge", "Entries currently cached", "size"),
+    )
+    caches = list(caches)
+
+    def collect() -> List[str]:
+        stats = [cache.stats() for cache in caches]
+        lines = []
+        for name, kind, help, field in families:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            lines.extend(f"{name}{_label_text(('cache',), (s['name'],))} {_number(s[field] or 0)}" for s in stats)
+        return lines
+
+    return collect
+
+
+class MetricsRegistry:
+    """Metric families and scrape-time collectors rendered together at /metrics."""
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        """Call `collector()` on every scrape for extra exposition lines."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+REQUESTS = METRICS.register(Counter(
+    "greenforge_http_requests_total", "HTTP requests by route, method and status",
+    ("route", "method", "status")))
+REQUEST_LATENCY = METRICS.register(Histogram(
+    "greenforge_http_request_duration_seconds", "HTTP request latency by route, until the last body byte",
+    ("route", "method")))
+STAGE_LATENCY = METRICS.register(Histogram(
+    "greenforge_engine_stage_duration_seconds", "Recommendation engine time per request by stage",
+    ("stage",)))
+PRODUCTS_PER_REQUEST = METRICS.register(Histogram(
+    "greenforge_recommend_products", "Products submitted per recommendation request", (),
+    PRODUCT_BUCKETS))
+
+
+class StageTimings:
+    """
+    Seconds spent in each engine stage while serving one request.
+
+    Hot loops add to it directly; observe() records each stage in
+    STAGE_LATENCY once, when the request is done.
+    """
+
+    __slots__ = ("seconds",)
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Time the block as `stage`, less the time other stages recorded inside it."""
+        nested = sum(self.seconds.values())
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.add(stage, elapsed - (sum(self.seconds.values()) - nested))
+
+    def observe(self) -> None:
+        for stage, seconds in self.seconds.items():
+            STAGE_LATENCY.observe(seconds, (stage,))
+
+
+def observe_request(products: int, timings: Optional[StageTimings] = None) -> None:
+    """Record one recommendation request's product count and stage timings."""
+    PRODUCTS_PER_REQUEST.observe(products)
+    if timings is not None:
+        timings.observe()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and timing them per route.
+
+    Requests are labelled with the path template of the route the router
+    matched (so /strains/{strain_name} is one series). Middleware answering
+    before routing (e.g. response cache hits) names the route in
+    scope[ROUTE_LABEL_SCOPE]; anything else is UNMATCHED_ROUTE. Register it
+    last so it wraps every other middleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route_label(scope) -> str:
+        route = scope.get("route")
+        if route is not None and hasattr(route, "path"):
+            return route.path
+        return scope.get(ROUTE_LABEL_SCOPE, UNMATCHED_ROUTE)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            route = self._route_label(scope)
+            REQUESTS.inc((route, scope["method"], str(status)))
+            REQUEST_LATENCY.observe(time.perf_counter() - started, (route, scope["method"]))
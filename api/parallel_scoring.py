@@ -0,0 +1,94 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from api.recommendation import (
+    Condition,
+    Product,
+    COMPOUND_REGISTRY,
+    THERMAL_LUT,
+    resolve_request_compounds,
+)
+from api.batch_scoring import score_products_vectorized
+
+# Below this many products the request is scored in-process (pool overhead dominates)
+PARALLEL_MIN_PRODUCTS = 5000
+# Products per chunk sent to a worker
+PARALLEL_CHUNK_SIZE = 2000
+PARALLEL_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+
+def _init_worker() -> None:
+    """Preload the compound registry and thermal table once per worker process."""
+    COMPOUND_REGISTRY.refresh(force=True)
+    THERMAL_LUT.refresh(force=True)
+
+
+def _score_chunk(conditions: List[Condition], products: List[Product], temp_f: float,
+                 profiles: List[int]) -> List[Dict[str, Any]]:
+    """Score one chunk inside a worker; compound lookups hit the worker's registry."""
+    resolve_request_compounds(products)
+    return score_products_vectorized(conditions, products, temp_f, profiles, dedupe_warnings=False)
+
+
+class ParallelScorer:
+    """
+    Scores large product lists in chunks across a pool of worker processes.
+
+    Workers are started with the spawn method (no SQLite handles are carried
+    across fork) and preload the compound registry and thermal LUT once, so
+    chunks never touch the database. Chunk results come back in submission
+    order, so the merged list lines up with the input products and the final
+    sort gives the same ranking as in-process scoring; warnings are deduped
+    in the parent so their order matches too. Lists smaller than
+    min_products are scored in-process.
+    """
+
+    def __init__(self, max_workers: int = PARALLEL_WORKERS, chunk_size: int = PARALLEL_CHUNK_SIZE,
+                 min_products: int = PARALLEL_MIN_PRODUCTS):
+        if max_workers <= 0 or chunk_size <= 0:
+            raise ValueError("max_workers and chunk_size must be positive")
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.min_products = min_products
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker)
+            return self._pool
+
+    def score(self, conditions: List[Condition], products: List[Product], temp_f: float,
+              profiles: List[int]) -> List[Dict[str, Any]]:
+        """Analyses for every product, in input order."""
+        if len(products) < self.min_products:
+            return score_products_vectorized(conditions, products, temp_f, profiles)
+
+        pool = self._get_pool()
+        futures = [
+            pool.submit(_score_chunk, conditions, products[i:i + self.chunk_size], temp_f, profiles)
+            for i in range(0, len(products), self.chunk_size)
+        ]
+        analyses: List[Dict[str, Any]] = []
+        for future in futures:
+            for analysis in future.result():
+                # Dedupe here: string hashing (and so set order) differs per process
+                analysis["warnings"] = list(set(analysis["warnings"]))
+                analyses.append(analysis)
+        return analyses
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes; the next large request starts a fresh pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+PARALLEL_SCORER = ParallelScorer()
@@ -0,0 +1,112 @@
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from api.fast_json import FastJSONResponse
+from api.ranking import decode_cursor, encode_cursor, ranks_after
+from api.recommendation import (
+    Condition,
+    Product,
+    RecommendationRequest,
+    EXECUTOR,
+    build_result,
+    calculate_quantum_match,
+    classify_conditions,
+    compile_product,
+    match_compiled,
+    product_vector,
+    recommendation_summary,
+    resolve_request_compounds,
+    validate_recommendation_request,
+)
+
+router = APIRouter(prefix="/api/v1")
+
+# Largest patient queue accepted in one batch
+BATCH_MAX_PROFILES = 500
+
+
+class BatchRecommendationRequest(BaseModel):
+    user_profiles: List[Dict[str, Any]]  # One /recommend user_profile per patient
+    product_list: List[Product]
+    top_k: Optional[int] = None  # Only the K best-ranked products per profile
+    cursors: Optional[List[Optional[str]]] = None  # Each profile's next_cursor, aligned with user_profiles
+
+
+def build_batch_recommendations(data: BatchRecommendationRequest) -> Dict[str, Any]:
+    """
+    One /recommend ranking per profile (blocking; run via EXECUTOR).
+
+    Compound metadata is resolved once for the whole batch, and each product
+    is compiled (thermal availability, cultivation modifiers, profile signals)
+    once per distinct temperature; every profile at that temperature is then
+    scored against the shared compiled products. A profile's entry is what
+    /recommend returns for it, including per-profile validation errors; with
+    top_k, cursors[i] pages profile i exactly as /recommend's cursor does.
+    """
+    if not data.user_profiles:
+        return {"error": "Missing user_profiles", "results": []}
+    if len(data.user_profiles) > BATCH_MAX_PROFILES:
+        return {"error": f"Batch exceeds {BATCH_MAX_PROFILES} profiles", "results": []}
+    if data.top_k is not None and data.top_k <= 0:
+        return {"error": "top_k must be positive", "results": []}
+    if data.cursors is not None and len(data.cursors) != len(data.user_profiles):
+        return {"error": "cursors must have one entry per user profile", "results": []}
+
+    products = data.product_list
+    resolve_request_compounds(products)
+    compiled: Dict[float, List[Optional[Dict[str, Any]]]] = {}
+
+    results = []
+    for position, user_profile in enumerate(data.user_profiles):
+        cursor = data.cursors[position] if data.cursors is not None else None
+        error = validate_recommendation_request(RecommendationRequest.model_construct(
+            user_profile=user_profile, product_list=products, scoring_mode="standard",
+            top_k=data.top_k, cursor=cursor))
+        if error:
+            results.append({"error": error, "results": []})
+            continue
+
+        temp_f = float(user_profile['interface_temp'])
+        conditions = [Condition(**c) for c in user_profile['conditions']]
+        profiles = classify_conditions(conditions)
+        if temp_f not in compiled:
+            compiled[temp_f] = [compile_product(product_vector(p), temp_f, p.growStyle) if p.compounds else None
+                                for p in products]
+
+        analyses = [
+            match_compiled(conditions, aggregates, temp_f, profiles) if aggregates is not None
+            else calculate_quantum_match(conditions, product.compounds, temp_f, product.growStyle, profiles)
+            for product, aggregates in zip(products, compiled[temp_f])
+        ]
+        # Stable sort: ties keep input order, as in /recommend
+        order = sorted(range(len(products)), key=lambda i: analyses[i]["score"], reverse=True)
+        if cursor is not None:
+            after = decode_cursor(cursor)
+            order = [i for i in order if ranks_after((analyses[i]["score"], i), after)]
+        entry = {}
+        if data.top_k is not None:
+            more = len(order) > data.top_k
+            order = order[:data.top_k]
+            last = order[-1] if order else None
+            entry["next_cursor"] = encode_cursor((analyses[last]["score"], last)) if more else None
+        results.append({
+            "results": [build_result(products[i], analyses[i]) for i in order],
+            **recommendation_summary(temp_f, conditions),
+            **entry,
+        })
+
+    return {
+        "results": results,
+        "profiles_scored": len(data.user_profiles),
+        "products_scored": len(products),
+        "temperatures_compiled": len(compiled),
+    }
+
+
+@router.post("/recommend/batch")
+async def recommend_batch(data: BatchRecommendationRequest):
+    """Rank one inventory for many user profiles in a single request."""
+    # Encoded directly: the response is large and already JSON-ready
+    return FastJSONResponse(await EXECUTOR.run(build_batch_recommendations, data))
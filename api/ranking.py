@@ -0,0 +1,244 @@
+import base64
+import heapq
+import json
+import math
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from api.recommendation import (
+    Compound,
+    CompoundVector,
+    Condition,
+    Product,
+    THERMAL_LUT,
+    COMPOUND_TRAITS,
+    ASSUMED_ACTIVE,
+    TRAIT_COGNITIVE,
+    TRAIT_SOMATIC,
+    TRAIT_ANXIETY,
+    TRAIT_CANNFLAVIN,
+    TRAIT_THC,
+    CANNFLAVIN_BONUS_STYLES,
+    PROFILE_RECREATIONAL,
+    PROFILE_COGNITIVE,
+    PROFILE_SOMATIC,
+    PROFILE_ANXIETY,
+    PROFILE_CANNFLAVIN_TARGET,
+    build_result,
+    calculate_quantum_match,
+    pack_compounds,
+    product_vector,
+    resolve_request_compounds,
+    score_analyses,
+)
+from api.metrics import STAGE_COMPOUND_RESOLUTION, STAGE_SCORING, STAGE_SORTING, StageTimings
+
+# Largest factor apply_cultivation_modifiers can apply (UV-B flavonoids)
+MAX_CULTIVATION_MULT = 1.4
+# Headroom for float rounding between the bound and the real accumulation order
+BOUND_SLACK = 1e-6
+
+RankKey = Tuple[float, int]  # (matchScore, input index)
+
+
+def encode_cursor(key: RankKey) -> str:
+    """Opaque page cursor for the last (score, index) returned."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[RankKey]:
+    """(score, index) from a cursor, or None if it is malformed."""
+    try:
+        score, index = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if isinstance(index, int) and isinstance(score, (int, float)):
+            return float(score), index
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def ranks_after(key: RankKey, after: RankKey) -> bool:
+    """True if a result at `key` comes after `after` in the ranking (higher score first, ties in input order)."""
+    return key[0] < after[0] or (key[0] == after[0] and key[1] > after[1])
+
+
+class TopK:
+    """
+    Keeps the k best results seen so far in a min-heap.
+
+    Ranking matches the full sort: higher score first, ties in input order.
+    With `after` (a decoded cursor) only results ranked after that position
+    are kept. Only k result dicts are held at any time.
+    """
+
+    def __init__(self, k: int, after: Optional[RankKey] = None):
+        self.k = k
+        self.after = after
+        self._heap: List[Tuple[float, int, Dict[str, Any]]] = []
+
+    @property
+    def full(self) -> bool:
+        return len(self._heap) >= self.k
+
+    def admits(self, score: float, index: int) -> bool:
+        """True if a result with this score and index would be kept right now."""
+        if self.after is not None and not ranks_after((score, index), self.after):
+            return False
+        return self.can_beat(score, index)
+
+    def can_beat(self, score: float, index: int) -> bool:
+        """True if the heap has room or this would displace the current k-th result."""
+        # -index: on equal scores the later product ranks lower and is evicted first
+        return not self.full or (score, -index) > self._heap[0][:2]
+
+    def push(self, score: float, index: int, item: Dict[str, Any]) -> None:
+        if not self.admits(score, index):
+            return
+        entry = (score, -index, item)
+        if self.full:
+            heapq.heapreplace(self._heap, entry)
+        else:
+            heapq.heappush(self._heap, entry)
+
+    def ranked_entries(self) -> List[Tuple[RankKey, Dict[str, Any]]]:
+        return [((score, -neg_index), item)
+                for score, neg_index, item in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
+
+    def ranked(self) -> List[Dict[str, Any]]:
+        return [item for _, item in self.ranked_entries()]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def score_upper_bound(conditions: List[Condition], compounds: Union[List[Compound], CompoundVector],
+                      grow_style: str, profiles: List[int], row: Dict[str, Any]) -> float:
+    """
+    Cheap ceiling on calculate_quantum_match's score for one product.
+
+    Uses the exact THC value, availability (from the thermal LUT row), thermal
+    gate and entourage multiplier, and bounds every compound's cultivation
+    modifier by MAX_CULTIVATION_MULT, ignoring negative amounts. No metadata
+    lookups, warnings or breakdown dicts are built. Returns inf when a
+    severity is not positive (the weighted mean is not monotone then).
+    """
+    if not compounds or not conditions:
+        return 0.0
+    if any(c.severity <= 0 for c in conditions):
+        return math.inf
+    if not isinstance(compounds, CompoundVector):
+        compounds = pack_compounds(compounds)
+
+    thc = 0.0
+    cognitive = somatic = cannflavin = anxiety = general = 0.0
+    cannflavin_active = False
+    active = 0
+    locked = False
+    for val, (name_u, flags, _) in zip(compounds.vals, COMPOUND_TRAITS.resolve(compounds, grow_style)):
+        avail = row.get(name_u, ASSUMED_ACTIVE)[0]
+        if flags & TRAIT_THC:
+            thc = val
+        if avail > 0.5:
+            active += 1
+        elif avail < 0.5 and val > 0.5:
+            locked = True
+        is_cannflavin = flags & TRAIT_CANNFLAVIN
+        if is_cannflavin and avail > 0:
+            cannflavin_active = True
+        if val <= 0:
+            continue
+        weighted = val * MAX_CULTIVATION_MULT * avail
+        general += weighted
+        if flags & TRAIT_COGNITIVE:
+            cognitive += weighted
+        if flags & TRAIT_SOMATIC:
+            somatic += weighted
+        if flags & TRAIT_ANXIETY:
+            anxiety += weighted
+        if is_cannflavin and avail > 0:
+            cannflavin += val * avail * 5.0
+
+    multiplier = (0.8 if locked else 1.0) * (round(1.0 + (active - 1) * 0.1, 2) if active >= 2 else 1.0)
+    soil_grown = grow_style.lower() in CANNFLAVIN_BONUS_STYLES
+
+    total = 0.0
+    total_weight = 0.0
+    for condition, profile in zip(conditions, profiles):
+        if profile & PROFILE_RECREATIONAL:
+            bound = 100.0
+        else:
+            scores = []
+            if profile & PROFILE_COGNITIVE:
+                scores.append(cognitive * 40 - max(0, (thc - 10) * 3.0))
+            if profile & PROFILE_SOMATIC:
+                boost = 30.0 if profile & PROFILE_CANNFLAVIN_TARGET and cannflavin_active else 1.0
+                signal = somatic + cannflavin if profile & PROFILE_CANNFLAVIN_TARGET else somatic
+                f_bonus = 1.3 if soil_grown and boost > 1.0 else 1.0
+                scores.append((signal * 8 + thc * 1.2) * f_bonus * boost)
+            if profile & PROFILE_ANXIETY:
+                scores.append(anxiety * 15 - max(0, (thc - 5) * 2.0))
+            bound = (sum(scores) / len(scores) if scores else general * 3) * multiplier
+        total += bound * condition.severity
+        total_weight += condition.severity
+
+    total /= total_weight
+    return round(min(100.0, max(0.0, total + BOUND_SLACK * (1 + abs(total)))), 1)
+
+
+def select_into(selector: TopK, conditions: List[Condition], products: List[Product], start: int,
+                temp_f: float, profiles: List[int], scoring_mode: str,
+                timings: Optional[StageTimings] = None) -> int:
+    """
+    Score `products` (input indices from `start`) into the selector.
+
+    In standard mode each product is first checked against its upper bound and
+    skipped when it cannot beat the current k-th result; returns how many were
+    pruned. Batch modes score everything and only select. Bounds and heap
+    upkeep count as profile scoring in `timings`.
+    """
+    if timings is None:
+        timings = StageTimings()
+    if scoring_mode != "standard":
+        with timings.stage(STAGE_SCORING):
+            analyses = score_analyses(conditions, products, temp_f, profiles, scoring_mode, timings)
+            for offset, (product, analysis) in enumerate(zip(products, analyses)):
+                if selector.admits(analysis["score"], start + offset):
+                    selector.push(analysis["score"], start + offset, build_result(product, analysis))
+        return 0
+
+    with timings.stage(STAGE_COMPOUND_RESOLUTION):
+        resolve_request_compounds(products)
+    row = THERMAL_LUT.row(temp_f)
+    pruned = 0
+    with timings.stage(STAGE_SCORING):
+        for offset, product in enumerate(products):
+            index = start + offset
+            vector = product_vector(product)
+            if selector.full and not selector.can_beat(
+                    score_upper_bound(conditions, vector, product.growStyle, profiles, row), index):
+                pruned += 1
+                continue
+            analysis = calculate_quantum_match(conditions, vector, temp_f, product.growStyle, profiles, timings)
+            if selector.admits(analysis["score"], index):
+                selector.push(analysis["score"], index, build_result(product, analysis))
+    return pruned
+
+
+def page_results(selector: TopK, page_size: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """The ranked page and the cursor for the next one (selector holds page_size + 1)."""
+    entries = selector.ranked_entries()
+    page = entries[:page_size]
+    next_cursor = encode_cursor(page[-1][0]) if len(entries) > page_size else None
+    return [item for _, item in page], next_cursor
+
+
+def select_top_k(conditions: List[Condition], products: List[Product], temp_f: float, profiles: List[int],
+                 scoring_mode: str, k: int, cursor: Optional[str] = None,
+                 timings: Optional[StageTimings] = None) -> Dict[str, Any]:
+    """The k best-ranked results after `cursor`, with the next page's cursor."""
+    if timings is None:
+        timings = StageTimings()
+    selector = TopK(k + 1, decode_cursor(cursor) if cursor else None)
+    pruned = select_into(selector, conditions, products, 0, temp_f, profiles, scoring_mode, timings)
+    with timings.stage(STAGE_SORTING):
+        results, next_cursor = page_results(selector, k)
+    return {"results": results, "next_cursor": next_cursor, "pruned": pruned}
@@ -1,11 +1,50 @@
 import sqlite3
 import os
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import List, Dict, Any
+import hashlib
+import json
+import time
+from array import array
+from collections.abc import Sequence
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, PrivateAttr
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+from api.cache import LRUCache
+from api.compound_aliases import ALIAS_TABLE, DEFAULT_COMPOUND_ALIASES
+from api.compound_registry import CompoundRegistry
+from api.db_pool import ConnectionPool
+from api.executor import BlockingExecutor
+from api.metrics import (
+    METRICS,
+    STAGE_COMPOUND_RESOLUTION,
+    STAGE_THERMAL,
+    STAGE_SCORING,
+    STAGE_SORTING,
+    STAGE_SERIALIZATION,
+    StageTimings,
+    cache_collector,
+    observe_request,
+)
+from api.response_cache import RAW_ALIAS_CACHE_SIZE, RAW_KEY_STATE, ReferenceResponses
+from api.thermal_lut import ThermalLUT, ASSUMED_ACTIVE
+from api.condition_classifier import (
+    classify_conditions,
+    PROFILE_RECREATIONAL,
+    PROFILE_COGNITIVE,
+    PROFILE_SOMATIC,
+    PROFILE_ANXIETY,
+    PROFILE_CANNFLAVIN_TARGET,
+)
 
 router = APIRouter(prefix="/api/v1")
 DB_PATH = os.path.join("data", "greenforge.db")
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Per-thread read connections shared by the router and the compound registry
+DB_POOL = ConnectionPool(DB_PATH)
+# Blocking work (SQLite, scoring) runs here so the event loop stays responsive
+EXECUTOR = BlockingExecutor()
 
 
 class Compound(BaseModel):
@@ -22,11 +61,17 @@ class Product(BaseModel):
     name: str
     growStyle: str
     compounds: List[Compound]
+    _vector: Optional["CompoundVector"] = PrivateAttr(default=None)  # See product_vector()
 
 
 class RecommendationRequest(BaseModel):
     user_profile: Dict[str, Any]
     product_list: List[Product]
+    scoring_mode: str = "standard"  # "standard" (per product), "vectorized" (batch) or "parallel" (multi-process)
+    top_k: Optional[int] = None  # Only the K best-ranked products (page size with `cursor`)
+    cursor: Optional[str] = None  # next_cursor from the previous page of the same request
+    stream: bool = False  # NDJSON: one result per line, then an optional summary record
+    include_summary: bool = True  # Stream mode: end with a {"summary": ...} record
 
 
 def fahrenheit_to_celsius(fahrenheit: float) -> float:
@@ -39,67 +84,115 @@ def celsius_to_fahrenheit(celsius: float) -> float:
     return round(celsius * 1.8 + 32, 1)
 
 
-# Global cache for compound data to prevent N+1 query overhead
-COMPOUND_DATA_CACHE = {}
+# Compound tables and their corresponding types (lookup priority order)
+COMPOUND_TABLES = [
+    ("cannabinoids", "cannabinoid"),
+    ("terpenes", "terpene"),
+    ("flavonoids", "flavonoid"),
+    ("minor_cannabinoids", "minor_cannabinoid")
+]
 
-def get_compound_data(compound_name: str) -> Dict[str, Any] | None:
-    """Retrieve full compound data with internal caching and dynamic schema handling."""
-    name_upper = compound_name.upper()
-    if name_upper in COMPOUND_DATA_CACHE:
-        return COMPOUND_DATA_CACHE[name_upper]
-        
-    if not os.path.exists(DB_PATH):
-        return None
+def compound_row_to_data(row: tuple, cols: List[str], c_type: str) -> Dict[str, Any]:
+    """Map a compound table row to its metadata dict (dynamic schema handling)."""
+    data = {"name": row[0], "type": c_type}
     
-    conn = None
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Tables and their corresponding types
-        tables = [
-            ("cannabinoids", "cannabinoid"),
-            ("terpenes", "terpene"),
-            ("flavonoids", "flavonoid"),
-            ("minor_cannabinoids", "minor_cannabinoid")
-        ]
-        
-        for table, c_type in tables:
-            try:
-                # Dynamically fetch columns to handle schema variations
-                cursor.execute(f"PRAGMA table_info({table})")
-                cols = [c[1] for c in cursor.fetchall()]
-                
-                cursor.execute(f"SELECT * FROM {table} WHERE name = ? COLLATE NOCASE", (compound_name,))
-                row = cursor.fetchone()
-                
-                if row:
-                    data = {"name": row[0], "type": c_type}
-                    
-                    # Map boiling point correctly
-                    if 'boiling_point' in cols:
-                        idx = cols.index('boiling_point')
-                        if row[idx] is not None:
-                            data["boiling_point_c"] = float(row[idx])
-                            data["boiling_point_f"] = celsius_to_fahrenheit(float(row[idx]))
-                    
-                    # Map multipliers and weights
-                    if 'synergy_multiplier' in cols:
-                        data["synergy_multiplier"] = float(row[cols.index('synergy_multiplier')]) if row[cols.index('synergy_multiplier')] else 1.0
-                    elif 'potency_multiplier' in cols: # Support legacy schema
-                        data["synergy_multiplier"] = float(row[cols.index('potency_multiplier')]) if row[cols.index('potency_multiplier')] else 1.0
-                    elif 'efficacy_weight' in cols:
-                        data["efficacy_weight"] = float(row[cols.index('efficacy_weight')]) if row[cols.index('efficacy_weight')] else 1.0
-                        
-                    COMPOUND_DATA_CACHE[name_upper] = data
-                    return data
-            except (sqlite3.Error, ValueError):
-                continue
-        
-        return None
-    finally:
-        if conn:
-            conn.close()
+    # Map boiling point correctly
+    if 'boiling_point' in cols:
+        idx = cols.index('boiling_point')
+        if row[idx] is not None:
+            data["boiling_point_c"] = float(row[idx])
+            data["boiling_point_f"] = celsius_to_fahrenheit(float(row[idx]))
+    
+    # Map multipliers and weights
+    if 'synergy_multiplier' in cols:
+        data["synergy_multiplier"] = float(row[cols.index('synergy_multiplier')]) if row[cols.index('synergy_multiplier')] else 1.0
+    elif 'potency_multiplier' in cols: # Support legacy schema
+        data["synergy_multiplier"] = float(row[cols.index('potency_multiplier')]) if row[cols.index('potency_multiplier')] else 1.0
+    elif 'efficacy_weight' in cols:
+        data["efficacy_weight"] = float(row[cols.index('efficacy_weight')]) if row[cols.index('efficacy_weight')] else 1.0
+    
+    return data
+
+
+# Compound registry settings: preload every table at startup, or resolve names on
+# demand (batched per request, unknown names negatively cached) for very large DBs
+COMPOUND_REGISTRY_PRELOAD = True
+NEGATIVE_CACHE_SIZE = 4096
+NEGATIVE_CACHE_TTL = 3600.0
+
+# Compound metadata cache in front of the registry (None results are cached too)
+COMPOUND_CACHE_SIZE = 2048
+COMPOUND_CACHE_TTL = 3600.0
+RESPONSE_CACHE_SIZE = 1024                    # Encoded /recommend responses kept
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024   # Memory cap for encoded responses
+RESPONSE_CACHE_TTL = 3600.0
+
+# All compound tables bulk-loaded once and reloaded when the database changes;
+# every spelling of a compound resolves to one canonical registry key
+COMPOUND_REGISTRY = CompoundRegistry(DB_PATH, COMPOUND_TABLES, compound_row_to_data,
+                                     preload=COMPOUND_REGISTRY_PRELOAD,
+                                     negative_cache_size=NEGATIVE_CACHE_SIZE,
+                                     negative_cache_ttl=NEGATIVE_CACHE_TTL,
+                                     pool=DB_POOL,
+                                     aliases=DEFAULT_COMPOUND_ALIASES,
+                                     alias_table=ALIAS_TABLE)
+COMPOUND_CACHE = LRUCache(COMPOUND_CACHE_SIZE, COMPOUND_CACHE_TTL, name="compound_metadata")
+COMPOUND_REGISTRY.add_reload_listener(COMPOUND_CACHE.clear)
+# Whole /recommend responses (encoded JSON) keyed by recommendation_cache_key()
+RESPONSE_CACHE = LRUCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, name="recommend_responses",
+                          max_bytes=RESPONSE_CACHE_MAX_BYTES)
+# Raw request-body hash -> (response cache key, product count) (see ResponseCacheMiddleware)
+RESPONSE_ALIASES = LRUCache(RAW_ALIAS_CACHE_SIZE, RESPONSE_CACHE_TTL, name="recommend_response_aliases")
+COMPOUND_REGISTRY.add_reload_listener(RESPONSE_CACHE.clear)
+COMPOUND_REGISTRY.add_reload_listener(RESPONSE_ALIASES.clear)
+# Hit ratios of the compound and response caches, read at /metrics scrape time
+METRICS.add_collector(cache_collector([COMPOUND_CACHE, COMPOUND_REGISTRY.negative_cache,
+                                       RESPONSE_CACHE, RESPONSE_ALIASES]))
+
+
+async def current_signature():
+    """
+    Database change marker for async code. The poll (file stats, PRAGMA
+    data_version, and a reload if the database changed) runs on EXECUTOR
+    when one is due; otherwise the last polled value is returned.
+    """
+    if COMPOUND_REGISTRY.refresh_due:
+        return await EXECUTOR.run(lambda: COMPOUND_REGISTRY.source_signature)
+    return COMPOUND_REGISTRY.cached_signature
+
+
+# Pre-serialized, ETagged bodies for the reference GET endpoints
+REFERENCE_RESPONSES = ReferenceResponses(current_signature)
+
+
+def get_compound_data(compound_name: str) -> Dict[str, Any] | None:
+    """Retrieve full compound data through the bounded compound cache and registry."""
+    COMPOUND_REGISTRY.refresh()
+    return COMPOUND_CACHE.get_or_load(
+        COMPOUND_REGISTRY.canonical(compound_name), lambda: COMPOUND_REGISTRY.get(compound_name)
+    )
+
+
+def invalidate_compound(compound_name: str) -> None:
+    """Drop one compound from the metadata and negative caches (e.g. after an edit)."""
+    key = COMPOUND_REGISTRY.canonical(compound_name)
+    COMPOUND_CACHE.invalidate(key)
+    COMPOUND_REGISTRY.negative_cache.invalidate(key)
+
+
+def compound_cache_stats() -> Dict[str, Any]:
+    """Counters for sizing the compound caches."""
+    return {
+        "metadata": COMPOUND_CACHE.stats(),
+        "negative": COMPOUND_REGISTRY.negative_cache.stats(),
+        "registry_compounds": len(COMPOUND_REGISTRY),
+        "registry_version": COMPOUND_REGISTRY.version,
+    }
+
+
+def resolve_request_compounds(products: List[Product]) -> Dict[str, Dict[str, Any] | None]:
+    """Resolve every distinct compound name in a product list with one batched registry lookup."""
+    return COMPOUND_REGISTRY.resolve({name for product in products for name in product_vector(product).names})
 
 
 def apply_cultivation_modifiers(compound_name: str, compound_type: str, 
@@ -143,77 +236,32 @@ def apply_cultivation_modifiers(compound_name: str, compound_type: str,
     return modified_value
 
 
+def load_boiling_points() -> Dict[str, Tuple[Optional[float], str]]:
+    """(boiling_point_f, type) for every compound in the registry snapshot."""
+    return {
+        name: (data.get("boiling_point_f"), data["type"])
+        for name, data in COMPOUND_REGISTRY.snapshot().items()
+    }
+
+
+# Thermal availability lookup table (rebuilt when boiling points change)
+THERMAL_LUT = ThermalLUT(load_boiling_points, lambda: COMPOUND_REGISTRY.version, check_interval=0.0)
+
+
 def calculate_thermal_availability(compounds: List[Compound], temp_f: float) -> Dict[str, Any]:
     """
     Calculate thermal release efficiency based on interface temperature.
     Research: Gradual vaporization begins 36°F (20°C) below boiling point
     DEGRADATION: Cannabinoids degrade >90°F above boiling point
+    Values come from THERMAL_LUT; the returned details dicts are shared and read-only.
     """
     availability = {}
     details = {}
     
+    row = THERMAL_LUT.row(temp_f)
     for compound in compounds:
-        data = get_compound_data(compound.name)
-        if data and data.get("boiling_point_f"):
-            bp_f = data["boiling_point_f"]
-            temp_margin = temp_f - bp_f
-            
-            degradation_start_offset = 40  # Degrees F above boiling point where degradation begins
-            degradation_rate = 0.02       # Rate of availability loss per degree F above the offset
-            
-            compound_type = data.get("type")
-
-            # Handle degradation for volatile compounds (cannabinoids and terpenes)
-            if compound_type in ['cannabinoid', 'terpene'] and temp_f > bp_f + degradation_start_offset:
-                excess_heat = temp_f - (bp_f + degradation_start_offset)
-                degradation_factor = max(0.0, 1.0 - (excess_heat * degradation_rate))
-                
-                availability[compound.name] = degradation_factor
-                details[compound.name] = {
-                    "available": round(degradation_factor, 2),
-                    "boiling_point_f": bp_f,
-                    "status": "degrading",
-                    "temp_margin": round(temp_f - bp_f, 1),
-                    "warning": f"⚠️ Degrading at {round(temp_f - bp_f, 1)}°F above boiling point"
-                }
-            # If not degrading or compound type doesn't degrade this way, check other statuses
-            elif temp_f >= bp_f:
-                # Full availability above boiling point (but not overheated)
-                availability[compound.name] = 1.0
-                details[compound.name] = {
-                    "available": 1.0,
-                    "boiling_point_f": bp_f,
-                    "status": "fully_active",
-                    "temp_margin": round(temp_f - bp_f, 1)
-                }
-            elif temp_f >= (bp_f - 36):  # 36°F = 20°C gradient
-                # Partial availability within 36°F of boiling point
-                availability[compound.name] = (temp_f - (bp_f - 36)) / 36
-                details[compound.name] = {
-                    "available": round(availability[compound.name], 2),
-                    "boiling_point_f": bp_f,
-                    "status": "partially_active",
-                    "needed_temp_f": round(bp_f, 1)
-                }
-            else:
-                # Locked below threshold
-                availability[compound.name] = 0.0
-                details[compound.name] = {
-                    "available": 0.0,
-                    "boiling_point_f": bp_f,
-                    "status": "locked",
-                    "needed_temp_f": round(bp_f, 1),
-                    "deficit": round(bp_f - temp_f, 1)
-                }
-        
-        else:
-            # No boiling point data - assume available (conservative approach)
-            availability[compound.name] = 1.0
-            details[compound.name] = {
-                "available": 1.0,
-                "boiling_point_f": None,
-                "status": "assumed_active"
-            }
+        availability[compound.name], details[compound.name] = row.get(
+            COMPOUND_REGISTRY.canonical(compound.name), ASSUMED_ACTIVE)
     
     return {"availability": availability, "details": details}
 
@@ -223,8 +271,11 @@ def calculate_entourage_effect(compounds: List[Compound], availability: Dict[str
     Calculate synergy bonus from multiple active compounds.
     Research: Multi-compound profiles enhance efficacy via entourage effect
     """
-    active_compounds = sum(1 for c in compounds if availability.get(c.name, 0) > 0.5)
-    
+    return entourage_effect(sum(1 for c in compounds if availability.get(c.name, 0) > 0.5))
+
+
+def entourage_effect(active_compounds: int) -> Dict[str, Any]:
+    """Entourage synergy for a number of thermally active compounds."""
     # Base synergy: 2 compounds = 1.1x, 3 = 1.2x, 4 = 1.3x, etc.
     if active_compounds >= 2:
         multiplier = 1.0 + (active_compounds - 1) * 0.1
@@ -282,37 +333,349 @@ def get_thermal_safety_zone(temp_f: float) -> Dict[str, Any]:
         }
 
 
+# Compounds contributing to each clinical profile signal (uppercased names)
+COGNITIVE_COMPOUNDS = ['THCV', 'ALPHA-PINENE', 'PINENE', 'LIMONENE']
+SOMATIC_COMPOUNDS = ['CBD', 'CBN', 'CBG', 'MYRCENE', 'CARYOPHYLLENE', 'Β-CARYOPHYLLENE']
+ANXIETY_COMPOUNDS = ['CBD', 'LINALOOL', 'LIMONENE', 'MYRCENE', 'CBN', 'APIGENIN']
+
+# Grow styles that earn the flavonoid bonus when Cannflavin A is active
+CANNFLAVIN_BONUS_STYLES = ['soil', 'living_soil', 'organic']
+
+
+def empty_match(temp_f: float) -> Dict[str, Any]:
+    """Result package for a product that cannot be scored (same keys as a scored one)."""
+    return {
+        "score": 0.0,
+        "breakdown": {"error": "Missing inputs"},
+        "warnings": ["Empty request"],
+        "thermal_details": {},
+        "safety_zone": get_thermal_safety_zone(temp_f),
+        "cultivation_modifiers_applied": False
+    }
+
+
+# Scoring traits of a compound name (see CompoundTraits)
+TRAIT_COGNITIVE = 1
+TRAIT_SOMATIC = 2
+TRAIT_ANXIETY = 4
+TRAIT_CANNFLAVIN = 8
+TRAIT_THC = 16
+# Grow styles with cached cultivation factors before the trait cache starts over
+TRAIT_MAX_GROW_STYLES = 64
+
+CompoundTrait = Tuple[str, int, float]  # (canonical registry key, TRAIT_* flags, cultivation factor)
+
+
+class CompoundVector:
+    """
+    Compact compound list of one product: registry-interned IDs, amounts as
+    a float64 array (so scores stay bit-identical) and the request spellings,
+    which remain the keys of thermal_details. `ids` is None when the intern
+    table is full; traits are then computed per call.
+    """
+
+    __slots__ = ("ids", "vals", "names")
+
+    def __init__(self, ids: Optional[array], vals: array, names: Tuple[str, ...]):
+        self.ids = ids
+        self.vals = vals
+        self.names = names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __reduce__(self):
+        # IDs only mean something in this process: pickled products repack on first use
+        return type(None), ()
+
+
+class CompoundList(Sequence):
+    """
+    Read-only List[Compound] over packed names and amounts, used as
+    Product.compounds by the bulk ingestion path. Compound models are only
+    built when an item is read; the engine packs straight from the arrays.
+    """
+
+    __slots__ = ("names", "vals")
+
+    def __init__(self, names: Tuple[str, ...], vals: array):
+        self.names = names
+        self.vals = vals
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Compound.model_construct(name=name, val=val)
+                    for name, val in zip(self.names[index], self.vals[index])]
+        return Compound.model_construct(name=self.names[index], val=self.vals[index])
+
+    def __reduce__(self):
+        return type(self), (self.names, self.vals)
+
+
+def pack_compounds(compounds: Union[List[Compound], CompoundList]) -> CompoundVector:
+    """Intern a compound list into a CompoundVector."""
+    if isinstance(compounds, CompoundList):
+        names, vals = compounds.names, compounds.vals
+    else:
+        names, vals = tuple(c.name for c in compounds), array('d', [c.val for c in compounds])
+    ids = [COMPOUND_REGISTRY.intern(name) for name in names]
+    return CompoundVector(None if None in ids else array('l', ids), vals, names)
+
+
+def product_vector(product: Product) -> CompoundVector:
+    """The product's CompoundVector, packed once and kept on the model (compounds are treated as immutable)."""
+    vector = product._vector
+    if vector is None:
+        vector = product._vector = pack_compounds(product.compounds)
+    return vector
+
+
+def _in_group(key: str, names: List[str]) -> bool:
+    return any(COMPOUND_REGISTRY.canonical(n) == key for n in names)
+
+
+def compound_trait(name: str, grow_style: str) -> CompoundTrait:
+    """
+    Everything compile_product needs to know about a compound besides its
+    amount and availability. The name is resolved to its canonical compound
+    once here; group membership and cultivation modifiers use that identity.
+    """
+    key = COMPOUND_REGISTRY.canonical(name)
+    data = get_compound_data(name)
+    c_type = data.get("type", "unknown") if data else "unknown"
+    canonical_name = data.get("name", name) if data else name
+    flags = ((TRAIT_COGNITIVE if _in_group(key, COGNITIVE_COMPOUNDS) else 0)
+             | (TRAIT_SOMATIC if _in_group(key, SOMATIC_COMPOUNDS) else 0)
+             | (TRAIT_ANXIETY if _in_group(key, ANXIETY_COMPOUNDS) else 0)
+             | (TRAIT_CANNFLAVIN if 'cannflavin' in canonical_name.lower() else 0)
+             | (TRAIT_THC if key == 'THC' else 0))
+    # Modifiers apply a single multiplication, so factor * val equals the modified value
+    return key, flags, apply_cultivation_modifiers(canonical_name, c_type, grow_style, 1.0)
+
+
+class CompoundTraits:
+    """
+    compound_trait() results per grow style, in lists indexed by interned ID.
+    Cleared on every registry reload (types and boiling points may change).
+    """
+
+    def __init__(self):
+        self._by_grow: Dict[str, List[Optional[CompoundTrait]]] = {}
+
+    def clear(self) -> None:
+        self._by_grow = {}
+
+    def resolve(self, vector: CompoundVector, grow_style: str) -> List[CompoundTrait]:
+        """Traits for each compound of the vector, in order."""
+        if vector.ids is None:
+            return [compound_trait(name, grow_style) for name in vector.names]
+        by_grow = self._by_grow
+        table = by_grow.get(grow_style)
+        if table is None:
+            if len(by_grow) >= TRAIT_MAX_GROW_STYLES:
+                by_grow = self._by_grow = {}
+            table = by_grow[grow_style] = []
+        traits = []
+        for compound_id, name in zip(vector.ids, vector.names):
+            if compound_id >= len(table):
+                table.extend([None] * (compound_id + 1 - len(table)))
+            trait = table[compound_id]
+            if trait is None:
+                trait = table[compound_id] = compound_trait(name, grow_style)
+            traits.append(trait)
+        return traits
+
+
+COMPOUND_TRAITS = CompoundTraits()
+COMPOUND_REGISTRY.add_reload_listener(COMPOUND_TRAITS.clear)
+
+
+def compile_product(compounds: Union[List[Compound], CompoundVector], temp_f: float,
+                    grow_style: str, timings: Optional[StageTimings] = None) -> Dict[str, Any]:
+    """
+    Condition-independent aggregates for one product at one temperature.
+    Cultivation-modified values, per-profile signals, THC, the thermal gate and
+    the entourage multiplier are computed once so each condition is O(1).
+    Works on the product's CompoundVector (a plain compound list is packed
+    first): names are only hashed for the thermal row and the output keys.
+    The thermal lookups are added to `timings`, when given.
+    """
+    vector = compounds if isinstance(compounds, CompoundVector) else pack_compounds(compounds)
+    traits = COMPOUND_TRAITS.resolve(vector, grow_style)
+    
+    started = time.perf_counter() if timings is not None else 0.0
+    row = THERMAL_LUT.row(temp_f)
+    thermal = [row.get(key, ASSUMED_ACTIVE) for key, _, _ in traits]
+    if timings is not None:
+        timings.add(STAGE_THERMAL, time.perf_counter() - started)
+    
+    thc = 0.0
+    details = {}
+    
+    # Profile signals (accumulated in compound order, as the per-condition loops did)
+    cognitive_signal = 0.0
+    somatic_signal = 0.0
+    somatic_cannflavin_signal = 0.0
+    anxiety_signal = 0.0
+    general_signal = 0.0
+    other_total = 0.0
+    active_count = 0
+    locked = False
+    cannflavin_entries = []
+    
+    for name, val, (_, flags, factor), (avail, detail) in zip(vector.names, vector.vals, traits, thermal):
+        details[name] = detail
+        weighted = val * factor * avail
+        general_signal += weighted
+        
+        if flags & TRAIT_COGNITIVE:
+            cognitive_signal += weighted
+        if flags & TRAIT_SOMATIC:
+            somatic_signal += weighted
+            somatic_cannflavin_signal += weighted
+        if flags & TRAIT_ANXIETY:
+            anxiety_signal += weighted
+        
+        # Cannflavin A research check (raw value, applies to pain/inflammation only)
+        if flags & TRAIT_CANNFLAVIN:
+            if avail > 0:
+                somatic_cannflavin_signal += val * avail * 5.0
+                cannflavin_entries.append((True, None))
+            else:
+                cannflavin_entries.append((False, detail.get("boiling_point_f", 0)))
+        
+        if flags & TRAIT_THC:
+            thc = val
+        else:
+            other_total += val
+        if avail > 0.5:
+            active_count += 1
+        # Global Thermal Gate Penalty
+        elif avail < 0.5 and val > 0.5:
+            locked = True
+    
+    return {
+        "thc": thc,
+        "cognitive_signal": cognitive_signal,
+        "somatic_signal": somatic_signal,
+        "somatic_cannflavin_signal": somatic_cannflavin_signal,
+        "anxiety_signal": anxiety_signal,
+        "general_signal": general_signal * 3,
+        "cannflavin_entries": cannflavin_entries,
+        "cannflavin_active": any(active for active, _ in cannflavin_entries),
+        "soil_grown": grow_style.lower() in CANNFLAVIN_BONUS_STYLES,
+        "thermal_mult": 0.8 if locked else 1.0,
+        "entourage": entourage_effect(active_count),
+        "market_reality": thc > 25 and other_total < 2.0,
+        "thermal_details": details
+    }
+
+
+def evaluate_condition(product: Dict[str, Any], condition: Condition, profile: int,
+                       warnings: List[str]) -> Tuple[float, Dict[str, Any]]:
+    """
+    Score one condition against a compiled product.
+    Returns (condition_score, profile_details) and appends any warnings.
+    """
+    # Check for recreational intent
+    if profile & PROFILE_RECREATIONAL:
+        return 100.0, {"score": 100.0, "mode": "recreational"}
+    
+    thc = product["thc"]
+    
+    # Clinical Profile Matching (Independent Checks for Overlap)
+    applicable_scores = []
+    profile_details = {}
+    
+    # 1. Cognitive Profile
+    if profile & PROFILE_COGNITIVE:
+        signal = product["cognitive_signal"]
+        penalty = max(0, (thc - 10) * 3.0)
+        score = (signal * 40) - penalty
+        applicable_scores.append(score)
+        profile_details["cognitive"] = {"signal": round(signal, 2), "penalty": round(penalty, 1)}
+        if thc > 20:
+            warnings.append(f"⚠️ High THC ({thc}%) may impair focus for {condition.name}")
+
+    # 2. Somatic Profile (Pain, Sleep, Inflammation)
+    if profile & PROFILE_SOMATIC:
+        therapeutic_signal = product["somatic_signal"]
+        cannflavin_boost = 1.0
+        
+        if profile & PROFILE_CANNFLAVIN_TARGET:
+            therapeutic_signal = product["somatic_cannflavin_signal"]
+            if product["cannflavin_active"]:
+                cannflavin_boost = 30.0
+            for active, bp in product["cannflavin_entries"]:
+                if active:
+                    warnings.append(f"✓ Cannflavin A active (30x potency) for {condition.name}")
+                else:
+                    warnings.append(f"🔒 Cannflavin A locked (needs {bp}°F) for {condition.name}")
+        
+        f_bonus = 1.3 if product["soil_grown"] and cannflavin_boost > 1.0 else 1.0
+        score = ((therapeutic_signal * 8) + (thc * 1.2)) * f_bonus * cannflavin_boost
+        applicable_scores.append(score)
+        profile_details["somatic"] = {"signal": round(therapeutic_signal, 2), "boost": cannflavin_boost}
+
+    # 3. Anxiety Profile
+    if profile & PROFILE_ANXIETY:
+        calming_signal = product["anxiety_signal"]
+        thc_anxiety_penalty = max(0, (thc - 5) * 2.0)
+        score = (calming_signal * 15) - thc_anxiety_penalty
+        applicable_scores.append(score)
+        profile_details["anxiety"] = {"signal": round(calming_signal, 2), "penalty": round(thc_anxiety_penalty, 1)}
+        if thc > 15:
+            warnings.append(f"⚠️ High THC ({thc}%) may exacerbate anxiety for {condition.name}")
+
+    # Final Score Calculation for this Condition
+    if not applicable_scores:
+        # General wellness if no specific profile matched
+        condition_score = product["general_signal"]
+        profile_details["mode"] = "general_wellness"
+    else:
+        # Average score from all matching profiles
+        condition_score = sum(applicable_scores) / len(applicable_scores)
+        profile_details["mode"] = "integrated_clinical"
+
+    # Apply Global Thermal Gate Penalty and Entourage Synergy
+    condition_score *= product["thermal_mult"]
+    condition_score *= product["entourage"]["multiplier"]
+    
+    profile_details["score"] = round(condition_score, 1)
+    return condition_score, profile_details
+
+
 def calculate_quantum_match(
     conditions: List[Condition], 
-    compounds: List[Compound], 
+    compounds: Union[List[Compound], CompoundVector], 
     temp_f: float,
-    grow_style: str
+    grow_style: str,
+    profiles: Optional[List[int]] = None,
+    timings: Optional[StageTimings] = None
 ) -> Dict[str, Any]:
     """
     Integrated pharmacognosy engine with multi-profile condition matching.
+    `profiles` are the classify_conditions() bit sets for `conditions`; callers
+    scoring many products should resolve them once and pass them in, along
+    with product_vector(product) as `compounds`. `timings` collects the
+    thermal stage for request metrics.
     """
     
     if not compounds or not conditions:
-        return {
-            "score": 0.0,
-            "breakdown": {"error": "Missing inputs"},
-            "warnings": ["Empty request"],
-            "thermal_details": {}
-        }
+        return empty_match(temp_f)
     
-    # Pre-fetch compound metadata to fix type-casting bugs and avoid redundant DB calls
-    compound_metadata = {}
-    for c in compounds:
-        data = get_compound_data(c.name)
-        compound_metadata[c.name.upper()] = data.get("type", "unknown") if data else "unknown"
+    return match_compiled(conditions, compile_product(compounds, temp_f, grow_style, timings), temp_f, profiles)
 
-    compound_dict = {c.name.upper(): c.val for c in compounds}
-    thc = compound_dict.get('THC', 0.0)
-    
-    # Calculate thermal availability
-    thermal_data = calculate_thermal_availability(compounds, temp_f)
-    availability = thermal_data["availability"]
-    
+
+def match_compiled(conditions: List[Condition], product: Dict[str, Any], temp_f: float,
+                   profiles: Optional[List[int]] = None) -> Dict[str, Any]:
+    """
+    calculate_quantum_match for a product already compiled at temp_f, so one
+    compile_product() result can be scored against many condition sets.
+    """
     # Process all conditions (weighted by severity)
     total_score = 0.0
     total_weight = 0.0
@@ -324,249 +687,275 @@ def calculate_quantum_match(
     if safety["warnings"]:
         warnings.extend(safety["warnings"])
     
-    for condition in conditions:
-        cond_name = condition.name.lower()
-        severity = condition.severity
-        
-        # Check for recreational intent
-        rec_goals = ["blitzed", "high", "stoned", "faded", "blasted", "get high"]
-        if any(goal in cond_name for goal in rec_goals):
-            total_score += 100.0 * severity
-            total_weight += severity
-            breakdown[condition.name] = {"score": 100.0, "mode": "recreational"}
-            continue
-        
-        # Clinical Profile Matching (Independent Checks for Overlap)
-        applicable_scores = []
-        profile_details = {}
-        
-        # 1. Cognitive Profile
-        cognitive_needs = ["adhd", "focus", "clarity", "studying", "concentration", "memory"]
-        if any(need in cond_name for need in cognitive_needs):
-            signal = 0.0
-            for c in compounds:
-                if c.name.upper() in ['THCV', 'ALPHA-PINENE', 'PINENE', 'LIMONENE']:
-                    c_type = compound_metadata.get(c.name.upper(), "terpene")
-                    modified_val = apply_cultivation_modifiers(c.name, c_type, grow_style, c.val)
-                    signal += modified_val * availability.get(c.name, 1.0)
-            
-            penalty = max(0, (thc - 10) * 3.0)
-            score = (signal * 40) - penalty
-            applicable_scores.append(score)
-            profile_details["cognitive"] = {"signal": round(signal, 2), "penalty": round(penalty, 1)}
-            if thc > 20:
-                warnings.append(f"⚠️ High THC ({thc}%) may impair focus for {condition.name}")
-
-        # 2. Somatic Profile (Pain, Sleep, Inflammation)
-        somatic_needs = ["sleep", "insomnia", "pain", "inflammation", "nerve", "neuropathic", "migraine"]
-        if any(need in cond_name for need in somatic_needs):
-            therapeutic_signal = 0.0
-            cannflavin_boost = 1.0
-            
-            for c in compounds:
-                name_u = c.name.upper()
-                c_type = compound_metadata.get(name_u, "unknown")
-                
-                if name_u in ['CBD', 'CBN', 'CBG', 'MYRCENE', 'CARYOPHYLLENE', 'Β-CARYOPHYLLENE']:
-                    modified_val = apply_cultivation_modifiers(c.name, c_type, grow_style, c.val)
-                    therapeutic_signal += modified_val * availability.get(c.name, 1.0)
-                
-                # Cannflavin A research check
-                if 'cannflavin' in c.name.lower() and ('pain' in cond_name or 'inflammation' in cond_name):
-                    avail = availability.get(c.name, 0.0)
-                    if avail > 0:
-                        cannflavin_boost = 30.0
-                        therapeutic_signal += c.val * avail * 5.0
-                        warnings.append(f"✓ Cannflavin A active (30x potency) for {condition.name}")
-                    else:
-                        bp = thermal_data["details"].get(c.name, {}).get("boiling_point_f", 0)
-                        warnings.append(f"🔒 Cannflavin A locked (needs {bp}°F) for {condition.name}")
-            
-            f_bonus = 1.3 if grow_style.lower() in ['soil', 'living_soil', 'organic'] and cannflavin_boost > 1.0 else 1.0
-            score = ((therapeutic_signal * 8) + (thc * 1.2)) * f_bonus * cannflavin_boost
-            applicable_scores.append(score)
-            profile_details["somatic"] = {"signal": round(therapeutic_signal, 2), "boost": cannflavin_boost}
-
-        # 3. Anxiety Profile
-        anxiety_needs = ["anxiety", "stress", "panic", "worry"]
-        if any(need in cond_name for need in anxiety_needs):
-            calming_signal = 0.0
-            for c in compounds:
-                if c.name.upper() in ['CBD', 'LINALOOL', 'LIMONENE', 'MYRCENE', 'CBN', 'APIGENIN']:
-                    c_type = compound_metadata.get(c.name.upper(), "unknown")
-                    modified_val = apply_cultivation_modifiers(c.name, c_type, grow_style, c.val)
-                    calming_signal += modified_val * availability.get(c.name, 1.0)
-            
-            thc_anxiety_penalty = max(0, (thc - 5) * 2.0)
-            score = (calming_signal * 15) - thc_anxiety_penalty
-            applicable_scores.append(score)
-            profile_details["anxiety"] = {"signal": round(calming_signal, 2), "penalty": round(thc_anxiety_penalty, 1)}
-            if thc > 15:
-                warnings.append(f"⚠️ High THC ({thc}%) may exacerbate anxiety for {condition.name}")
-
-        # Final Score Calculation for this Condition
-        if not applicable_scores:
-            # General wellness if no specific profile matched
-            condition_score = sum(
-                apply_cultivation_modifiers(c.name, compound_metadata.get(c.name.upper(), "cannabinoid"), grow_style, c.val) * 
-                availability.get(c.name, 1.0) 
-                for c in compounds
-            ) * 3
-            profile_details["mode"] = "general_wellness"
-        else:
-            # Average score from all matching profiles
-            condition_score = sum(applicable_scores) / len(applicable_scores)
-            profile_details["mode"] = "integrated_clinical"
-
-        # Apply Global Thermal Gate Penalty
-        locked = [f"{c.name}" for c in compounds if availability.get(c.name, 1.0) < 0.5 and c.val > 0.5]
-        thermal_mult = 0.8 if locked else 1.0
-        condition_score *= thermal_mult
-        
-        # Apply Entourage Synergy
-        entourage = calculate_entourage_effect(compounds, availability)
-        condition_score *= entourage["multiplier"]
-        
-        profile_details["score"] = round(condition_score, 1)
-        breakdown[condition.name] = profile_details
+    if profiles is None:
+        profiles = classify_conditions(conditions)
+    
+    for condition, profile in zip(conditions, profiles):
+        condition_score, breakdown[condition.name] = evaluate_condition(product, condition, profile, warnings)
         
         # Weight by Severity
-        total_score += condition_score * severity
-        total_weight += severity
+        total_score += condition_score * condition.severity
+        total_weight += condition.severity
     
     # Final Result
     final_score = round(min(100.0, max(0.0, total_score / total_weight)), 1) if total_weight > 0 else 0.0
     
     # Market reality check
-    if thc > 25 and sum(c.val for c in compounds if c.name.upper() != 'THC') < 2.0:
+    if product["market_reality"]:
         warnings.append("⚠️ MARKET REALITY: High THC, low therapeutic compound profile")
     
     return {
         "score": final_score,
         "breakdown": breakdown,
         "warnings": list(set(warnings)), # Deduplicate warnings
-        "thermal_details": thermal_data["details"],
+        "thermal_details": product["thermal_details"],
         "safety_zone": safety,
         "cultivation_modifiers_applied": True
     }
 
+
+def validate_recommendation_request(data: RecommendationRequest) -> Optional[str]:
+    """Error message for an unusable request, or None."""
+    if 'interface_temp' not in data.user_profile:
+        return "Missing interface_temp in user_profile"
     
-    # Calculate final weighted score
-    final_score = (total_score / total_weight) if total_weight > 0 else 0.0
-    final_score = round(min(100.0, max(0.0, final_score)), 1)
+    if 'conditions' not in data.user_profile or not data.user_profile['conditions']:
+        return "Missing conditions in user_profile"
     
-    # Market reality check
-    if thc > 25 and sum(c.val for c in compounds if c.name.upper() != 'THC') < 2.0:
-        warnings.append("⚠️ MARKET REALITY: High THC, low therapeutic compound profile")
+    if data.scoring_mode not in ("standard", "vectorized", "parallel"):
+        return f"Unknown scoring_mode '{data.scoring_mode}'"
+    
+    if data.top_k is not None and data.top_k <= 0:
+        return "top_k must be positive"
+    
+    if data.cursor is not None:
+        from api.ranking import decode_cursor
+        if data.top_k is None:
+            return "cursor requires top_k"
+        if decode_cursor(data.cursor) is None:
+            return "Invalid cursor"
+    
+    return None
+
+
+def score_analyses(conditions: List[Condition], products: List[Product], temp_f: float,
+                   profiles: List[int], scoring_mode: str, timings: Optional[StageTimings] = None):
+    """
+    Per-product analyses, in product order, from the selected scoring engine.
+    With `timings`, compound resolution and the thermal lookups are recorded
+    (the latter not in parallel mode, where they run in worker processes).
+    """
+    # Resolve all compound metadata up front so scoring never touches SQLite
+    started = time.perf_counter()
+    resolve_request_compounds(products)
+    if timings is not None:
+        timings.add(STAGE_COMPOUND_RESOLUTION, time.perf_counter() - started)
+    
+    # Score the whole inventory as one products × compounds matrix in batch mode
+    if scoring_mode == "vectorized":
+        from api.batch_scoring import score_products_vectorized
+        return score_products_vectorized(conditions, products, temp_f, profiles, timings=timings)
+    # Split very large lists into chunks scored across worker processes
+    if scoring_mode == "parallel":
+        from api.parallel_scoring import PARALLEL_SCORER
+        return PARALLEL_SCORER.score(conditions, products, temp_f, profiles)
+    return (
+        calculate_quantum_match(conditions, product_vector(product), temp_f, product.growStyle, profiles, timings)
+        for product in products
+    )
+
+
+def build_result(product: Product, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """One ranked entry of the /recommend response."""
+    # Count available compounds
+    thermal_details = analysis.get("thermal_details", {})
+    compounds_available = sum(
+        1 for detail in thermal_details.values() 
+        if detail.get("available", 0) > 0.5
+    )
     
     return {
-        "score": final_score,
-        "breakdown": breakdown,
-        "warnings": warnings,
-        "thermal_details": thermal_data["details"],
-        "safety_zone": safety,
-        "cultivation_modifiers_applied": True
+        "product": product.name,
+        "matchScore": analysis["score"],
+        "growStyle": product.growStyle,
+        "analysis": analysis["breakdown"],
+        "warnings": analysis["warnings"],
+        "thermal_details": thermal_details,
+        "safety_zone": analysis["safety_zone"],
+        "compounds_available": compounds_available,
+        "compounds_total": len(product.compounds)
     }
 
 
-@router.post("/recommend")
-async def get_recommendations(data: RecommendationRequest):
-    """Generate product recommendations with full pharmacognosy analysis."""
+def recommendation_summary(temp_f: float, conditions: List[Condition]) -> Dict[str, Any]:
+    """Request-level fields returned alongside the results."""
+    return {
+        "interface_temp_f": temp_f,
+        "interface_temp_c": fahrenheit_to_celsius(temp_f),
+        "conditions_analyzed": [c.name for c in conditions],
+        "research_version": "v2.0-pharmacognosy"
+    }
+
+
+def build_recommendations(data: RecommendationRequest, timings: Optional[StageTimings] = None) -> Dict[str, Any]:
+    """
+    Score and rank every product for a request (blocking; run via EXECUTOR).
+    Engine stage times are added to `timings`, when given.
+    """
     
     # Validate input
-    if 'interface_temp' not in data.user_profile:
-        return {"error": "Missing interface_temp in user_profile", "results": []}
-    
-    if 'conditions' not in data.user_profile or not data.user_profile['conditions']:
-        return {"error": "Missing conditions in user_profile", "results": []}
+    error = validate_recommendation_request(data)
+    if error:
+        return {"error": error, "results": []}
     
     # Temperature is in Fahrenheit
     temp_f = float(data.user_profile['interface_temp'])
     conditions = [Condition(**c) for c in data.user_profile['conditions']]
+    profiles = classify_conditions(conditions)
     
-    # Generate recommendations
-    results = []
-    for product in data.product_list:
-        analysis = calculate_quantum_match(
-            conditions, 
-            product.compounds, 
-            temp_f,
-            product.growStyle
-        )
-        
-        # Count available compounds
-        thermal_details = analysis.get("thermal_details", {})
-        compounds_available = sum(
-            1 for detail in thermal_details.values() 
-            if detail.get("available", 0) > 0.5
-        )
-        
-        results.append({
-            "product": product.name,
-            "matchScore": analysis["score"],
-            "growStyle": product.growStyle,
-            "analysis": analysis["breakdown"],
-            "warnings": analysis["warnings"],
-            "thermal_details": thermal_details,
-            "safety_zone": analysis["safety_zone"],
-            "compounds_available": compounds_available,
-            "compounds_total": len(product.compounds)
-        })
+    # Heap selection (with upper-bound pruning) when only the best K are wanted
+    if data.top_k is not None:
+        from api.ranking import select_top_k
+        page = select_top_k(conditions, data.product_list, temp_f, profiles,
+                            data.scoring_mode, data.top_k, data.cursor, timings)
+        return {"results": page["results"], **recommendation_summary(temp_f, conditions),
+                "next_cursor": page["next_cursor"]}
+    
+    if timings is None:
+        timings = StageTimings()  # Not reported; keeps the stage bookkeeping unconditional
+    
+    # Generate recommendations (resolution and thermal lookups are recorded as their own stages)
+    with timings.stage(STAGE_SCORING):
+        analyses = score_analyses(conditions, data.product_list, temp_f, profiles, data.scoring_mode, timings)
+        results = [build_result(product, analysis) for product, analysis in zip(data.product_list, analyses)]
     
     # Sort by match score
-    results.sort(key=lambda x: x['matchScore'], reverse=True)
+    with timings.stage(STAGE_SORTING):
+        results.sort(key=lambda x: x['matchScore'], reverse=True)
     
-    return {
-        "results": results,
-        "interface_temp_f": temp_f,
-        "interface_temp_c": fahrenheit_to_celsius(temp_f),
-        "conditions_analyzed": [c.name for c in conditions],
-        "research_version": "v2.0-pharmacognosy"
+    return {"results": results, **recommendation_summary(temp_f, conditions)}
+
+
+async def respond_recommendations(data: RecommendationRequest):
+    """JSON or NDJSON response for a recommendation request."""
+    if data.stream:
+        error = validate_recommendation_request(data)
+        if error:
+            return {"error": error, "results": []}
+        from api.streaming import stream_recommendations
+        observe_request(len(data.product_list))
+        return StreamingResponse(stream_recommendations(data, EXECUTOR), media_type=NDJSON_MEDIA_TYPE)
+    timings = StageTimings()
+    result = await EXECUTOR.run(build_recommendations, data, timings)
+    observe_request(len(data.product_list), timings)
+    return result
+
+
+def recommendation_cache_key(data: RecommendationRequest) -> Optional[str]:
+    """
+    Canonical hash of everything that shapes a /recommend response, or None
+    when the request cannot be cached. Dict key order, unused user_profile
+    fields and the temperature's spelling (380, 380.0, "380") are
+    normalized away; condition, product and compound order are kept because
+    they decide breakdown, thermal_details and tie order in the response.
+    """
+    try:
+        temp_f = float(data.user_profile['interface_temp'])
+        conditions = [Condition(**c) for c in data.user_profile['conditions']]
+    except (KeyError, TypeError, ValueError):
+        return None
+    canonical = [
+        temp_f,
+        [[c.name, c.severity] for c in conditions],
+        data.scoring_mode,
+        data.top_k,
+        data.cursor,
+    ]
+    digest = hashlib.sha256(json.dumps(canonical, separators=(",", ":")).encode())
+    # Products hash from their packed form, so bulk-ingested requests share keys
+    for product in data.product_list:
+        vector = product_vector(product)
+        digest.update(json.dumps([product.name, product.growStyle, vector.names]).encode())
+        digest.update(vector.vals.tobytes())
+    return digest.hexdigest()
+
+
+async def respond_cached(data: RecommendationRequest, request: Request,
+                         response_class: type = JSONResponse) -> Response:
+    """Non-streaming /recommend response, served from and stored in the response cache."""
+    # Serve repeated requests from the response cache (cleared on DB change)
+    source = await current_signature()
+    key = await EXECUTOR.run(recommendation_cache_key, data)
+    raw_key = request.scope.get("state", {}).get(RAW_KEY_STATE)
+    body = RESPONSE_CACHE.get(key) if key else None
+    if body is not None:
+        if raw_key:
+            RESPONSE_ALIASES.put(raw_key, (key, len(data.product_list)))
+        observe_request(len(data.product_list))
+        return Response(body, media_type="application/json", headers={"X-Cache": "HIT"})
+    
+    timings = StageTimings()
+    result = await EXECUTOR.run(build_recommendations, data, timings)
+    with timings.stage(STAGE_SERIALIZATION):
+        response = response_class(result, headers={"X-Cache": "MISS" if key else "BYPASS"})
+    observe_request(len(data.product_list), timings)
+    # Skip errors, and results computed across a DB change
+    if key and "error" not in result and await current_signature() == source:
+        RESPONSE_CACHE.put(key, response.body)
+        if raw_key:
+            RESPONSE_ALIASES.put(raw_key, (key, len(data.product_list)))
+    return response
+
+
+@router.post("/recommend")
+async def get_recommendations(data: RecommendationRequest, request: Request):
+    """Generate product recommendations with full pharmacognosy analysis."""
+    if data.stream:
+        return await respond_recommendations(data)
+    return await respond_cached(data, request)
+
+
+def fetch_compounds() -> Dict[str, Any]:
+    """All compounds grouped by table (blocking; run via EXECUTOR)."""
+    conn = DB_POOL.connection()
+    if conn is None:
+        return {"error": "Database not found"}
+    
+    cursor = conn.cursor()
+    
+    compounds = {
+        "cannabinoids": [],
+        "terpenes": [],
+        "flavonoids": [],
+        "minor_cannabinoids": []
     }
+    
+    for table in compounds.keys():
+        try:
+            cursor.execute(f"SELECT name, boiling_point FROM {table} ORDER BY name")
+            rows = cursor.fetchall()
+            compounds[table] = [
+                {
+                    "name": row[0], 
+                    "boiling_point_f": celsius_to_fahrenheit(row[1]),
+                    "boiling_point_c": row[1]
+                }
+                for row in rows
+            ]
+        except sqlite3.Error:
+            pass
+    
+    return compounds
 
 
 @router.get("/compounds")
-async def list_compounds():
+async def list_compounds(request: Request):
     """List all available compounds in the database."""
-    if not os.path.exists(DB_PATH):
-        return {"error": "Database not found"}
-    
-    conn = None
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        compounds = {
-            "cannabinoids": [],
-            "terpenes": [],
-            "flavonoids": [],
-            "minor_cannabinoids": []
-        }
-        
-        for table in compounds.keys():
-            try:
-                cursor.execute(f"SELECT name, boiling_point FROM {table} ORDER BY name")
-                rows = cursor.fetchall()
-                compounds[table] = [
-                    {
-                        "name": row[0], 
-                        "boiling_point_f": celsius_to_fahrenheit(row[1]),
-                        "boiling_point_c": row[1]
-                    }
-                    for row in rows
-                ]
-            except sqlite3.Error:
-                pass
-        
-        return compounds
-    finally:
-        if conn:
-            conn.close()
+    return await REFERENCE_RESPONSES.respond(request, "compounds", fetch_compounds, EXECUTOR)
 
 
-@router.get("/thermal-zones")
-async def get_thermal_zones():
-    """Return all thermal activation zones with safety information."""
+def thermal_zones_payload() -> Dict[str, Any]:
+    """Thermal activation zones with safety information."""
     zones = [
         {
             "name": "A - Flavor/Cerebral",
@@ -607,88 +996,101 @@ async def get_thermal_zones():
     return {"zones": zones, "research_citation": "Cannabis Biosynthesis PDF"}
 
 
+@router.get("/thermal-zones")
+async def get_thermal_zones(request: Request):
+    """Return all thermal activation zones with safety information."""
+    return await REFERENCE_RESPONSES.respond(request, "thermal-zones", thermal_zones_payload)
+
+
+# product_catalog columns, in the order catalog_row_to_compounds expects
+CATALOG_COLUMNS = """strain_name, grow_style, archetype, thc, cbd, thcv, cbg, cbn,
+               terpene_1, terpene_1_val, terpene_2, terpene_2_val, 
+               terpene_3, terpene_3_val, cannflavin_a, vsc_present"""
+
+
+def catalog_row_to_compounds(row: tuple) -> List[Dict[str, Any]]:
+    """Compound list ({"name", "val"}) for one product_catalog row."""
+    # Build compound list from row data
+    compounds = []
+    
+    # Add cannabinoids
+    if row[3] > 0: compounds.append({"name": "THC", "val": row[3]})
+    if row[4] > 0: compounds.append({"name": "CBD", "val": row[4]})
+    if row[5] > 0: compounds.append({"name": "THCV", "val": row[5]})
+    if row[6] > 0: compounds.append({"name": "CBG", "val": row[6]})
+    if row[7] > 0: compounds.append({"name": "CBN", "val": row[7]})
+    
+    # Add terpenes
+    if row[9] > 0: compounds.append({"name": row[8], "val": row[9]})
+    if row[11] > 0: compounds.append({"name": row[10], "val": row[11]})
+    if row[13] > 0: compounds.append({"name": row[12], "val": row[13]})
+    
+    # Add cannflavin if present
+    if row[14] > 0: compounds.append({"name": "Cannflavin A", "val": row[14]})
+    
+    return compounds
+
+
+def fetch_strain_variants(strain_name: str) -> Dict[str, Any]:
+    """Grow context variants for one strain (blocking; run via EXECUTOR)."""
+    conn = DB_POOL.connection()
+    if conn is None:
+        return {"error": "Database not found"}
+    
+    cursor = conn.cursor()
+    
+    cursor.execute(f"""
+        SELECT {CATALOG_COLUMNS}
+        FROM product_catalog 
+        WHERE strain_name = ? COLLATE NOCASE
+    """, (strain_name,))
+    
+    rows = cursor.fetchall()
+    
+    if not rows:
+        return {"error": f"Strain '{strain_name}' not found in Phase 1 library"}
+    
+    variants = []
+    for row in rows:
+        variants.append({
+            "strain_name": row[0],
+            "grow_style": row[1],
+            "archetype": row[2],
+            "compounds": catalog_row_to_compounds(row),
+            "vsc_present": bool(row[15])
+        })
+    
+    return {
+        "strain": strain_name,
+        "variants": variants,
+        "count": len(variants)
+    }
+
+
 @router.get("/strains/{strain_name}")
 async def get_strain_variants(strain_name: str):
     """Get all grow context variants for a strain from Phase 1 library."""
-    if not os.path.exists(DB_PATH):
+    return await EXECUTOR.run(fetch_strain_variants, strain_name)
+
+
+def fetch_strain_names() -> Dict[str, Any]:
+    """Distinct strain names (blocking; run via EXECUTOR)."""
+    conn = DB_POOL.connection()
+    if conn is None:
         return {"error": "Database not found"}
     
-    conn = None
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT strain_name, grow_style, archetype, thc, cbd, thcv, cbg, cbn,
-                   terpene_1, terpene_1_val, terpene_2, terpene_2_val, 
-                   terpene_3, terpene_3_val, cannflavin_a, vsc_present
-            FROM product_catalog 
-            WHERE strain_name = ? COLLATE NOCASE
-        """, (strain_name,))
-        
-        rows = cursor.fetchall()
-        
-        if not rows:
-            return {"error": f"Strain '{strain_name}' not found in Phase 1 library"}
-        
-        variants = []
-        for row in rows:
-            # Build compound list from row data
-            compounds = []
-            
-            # Add cannabinoids
-            if row[3] > 0: compounds.append({"name": "THC", "val": row[3]})
-            if row[4] > 0: compounds.append({"name": "CBD", "val": row[4]})
-            if row[5] > 0: compounds.append({"name": "THCV", "val": row[5]})
-            if row[6] > 0: compounds.append({"name": "CBG", "val": row[6]})
-            if row[7] > 0: compounds.append({"name": "CBN", "val": row[7]})
-            
-            # Add terpenes
-            if row[9] > 0: compounds.append({"name": row[8], "val": row[9]})
-            if row[11] > 0: compounds.append({"name": row[10], "val": row[11]})
-            if row[13] > 0: compounds.append({"name": row[12], "val": row[13]})
-            
-            # Add cannflavin if present
-            if row[14] > 0: compounds.append({"name": "Cannflavin A", "val": row[14]})
-            
-            variants.append({
-                "strain_name": row[0],
-                "grow_style": row[1],
-                "archetype": row[2],
-                "compounds": compounds,
-                "vsc_present": bool(row[15])
-            })
-        
-        return {
-            "strain": strain_name,
-            "variants": variants,
-            "count": len(variants)
-        }
-        
-    finally:
-        if conn:
-            conn.close()
+    cursor = conn.cursor()
+    
+    cursor.execute("SELECT DISTINCT strain_name FROM product_catalog ORDER BY strain_name")
+    rows = cursor.fetchall()
+    
+    return {
+        "strains": [row[0] for row in rows],
+        "count": len(rows)
+    }
 
 
 @router.get("/strains")
-async def list_all_strains():
+async def list_all_strains(request: Request):
     """List all strain names in Phase 1 library."""
-    if not os.path.exists(DB_PATH):
-        return {"error": "Database not found"}
-    
-    conn = None
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT DISTINCT strain_name FROM product_catalog ORDER BY strain_name")
-        rows = cursor.fetchall()
-        
-        return {
-            "strains": [row[0] for row in rows],
-            "count": len(rows)
-        }
-        
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+    return await REFERENCE_RESPONSES.respond(request, "strains", fetch_strain_names, EXECUTOR)
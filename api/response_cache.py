@@ -0,0 +1,147 @@
+import hashlib
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from api.cache import LRUCache
+from api.metrics import ROUTE_LABEL_SCOPE, observe_request
+
+# Request-body hashes remembered per cached response (tiny entries)
+RAW_ALIAS_CACHE_SIZE = 8192
+# scope["state"] key carrying the raw body hash to the endpoint
+RAW_KEY_STATE = "response_cache_raw_key"
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI fast path for cached POST responses.
+
+    The endpoint caches encoded responses under a canonical request key and
+    records the raw body hash of each request as an alias of that key, stored
+    with the request's product count as (key, products). On the next
+    byte-identical body this middleware answers straight from the cache,
+    before any JSON or Pydantic parsing, and records the hit in the request
+    metrics as the endpoint would. Everything else is passed through
+    with the body replayed and the raw hash left in scope["state"].
+    `signature` (a coroutine function) is awaited first so a database change
+    clears the caches before a stale hit can be served.
+    """
+
+    def __init__(self, app, path: str, cache: LRUCache, aliases: LRUCache,
+                 signature: Optional[Callable[[], Awaitable[Any]]] = None):
+        self.app = app
+        self.path = path
+        self.cache = cache
+        self.aliases = aliases
+        self.signature = signature
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        raw_key = hashlib.sha256(body).hexdigest()
+
+        if self.signature is not None:
+            await self.signature()
+        alias = self.aliases.get(raw_key)
+        cached = self.cache.get(alias[0]) if alias is not None else None
+        if cached is not None:
+            scope[ROUTE_LABEL_SCOPE] = self.path
+            observe_request(alias[1])
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(cached)).encode()),
+                    (b"x-cache", b"HIT"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": cached})
+            return
+
+        scope.setdefault("state", {})[RAW_KEY_STATE] = raw_key
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+
+# Reference data only changes on reseed; clients revalidate with If-None-Match
+REFERENCE_CACHE_CONTROL = "public, max-age=300"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 7232 specifies for this header)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ReferenceResponses:
+    """
+    Pre-serialized bodies with strong ETags for read-mostly GET endpoints.
+
+    Each named body is built once, encoded once and tagged with a hash of its
+    bytes, so the tag changes exactly when the served data does. All bodies
+    are dropped when `signature` (a coroutine function returning the database
+    change marker) moves.
+    Payloads carrying an "error" key are served but never stored.
+    """
+
+    def __init__(self, signature: Callable[[], Awaitable[Any]], cache_control: str = REFERENCE_CACHE_CONTROL):
+        self._signature = signature
+        self.cache_control = cache_control
+        self._entries = {}
+        self._source_sig = None
+
+    async def _sync(self) -> Any:
+        sig = await self._signature()
+        if sig != self._source_sig:
+            self._entries = {}
+            self._source_sig = sig
+        return sig
+
+    async def respond(self, request: Request, name: str, build: Callable[[], Any], executor=None) -> Response:
+        """304 when the client's ETag is current, otherwise the cached body (built on first use)."""
+        sig = await self._sync()
+        entry = self._entries.get(name)
+        if entry is None:
+            payload = await executor.run(build) if executor is not None else build()
+            if isinstance(payload, dict) and "error" in payload:
+                return JSONResponse(payload)
+            body = JSONResponse(payload).body
+            entry = (body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+            if await self._signature() == sig:
+                self._entries[name] = entry
+
+        body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,316 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter
+
+from api.db_pool import ConnectionPool
+from api.recommendation import DB_PATH, DB_POOL, EXECUTOR, COMPOUND_REGISTRY
+
+router = APIRouter(prefix="/api/v1")
+
+SEARCH_MODES = ("auto", "prefix", "contains", "fuzzy")
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+SEARCH_MAX_QUERY_LENGTH = 100
+# Trigram index needs at least this many characters to match anything
+TRIGRAM_LENGTH = 3
+# Minimum 1 - edit_distance / max_length for a fuzzy match
+FUZZY_MIN_SIMILARITY = 0.5
+# Fuzzy candidates (sharing a trigram with the query) ranked per request
+FUZZY_MAX_CANDIDATES = 500
+
+# Keys above every real search key, for B-tree prefix ranges
+_PREFIX_END = "\U0010ffff"
+
+
+def search_key(text: str) -> str:
+    """Normalized form names are indexed and matched by (NFKC, casefolded, single spaces)."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance, counting an adjacent transposition as one edit."""
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+def encode_search_cursor(mode: str, key: List[Any]) -> str:
+    """Opaque keyset cursor: the search mode and the last row's sort key."""
+    return base64.urlsafe_b64encode(json.dumps([mode, key]).encode()).decode().rstrip("=")
+
+
+def _is_sort_key(mode: str, key: Any) -> bool:
+    """True if `key` has the shape `mode` sorts by: [name_key], or [similarity, name_key] when fuzzy."""
+    if not isinstance(key, list):
+        return False
+    if mode == "fuzzy":
+        return len(key) == 2 and isinstance(key[0], (int, float)) and not isinstance(key[0], bool) \
+            and isinstance(key[1], str)
+    return len(key) == 1 and isinstance(key[0], str)
+
+
+def decode_search_cursor(cursor: str) -> Optional[Tuple[str, List[Any]]]:
+    """(mode, sort key) from a cursor, or None if it is malformed or its key does not fit the mode."""
+    try:
+        mode, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if mode in SEARCH_MODES[1:] and _is_sort_key(mode, key):
+            return mode, key
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def ensure_search_tables(conn: sqlite3.Connection) -> None:
+    # Exact, case-insensitive lookups (get_strain_variants) use this instead of scanning
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_product_catalog_strain_nocase "
+                 "ON product_catalog (strain_name COLLATE NOCASE)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS strain_search_names (
+            name_key TEXT PRIMARY KEY,
+            strain_name TEXT,
+            archetypes TEXT
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS strain_search_fts USING fts5(
+            name_key UNINDEXED, strain_name, archetypes, tokenize='trigram'
+        )
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS strain_search_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+
+def catalog_strains(conn: sqlite3.Connection) -> Dict[str, Tuple[str, List[str]]]:
+    """{name_key: (strain_name, archetypes)} from product_catalog (first spelling of each key wins)."""
+    strains: Dict[str, Tuple[str, List[str]]] = {}
+    for strain_name, archetype in conn.execute(
+            "SELECT strain_name, archetype FROM product_catalog ORDER BY strain_name, grow_style"):
+        if not strain_name:
+            continue
+        _, archetypes = strains.setdefault(search_key(strain_name), (strain_name, []))
+        if archetype and archetype not in archetypes:
+            archetypes.append(archetype)
+    return strains
+
+
+def strains_fingerprint(strains: Dict[str, Tuple[str, List[str]]]) -> str:
+    return hashlib.sha1(json.dumps(sorted(strains.items())).encode()).hexdigest()
+
+
+def build_search_index(db_path: str = DB_PATH, force: bool = False) -> Dict[str, Any]:
+    """
+    Bring the strain search tables up to date with product_catalog.
+
+    The tables are rebuilt (in one transaction) only when the catalog's
+    strain names or archetypes changed since the last build. This writes to
+    the database, so it runs offline at deploy time (python -m
+    api.strain_search), never from the API process.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_search_tables(conn)
+        strains = catalog_strains(conn)
+        fingerprint = strains_fingerprint(strains)
+        stored = conn.execute("SELECT value FROM strain_search_meta WHERE key = 'fingerprint'").fetchone()
+        if not force and stored is not None and stored[0] == fingerprint:
+            conn.commit()
+            return {"strains": len(strains), "rebuilt": False}
+
+        conn.execute("DELETE FROM strain_search_names")
+        conn.execute("DELETE FROM strain_search_fts")
+        rows = [(key, name, archetypes) for key, (name, archetypes) in strains.items()]
+        conn.executemany("INSERT INTO strain_search_names VALUES (?,?,?)",
+                         [(key, name, json.dumps(archetypes)) for key, name, archetypes in rows])
+        conn.executemany("INSERT INTO strain_search_fts VALUES (?,?,?)",
+                         [(key, key, search_key(" | ".join(archetypes))) for key, _, archetypes in rows])
+        conn.execute("INSERT OR REPLACE INTO strain_search_meta VALUES ('fingerprint', ?)", (fingerprint,))
+        conn.commit()
+    finally:
+        conn.close()
+    return {"strains": len(strains), "rebuilt": True}
+
+
+def _fts_phrase(text: str) -> str:
+    """FTS5 string literal matching `text` as-is."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class StrainSearch:
+    """
+    Prefix, substring and typo-tolerant strain lookup over the search tables.
+
+    Prefix (autocomplete) searches are a range scan of the name_key B-tree,
+    substring searches go through the FTS5 trigram index over names and
+    archetypes, and fuzzy searches rank the names sharing a trigram with the
+    query by edit distance. Every mode pages with a keyset cursor, so deep
+    pages cost the same as the first. The tables are built offline (see
+    build_search_index); the API only reads them and re-checks whether they
+    exist and match product_catalog when the database changes.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, pool: ConnectionPool = DB_POOL):
+        self.db_path = db_path
+        self._pool = pool
+        self._lock = threading.Lock()
+        self._source_sig = None
+        self.available = False
+        self.stale = False
+
+    def refresh(self) -> None:
+        """Re-check the search tables if the database changed (read-only)."""
+        sig = COMPOUND_REGISTRY.source_signature
+        if sig == self._source_sig:
+            return
+        with self._lock:
+            if sig == self._source_sig:
+                return
+            self.available, self.stale = self._index_state()
+            self._source_sig = sig
+
+    def _index_state(self) -> Tuple[bool, bool]:
+        """(search tables built, built from an older product_catalog)."""
+        if not os.path.exists(self.db_path):
+            return False, False
+        conn = self._pool.connection()
+        if conn is None:
+            return False, False
+        try:
+            stored = conn.execute("SELECT value FROM strain_search_meta WHERE key = 'fingerprint'").fetchone()
+            if stored is None:
+                return False, False
+            return True, stored[0] != strains_fingerprint(catalog_strains(conn))
+        except sqlite3.Error:
+            return False, False
+
+    def _prefix(self, conn: sqlite3.Connection, key: str, after: Optional[List[Any]], limit: int) -> List[tuple]:
+        start = after[0] if after else key
+        op = ">" if after else ">="
+        return conn.execute(
+            f"SELECT name_key, strain_name, archetypes FROM strain_search_names "
+            f"WHERE name_key {op} ? AND name_key < ? ORDER BY name_key LIMIT ?",
+            (start, key + _PREFIX_END, limit)
+        ).fetchall()
+
+    def _contains(self, conn: sqlite3.Connection, key: str, after: Optional[List[Any]], limit: int) -> List[tuple]:
+        return conn.execute(
+            "SELECT n.name_key, n.strain_name, n.archetypes FROM strain_search_fts f "
+            "JOIN strain_search_names n ON n.name_key = f.name_key "
+            "WHERE strain_search_fts MATCH ? AND n.name_key > ? ORDER BY n.name_key LIMIT ?",
+            (_fts_phrase(key), after[0] if after else "", limit)
+        ).fetchall()
+
+    def _fuzzy(self, conn: sqlite3.Connection, key: str, after: Optional[List[Any]],
+               limit: int) -> List[Tuple[float, tuple]]:
+        trigrams = {key[i:i + TRIGRAM_LENGTH] for i in range(len(key) - TRIGRAM_LENGTH + 1)}
+        if trigrams:
+            candidates = conn.execute(
+                "SELECT n.name_key, n.strain_name, n.archetypes FROM strain_search_fts f "
+                "JOIN strain_search_names n ON n.name_key = f.name_key "
+                "WHERE strain_search_fts MATCH ? ORDER BY rank LIMIT ?",
+                ("strain_name : (" + " OR ".join(_fts_phrase(t) for t in sorted(trigrams)) + ")",
+                 FUZZY_MAX_CANDIDATES)
+            ).fetchall()
+        else:
+            # Too short for trigrams: only names of similar length can be close enough
+            candidates = conn.execute(
+                "SELECT name_key, strain_name, archetypes FROM strain_search_names "
+                "WHERE length(name_key) <= ? LIMIT ?",
+                (int(len(key) / (1 - FUZZY_MIN_SIMILARITY)), FUZZY_MAX_CANDIDATES)
+            ).fetchall()
+
+        ranked = []
+        for row in candidates:
+            similarity = round(1 - edit_distance(key, row[0]) / max(len(key), len(row[0])), 4)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                ranked.append((similarity, row))
+        ranked.sort(key=lambda item: (-item[0], item[1][0]))
+        if after:
+            after_similarity, after_key = after
+            ranked = [item for item in ranked if (-item[0], item[1][0]) > (-after_similarity, after_key)]
+        return ranked[:limit]
+
+    def search(self, query: str, mode: str = "auto", limit: int = SEARCH_DEFAULT_LIMIT,
+               cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of matching strains (blocking; run via EXECUTOR)."""
+        if mode not in SEARCH_MODES:
+            return {"error": f"Unknown mode '{mode}'", "results": []}
+        if not 0 < limit <= SEARCH_MAX_LIMIT:
+            return {"error": f"limit must be between 1 and {SEARCH_MAX_LIMIT}", "results": []}
+        if len(query) > SEARCH_MAX_QUERY_LENGTH:
+            return {"error": f"Query exceeds {SEARCH_MAX_QUERY_LENGTH} characters", "results": []}
+        after = None
+        if cursor is not None:
+            decoded = decode_search_cursor(cursor)
+            if decoded is None:
+                return {"error": "Invalid cursor", "results": []}
+            mode, after = decoded
+
+        self.refresh()
+        conn = self._pool.connection()
+        if conn is None:
+            return {"error": "Database not found", "results": []}
+        if not self.available:
+            return {"error": "Strain search index not built (run python -m api.strain_search)", "results": []}
+
+        key = search_key(query)
+        modes = [mode] if mode != "auto" else ["prefix", "contains", "fuzzy"] if key else ["prefix"]
+        rows: List[tuple] = []
+        sort_keys: List[List[Any]] = []
+        for mode in modes:
+            if mode == "contains" and len(key) < TRIGRAM_LENGTH:
+                continue
+            if mode == "fuzzy":
+                matches = self._fuzzy(conn, key, after, limit + 1)
+                rows = [row for _, row in matches]
+                sort_keys = [[similarity, row[0]] for similarity, row in matches]
+            else:
+                rows = (self._prefix if mode == "prefix" else self._contains)(conn, key, after, limit + 1)
+                sort_keys = [[row[0]] for row in rows]
+            if rows:
+                break
+
+        page = rows[:limit]
+        results = [{"strain_name": name, "archetypes": json.loads(archetypes)} for _, name, archetypes in page]
+        if mode == "fuzzy":
+            for result, (similarity, _) in zip(results, sort_keys):
+                result["similarity"] = similarity
+        return {
+            "query": query,
+            "mode": mode,
+            "results": results,
+            "count": len(results),
+            "next_cursor": encode_search_cursor(mode, sort_keys[limit - 1]) if len(rows) > limit else None,
+        }
+
+
+STRAIN_SEARCH = StrainSearch()
+
+
+@router.get("/search/strains")
+async def search_strains(q: str = "", mode: str = "auto", limit: int = SEARCH_DEFAULT_LIMIT,
+                         cursor: Optional[str] = None):
+    """
+    Strain search: prefix autocomplete, substring (names and archetypes) or
+    typo-tolerant matching. "auto" tries them in that order. An empty query
+    pages through every strain.
+    """
+    return await EXECUTOR.run(STRAIN_SEARCH.search, q, mode, limit, cursor)
+
+
+if __name__ == "__main__":
+    stats = build_search_index(force=True)
+    print(f"✅ Strain search index: {stats['strains']} strains indexed")
@@ -0,0 +1,76 @@
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+from api.executor import BlockingExecutor
+from api.ranking import TopK, decode_cursor, page_results, select_into
+from api.recommendation import (
+    Condition,
+    Product,
+    RecommendationRequest,
+    build_result,
+    classify_conditions,
+    recommendation_summary,
+    score_analyses,
+)
+
+# Products scored per executor job; each job's lines are sent as one network write
+STREAM_CHUNK_SIZE = 256
+
+
+def encode_record(record: Dict[str, Any]) -> str:
+    """One NDJSON line, encoded the same way as FastAPI's JSONResponse."""
+    return json.dumps(record, ensure_ascii=False, allow_nan=False, separators=(",", ":")) + "\n"
+
+
+def _score_and_encode(conditions: List[Condition], products: List[Product], temp_f: float,
+                      profiles: List[int], scoring_mode: str) -> str:
+    analyses = score_analyses(conditions, products, temp_f, profiles, scoring_mode)
+    return "".join(encode_record(build_result(product, analysis)) for product, analysis in zip(products, analyses))
+
+
+async def stream_recommendations(data: RecommendationRequest, executor: BlockingExecutor) -> AsyncIterator[str]:
+    """
+    NDJSON body for /recommend in stream mode (request already validated).
+
+    Without top_k every product is written as soon as its chunk is scored, in
+    input order (unranked). With top_k only the bounded selector is kept and the
+    K best (after `cursor`) are written, ranked, once scoring finishes. Either
+    way the optional last line is {"summary": {...}} with the usual
+    request-level fields, plus next_cursor and the pruned count when ranked.
+    """
+    temp_f = float(data.user_profile['interface_temp'])
+    conditions = [Condition(**c) for c in data.user_profile['conditions']]
+    profiles = classify_conditions(conditions)
+    products = data.product_list
+    selector = None
+    if data.top_k is not None:
+        selector = TopK(data.top_k + 1, decode_cursor(data.cursor) if data.cursor else None)
+    emitted = 0
+    pruned = 0
+    next_cursor = None
+
+    for start in range(0, len(products), STREAM_CHUNK_SIZE):
+        chunk = products[start:start + STREAM_CHUNK_SIZE]
+        if selector is None:
+            yield await executor.run(_score_and_encode, conditions, chunk, temp_f, profiles, data.scoring_mode)
+            emitted += len(chunk)
+        else:
+            pruned += await executor.run(select_into, selector, conditions, chunk, start,
+                                         temp_f, profiles, data.scoring_mode)
+
+    if selector is not None:
+        ranked, next_cursor = page_results(selector, data.top_k)
+        if ranked:
+            yield "".join(encode_record(r) for r in ranked)
+        emitted = len(ranked)
+
+    if data.include_summary:
+        yield encode_record({"summary": {
+            **recommendation_summary(temp_f, conditions),
+            "products_scored": len(products),
+            "results_emitted": emitted,
+            "ranked": selector is not None,
+            "top_k": data.top_k,
+            "next_cursor": next_cursor,
+            "pruned": pruned,
+        }})
@@ -0,0 +1,264 @@
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from api.batch_scoring import _entourage_table
+from api.recommendation import (
+    Condition,
+    Product,
+    EXECUTOR,
+    COMPOUND_REGISTRY,
+    THERMAL_LUT,
+    COMPOUND_TRAITS,
+    ASSUMED_ACTIVE,
+    TRAIT_COGNITIVE,
+    TRAIT_SOMATIC,
+    TRAIT_ANXIETY,
+    TRAIT_CANNFLAVIN,
+    TRAIT_THC,
+    CANNFLAVIN_BONUS_STYLES,
+    PROFILE_RECREATIONAL,
+    PROFILE_COGNITIVE,
+    PROFILE_SOMATIC,
+    PROFILE_ANXIETY,
+    PROFILE_CANNFLAVIN_TARGET,
+    classify_conditions,
+    fahrenheit_to_celsius,
+    get_compound_data,
+    get_thermal_safety_zone,
+    product_vector,
+    resolve_request_compounds,
+)
+from api.thermal_lut import (
+    DEVICE_MIN_F,
+    DEVICE_MAX_F,
+    VOLATILIZATION_GRADIENT_F,
+    DEGRADATION_START_OFFSET_F,
+    quantize_temp,
+)
+
+router = APIRouter(prefix="/api/v1")
+
+# get_thermal_safety_zone risk levels, least to most severe
+SAFETY_RISK_LEVELS = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+# Largest sweep evaluated in one request (e.g. 300–500°F in 0.1° steps)
+SWEEP_MAX_POINTS = 2001
+
+
+class TemperatureSweepRequest(BaseModel):
+    user_profile: Dict[str, Any]  # Only `conditions` is used; the sweep replaces interface_temp
+    product_list: List[Product]
+    min_temp_f: float = DEVICE_MIN_F
+    max_temp_f: float = DEVICE_MAX_F
+    step_f: float = 5.0
+    max_risk: str = "MEDIUM"  # Highest safety-zone risk the optimum may fall in
+
+
+def sweep_temperatures(min_temp_f: float, max_temp_f: float, step_f: float) -> List[float]:
+    """Evenly spaced sweep points from min to max (inclusive), quantized like THERMAL_LUT rows."""
+    count = int(math.floor((max_temp_f - min_temp_f) / step_f + 1e-9)) + 1
+    return [quantize_temp(min_temp_f + i * step_f) for i in range(count)]
+
+
+def validate_sweep_request(data: TemperatureSweepRequest) -> Optional[str]:
+    """Error message for an unusable sweep request, or None."""
+    if 'conditions' not in data.user_profile or not data.user_profile['conditions']:
+        return "Missing conditions in user_profile"
+    if not all(math.isfinite(v) for v in (data.min_temp_f, data.max_temp_f, data.step_f)):
+        return "min_temp_f, max_temp_f and step_f must be finite"
+    if data.step_f <= 0:
+        return "step_f must be positive"
+    if data.min_temp_f > data.max_temp_f:
+        return "min_temp_f must not exceed max_temp_f"
+    if (data.max_temp_f - data.min_temp_f) / data.step_f + 1 > SWEEP_MAX_POINTS:
+        return f"Sweep exceeds {SWEEP_MAX_POINTS} temperatures"
+    if data.max_risk.upper() not in SAFETY_RISK_LEVELS:
+        return f"Unknown max_risk '{data.max_risk}'"
+    return None
+
+
+def sweep_scores(conditions: List[Condition], product: Product, temps: List[float],
+                 profiles: List[int]) -> List[float]:
+    """
+    calculate_quantum_match's score for one product at every temperature in `temps`.
+
+    Everything that does not depend on temperature (compound types, cultivation
+    modifiers, THC and its penalties) is computed once; thermal availability
+    is a temperatures × compounds array taken from THERMAL_LUT rows, and the
+    profile signals are accumulated column by column in compound order so each
+    point matches the per-temperature engine exactly.
+    """
+    vector = product_vector(product)
+    if not vector or not conditions:
+        return [0.0] * len(temps)
+
+    traits = COMPOUND_TRAITS.resolve(vector, product.growStyle)
+    thc = 0.0
+    for val, (_, flags, _) in zip(vector.vals, traits):
+        if flags & TRAIT_THC:
+            thc = val
+
+    rows = [THERMAL_LUT.row(t) for t in temps]
+    avail = np.array([[row.get(name_u, ASSUMED_ACTIVE)[0] for name_u, _, _ in traits] for row in rows],
+                     dtype=np.float64).reshape(len(temps), len(vector))
+
+    # 1. Profile signals, one temperature vector each
+    cognitive = np.zeros(len(temps))
+    somatic = np.zeros(len(temps))
+    somatic_cannflavin = np.zeros(len(temps))
+    anxiety = np.zeros(len(temps))
+    general = np.zeros(len(temps))
+    cannflavin_active = np.zeros(len(temps), dtype=bool)
+    locked = np.zeros(len(temps), dtype=bool)
+    active_count = np.zeros(len(temps), dtype=np.intp)
+
+    for j, (val, (_, flags, factor)) in enumerate(zip(vector.vals, traits)):
+        column = avail[:, j]
+        weighted = val * factor * column
+        general = general + weighted
+        if flags & TRAIT_COGNITIVE:
+            cognitive = cognitive + weighted
+        if flags & TRAIT_SOMATIC:
+            somatic = somatic + weighted
+            somatic_cannflavin = somatic_cannflavin + weighted
+        if flags & TRAIT_ANXIETY:
+            anxiety = anxiety + weighted
+        if flags & TRAIT_CANNFLAVIN:
+            released = column > 0
+            somatic_cannflavin = np.where(released, somatic_cannflavin + val * column * 5.0, somatic_cannflavin)
+            cannflavin_active |= released
+        if val > 0.5:
+            locked |= column < 0.5
+        active_count += column > 0.5
+
+    # 2. Condition-independent gates: thermal lock and entourage synergy
+    thermal_mult = np.where(locked, 0.8, 1.0)
+    entourage_mult = np.asarray(_entourage_table(int(active_count.max(initial=0))))[active_count]
+    general = general * 3
+    soil_grown = product.growStyle.lower() in CANNFLAVIN_BONUS_STYLES
+
+    # 3. Severity-weighted condition scores (see evaluate_condition)
+    total_score = np.zeros(len(temps))
+    total_weight = 0.0
+    for condition, profile in zip(conditions, profiles):
+        if profile & PROFILE_RECREATIONAL:
+            condition_score = np.full(len(temps), 100.0)
+        else:
+            applicable = []
+            if profile & PROFILE_COGNITIVE:
+                applicable.append(cognitive * 40 - max(0, (thc - 10) * 3.0))
+            if profile & PROFILE_SOMATIC:
+                signal = somatic
+                boost = np.ones(len(temps))
+                if profile & PROFILE_CANNFLAVIN_TARGET:
+                    signal = somatic_cannflavin
+                    boost = np.where(cannflavin_active, 30.0, 1.0)
+                f_bonus = np.where(boost > 1.0, 1.3, 1.0) if soil_grown else 1.0
+                applicable.append(((signal * 8) + (thc * 1.2)) * f_bonus * boost)
+            if profile & PROFILE_ANXIETY:
+                applicable.append(anxiety * 15 - max(0, (thc - 5) * 2.0))
+
+            if not applicable:
+                condition_score = general
+            else:
+                condition_score = applicable[0]
+                for score in applicable[1:]:
+                    condition_score = condition_score + score
+                condition_score = condition_score / len(applicable)
+            condition_score = condition_score * thermal_mult * entourage_mult
+
+        total_score = total_score + condition_score * condition.severity
+        total_weight += condition.severity
+
+    if total_weight <= 0:
+        return [0.0] * len(temps)
+    return [round(min(100.0, max(0.0, total / total_weight)), 1) for total in total_score.tolist()]
+
+
+def compound_state_changes(product: Product, min_temp_f: float, max_temp_f: float) -> List[Dict[str, Any]]:
+    """
+    Temperatures in the range where one of the product's compounds changes
+    thermal status (see evaluate_thermal_state), in temperature order.
+    `temp_f` is the first temperature with the new status, except for
+    "degrading", which starts just above it.
+    """
+    changes = []
+    seen = set()
+    for name in product_vector(product).names:
+        key = COMPOUND_REGISTRY.canonical(name)
+        if key in seen:
+            continue
+        seen.add(key)
+        data = get_compound_data(name)
+        bp_f = data.get("boiling_point_f") if data else None
+        if not bp_f:
+            continue  # Assumed active at every temperature
+        thresholds = [(bp_f - VOLATILIZATION_GRADIENT_F, "locked", "partially_active"),
+                      (bp_f, "partially_active", "fully_active")]
+        if data["type"] in ['cannabinoid', 'terpene']:
+            thresholds.append((bp_f + DEGRADATION_START_OFFSET_F, "fully_active", "degrading"))
+        for temp_f, before, after in thresholds:
+            if min_temp_f <= temp_f <= max_temp_f and (after != "degrading" or temp_f < max_temp_f):
+                changes.append({"compound": name, "temp_f": round(temp_f, 1), "from": before, "to": after})
+    changes.sort(key=lambda change: change["temp_f"])
+    return changes
+
+
+def build_temperature_sweep(data: TemperatureSweepRequest) -> Dict[str, Any]:
+    """Score curves and safe optima for every product (blocking; run via EXECUTOR)."""
+    error = validate_sweep_request(data)
+    if error:
+        return {"error": error, "results": []}
+
+    conditions = [Condition(**c) for c in data.user_profile['conditions']]
+    profiles = classify_conditions(conditions)
+    temps = sweep_temperatures(data.min_temp_f, data.max_temp_f, data.step_f)
+    zones = [get_thermal_safety_zone(t) for t in temps]
+    max_level = SAFETY_RISK_LEVELS.index(data.max_risk.upper())
+    allowed = [SAFETY_RISK_LEVELS.index(zone["risk"]) <= max_level for zone in zones]
+    resolve_request_compounds(data.product_list)
+
+    results = []
+    for product in data.product_list:
+        scores = sweep_scores(conditions, product, temps, profiles)
+        # Best score in an allowed zone; ties go to the lowest temperature
+        best = None
+        for i, score in enumerate(scores):
+            if allowed[i] and (best is None or score > scores[best]):
+                best = i
+        optimal = None
+        if best is not None:
+            optimal = {
+                "temp_f": temps[best],
+                "temp_c": fahrenheit_to_celsius(temps[best]),
+                "score": scores[best],
+                "safety_zone": zones[best],
+            }
+        results.append({
+            "product": product.name,
+            "growStyle": product.growStyle,
+            "optimal": optimal,
+            "curve": [{"temp_f": t, "score": s, "risk": zone["risk"]}
+                      for t, s, zone in zip(temps, scores, zones)],
+            "state_changes": compound_state_changes(product, temps[0], temps[-1]),
+        })
+
+    return {
+        "results": results,
+        "temperatures_evaluated": len(temps),
+        "min_temp_f": temps[0],
+        "max_temp_f": temps[-1],
+        "step_f": data.step_f,
+        "max_risk": data.max_risk.upper(),
+        "conditions_analyzed": [c.name for c in conditions],
+        "research_version": "v2.0-pharmacognosy"
+    }
+
+
+@router.post("/recommend/temperature-sweep")
+async def temperature_sweep(data: TemperatureSweepRequest):
+    """Score curve across a temperature range and the best temperature within the allowed risk."""
+    return await EXECUTOR.run(build_temperature_sweep, data)
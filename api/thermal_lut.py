@@ -0,0 +1,168 @@
+import time
+import threading
+from decimal import Decimal
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from governance import GF_QUANT, GF_CONTEXT
+
+# Device range covered by the precomputed table (whole-degree slider steps)
+DEVICE_MIN_F = 300
+DEVICE_MAX_F = 500
+DEVICE_STEP_F = 1
+
+# Research: Gradual vaporization begins 36°F (20°C) below boiling point
+VOLATILIZATION_GRADIENT_F = 36
+DEGRADATION_START_OFFSET_F = 40  # Degrees F above boiling point where degradation begins
+DEGRADATION_RATE = 0.02          # Rate of availability loss per degree F above the offset
+
+# Compounds without boiling point data are assumed available (conservative approach)
+ASSUMED_ACTIVE = (1.0, {"available": 1.0, "boiling_point_f": None, "status": "assumed_active"})
+
+ThermalEntry = Tuple[float, Dict[str, Any]]
+
+
+def evaluate_thermal_state(bp_f: float, compound_type: Optional[str], temp_f: float) -> ThermalEntry:
+    """
+    Piecewise thermal release model for one compound at one temperature.
+    Returns (availability, details) exactly as reported by calculate_thermal_availability.
+    DEGRADATION: Cannabinoids and terpenes lose availability past +40°F.
+    """
+    # Handle degradation for volatile compounds (cannabinoids and terpenes)
+    if compound_type in ['cannabinoid', 'terpene'] and temp_f > bp_f + DEGRADATION_START_OFFSET_F:
+        excess_heat = temp_f - (bp_f + DEGRADATION_START_OFFSET_F)
+        degradation_factor = max(0.0, 1.0 - (excess_heat * DEGRADATION_RATE))
+        return degradation_factor, {
+            "available": round(degradation_factor, 2),
+            "boiling_point_f": bp_f,
+            "status": "degrading",
+            "temp_margin": round(temp_f - bp_f, 1),
+            "warning": f"⚠️ Degrading at {round(temp_f - bp_f, 1)}°F above boiling point"
+        }
+    # If not degrading or compound type doesn't degrade this way, check other statuses
+    elif temp_f >= bp_f:
+        # Full availability above boiling point (but not overheated)
+        return 1.0, {
+            "available": 1.0,
+            "boiling_point_f": bp_f,
+            "status": "fully_active",
+            "temp_margin": round(temp_f - bp_f, 1)
+        }
+    elif temp_f >= (bp_f - VOLATILIZATION_GRADIENT_F):
+        # Partial availability within 36°F of boiling point
+        partial = (temp_f - (bp_f - VOLATILIZATION_GRADIENT_F)) / VOLATILIZATION_GRADIENT_F
+        return partial, {
+            "available": round(partial, 2),
+            "boiling_point_f": bp_f,
+            "status": "partially_active",
+            "needed_temp_f": round(bp_f, 1)
+        }
+    # Locked below threshold
+    return 0.0, {
+        "available": 0.0,
+        "boiling_point_f": bp_f,
+        "status": "locked",
+        "needed_temp_f": round(bp_f, 1),
+        "deficit": round(bp_f - temp_f, 1)
+    }
+
+
+def quantize_temp(temp_f: float) -> float:
+    """Snap a temperature to the governance quantization (GF_QUANT)."""
+    return float(Decimal(str(temp_f)).quantize(GF_QUANT, context=GF_CONTEXT))
+
+
+class ThermalLUT:
+    """
+    Precomputed thermal availability per compound and temperature.
+
+    Rows are keyed by temperature and map uppercased compound names to shared
+    (availability, details) entries; the details dicts are read-only. Every
+    whole-degree step of the device range is built up front. Other temperatures
+    are quantized to GF_QUANT and memoized on first use, up to max_dynamic_rows.
+
+    The table is rebuilt whenever the loader reports different boiling points.
+    The loader is only re-run when the source signature (e.g. DB mtime) changes,
+    and the signature is polled at most once per check_interval seconds.
+    """
+
+    def __init__(self,
+                 loader: Callable[[], Dict[str, Tuple[Optional[float], str]]],
+                 signature: Callable[[], Any],
+                 on_rebuild: Optional[Callable[[], None]] = None,
+                 max_dynamic_rows: int = 4096,
+                 check_interval: float = 1.0):
+        self._loader = loader
+        self._signature = signature
+        self._on_rebuild = on_rebuild
+        self._max_dynamic_rows = max_dynamic_rows
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._source_sig = None
+        self._checked_at = None
+        self._boiling_points: Optional[Dict[str, Tuple[Optional[float], str]]] = None
+        self._rows: Dict[float, Dict[str, ThermalEntry]] = {}
+        self._dynamic_rows = 0
+
+    @property
+    def compound_count(self) -> int:
+        return len(self._boiling_points or {})
+
+    @property
+    def row_count(self) -> int:
+        return len(self._rows)
+
+    def _build_row(self, temp_f: float) -> Dict[str, ThermalEntry]:
+        row = {}
+        for name, (bp_f, c_type) in self._boiling_points.items():
+            row[name] = evaluate_thermal_state(bp_f, c_type, temp_f) if bp_f else ASSUMED_ACTIVE
+        return row
+
+    def _rebuild(self, boiling_points: Dict[str, Tuple[Optional[float], str]]) -> None:
+        self._boiling_points = boiling_points
+        rows = {}
+        for temp_f in range(DEVICE_MIN_F, DEVICE_MAX_F + 1, DEVICE_STEP_F):
+            rows[float(temp_f)] = self._build_row(float(temp_f))
+        self._rows = rows
+        self._dynamic_rows = 0
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload boiling points if the source changed; returns True when the table was rebuilt."""
+        now = time.monotonic()
+        if not force and self._boiling_points is not None and self._checked_at is not None \
+                and now - self._checked_at < self._check_interval:
+            return False
+
+        with self._lock:
+            self._checked_at = now
+            sig = self._signature()
+            if not force and self._boiling_points is not None and sig == self._source_sig:
+                return False
+            self._source_sig = sig
+
+            boiling_points = self._loader()
+            if not force and boiling_points == self._boiling_points:
+                return False
+            self._rebuild(boiling_points)
+
+        if self._on_rebuild:
+            self._on_rebuild()
+        return True
+
+    def row(self, temp_f: float) -> Dict[str, ThermalEntry]:
+        """Return the {COMPOUND: (availability, details)} row for a temperature."""
+        self.refresh()
+        rows = self._rows
+        row = rows.get(temp_f)
+        if row is None:
+            q_temp = quantize_temp(temp_f)
+            row = rows.get(q_temp)
+            if row is None:
+                row = self._build_row(q_temp)
+            if self._dynamic_rows < self._max_dynamic_rows:
+                rows[q_temp] = rows[temp_f] = row
+                self._dynamic_rows += 1
+        return row
+
+    def lookup(self, compound_name: str, temp_f: float) -> ThermalEntry:
+        """Availability and details for one compound (assumed active when unknown)."""
+        return self.row(temp_f).get(compound_name.upper(), ASSUMED_ACTIVE)
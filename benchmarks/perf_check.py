@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.run import DEFAULT_WARMUP, environment, parse_sizes, run_benchmarks
+from benchmarks.scenarios import default_chemotypes, standard_scenarios
+
+# Baselines are per machine and never committed: CI records them on its own runners
+# (.github/workflows/perf.yml) and developers record theirs with --record
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+BASELINE_SCHEMA = 1
+# /recommend sizes the gate runs (the 100k and 1M scenarios are for release benchmarks)
+GATE_SIZES = (10, 1_000)
+GATE_REPEAT = 7
+# Allowed slowdown before a scenario fails, as a fraction of the baseline
+MEDIAN_THRESHOLD = 0.15
+P95_THRESHOLD = 0.25
+# Slowdowns smaller than this many seconds are treated as noise
+MIN_DELTA_S = 0.0002
+
+# Exit codes: 2 means nothing was compared (no baseline recorded for this machine)
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_NO_BASELINE = 2
+
+
+def load_baselines(path: str) -> Dict[str, Any]:
+    """The baseline file ({"schema", "baselines": {fingerprint: entry}}); empty if missing."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {"schema": BASELINE_SCHEMA, "baselines": {}}
+    if data.get("schema") != BASELINE_SCHEMA:
+        raise ValueError(f"{path}: unsupported baseline schema {data.get('schema')!r}")
+    return data
+
+
+def baseline_entry(results: Dict[str, Any]) -> Dict[str, Any]:
+    """What a baseline keeps from one benchmark run: environment, config and per-scenario stats."""
+    return {
+        "created": results["created"],
+        "environment": results["environment"],
+        "config": results["config"],
+        "scenarios": {
+            s["name"]: {"median_s": s["median_s"], "p95_s": s["p95_s"], "repeat": s["repeat"]}
+            for s in results["scenarios"]
+        },
+    }
+
+
+def record_baseline(path: str, results: Dict[str, Any]) -> None:
+    """Store `results` as the baseline for their machine fingerprint, keeping other machines' entries."""
+    data = load_baselines(path)
+    data["baselines"][results["environment"]["fingerprint"]] = baseline_entry(results)
+    data["baselines"] = dict(sorted(data["baselines"].items()))
+    with open(path, "w") as f:
+        f.write(json.dumps(data, indent=2) + "\n")
+
+
+def relative_delta(current: float, baseline: float) -> Optional[float]:
+    return (current - baseline) / baseline if baseline > 0 else None
+
+
+def compare_scenario(current: Dict[str, Any], baseline: Dict[str, Any], median_threshold: float,
+                     p95_threshold: float, min_delta_s: float) -> Dict[str, Any]:
+    """
+    Median and p95 deltas of one scenario against its baseline. A statistic
+    regresses when it is both more than its threshold and more than
+    min_delta_s slower; the scenario is "regression" if either one does.
+    """
+    comparison = {"name": current["name"]}
+    regressed = improved = False
+    for stat, threshold in (("median_s", median_threshold), ("p95_s", p95_threshold)):
+        base, now = baseline[stat], current[stat]
+        delta = relative_delta(now, base)
+        over = delta is not None and delta > threshold and now - base > min_delta_s
+        regressed |= over
+        improved |= stat == "median_s" and delta is not None and delta < -threshold and base - now > min_delta_s
+        comparison[stat] = {"baseline": base, "current": now,
+                            "delta": round(delta, 4) if delta is not None else None,
+                            "threshold": threshold, "regressed": over}
+    comparison["status"] = "regression" if regressed else "improved" if improved else "ok"
+    return comparison
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], median_threshold: float = MEDIAN_THRESHOLD,
+            p95_threshold: float = P95_THRESHOLD, min_delta_s: float = MIN_DELTA_S) -> List[Dict[str, Any]]:
+    """Per-scenario comparisons; scenarios only on one side are reported as "new" or "missing"."""
+    base_scenarios = baseline["scenarios"]
+    comparisons = []
+    for scenario in results["scenarios"]:
+        base = base_scenarios.get(scenario["name"])
+        if base is None:
+            comparisons.append({"name": scenario["name"], "status": "new"})
+        else:
+            comparisons.append(compare_scenario(scenario, base, median_threshold, p95_threshold, min_delta_s))
+    current_names = {s["name"] for s in results["scenarios"]}
+    comparisons.extend({"name": name, "status": "missing"} for name in base_scenarios if name not in current_names)
+    return comparisons
+
+
+def format_delta(stat: Optional[Dict[str, Any]]) -> str:
+    if not stat or stat["delta"] is None:
+        return f"{'-':>34}"
+    return (f"{stat['baseline'] * 1000:>11.3f} → {stat['current'] * 1000:>11.3f} ms "
+            f"{stat['delta'] * 100:>+7.1f}%")
+
+
+def format_report(comparisons: List[Dict[str, Any]]) -> str:
+    lines = [f"{'scenario':<34} {'median':^34}   {'p95':^34}   status"]
+    for c in comparisons:
+        lines.append(f"{c['name']:<34} {format_delta(c.get('median_s'))}   "
+                     f"{format_delta(c.get('p95_s'))}   {c['status'].upper()}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare engine benchmark medians and p95 against the recorded baseline for this machine")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help=f"baseline file (default {BASELINE_PATH})")
+    parser.add_argument("--record", action="store_true",
+                        help="store this run as the baseline for this machine instead of comparing")
+    parser.add_argument("--repeat", type=int, default=GATE_REPEAT, help="timed runs per scenario")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="untimed runs per scenario")
+    parser.add_argument("--sizes", type=parse_sizes, default=GATE_SIZES,
+                        help=f"/recommend product counts (default {','.join(map(str, GATE_SIZES))})")
+    parser.add_argument("--only", help="run only scenarios whose name contains this text")
+    parser.add_argument("--median-threshold", type=float, default=MEDIAN_THRESHOLD * 100,
+                        help="allowed median slowdown in percent")
+    parser.add_argument("--p95-threshold", type=float, default=P95_THRESHOLD * 100,
+                        help="allowed p95 slowdown in percent")
+    parser.add_argument("--min-delta-ms", type=float, default=MIN_DELTA_S * 1000,
+                        help="slowdowns below this many milliseconds never fail")
+    parser.add_argument("--output", "-o", help="also write the results and comparison here as JSON")
+    args = parser.parse_args(argv)
+    if args.repeat <= 0 or args.warmup < 0:
+        parser.error("--repeat must be positive and --warmup non-negative")
+
+    fingerprint = environment()["fingerprint"]
+    baseline = None
+    if not args.record:
+        baseline = load_baselines(args.baseline)["baselines"].get(fingerprint)
+        if baseline is None:
+            print(f"No baseline recorded for machine {fingerprint} in {args.baseline}; "
+                  f"run with --record on this machine first", file=sys.stderr)
+            return EXIT_NO_BASELINE
+
+    chemotypes = default_chemotypes()
+    if not chemotypes:
+        parser.error("product_catalog is empty or missing; run from the directory holding data/greenforge.db")
+    scenarios = [s for s in standard_scenarios(chemotypes, args.sizes) if not args.only or args.only in s.name]
+    # Tracing skews timings and the gate only compares times
+    results = run_benchmarks(scenarios, args.repeat, args.warmup, memory=False)
+
+    if args.record:
+        record_baseline(args.baseline, results)
+        print(f"Recorded baseline for machine {fingerprint} ({len(results['scenarios'])} scenarios) "
+              f"in {args.baseline}")
+        return EXIT_OK
+
+    comparisons = compare(results, baseline, args.median_threshold / 100, args.p95_threshold / 100,
+                          args.min_delta_ms / 1000)
+    regressions = [c["name"] for c in comparisons if c["status"] == "regression"]
+    print(f"Machine {fingerprint}; baseline from {baseline['created']} "
+          f"(commit {baseline['environment'].get('commit')})")
+    print(format_report(comparisons))
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(json.dumps({"checked": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                                "results": results, "comparisons": comparisons,
+                                "regressions": regressions}, indent=2) + "\n")
+    if regressions:
+        print(f"FAILED: {len(regressions)} scenario(s) slower than the threshold: {', '.join(regressions)}")
+        return EXIT_REGRESSION
+    print("PASSED")
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+import argparse
+import gc
+import hashlib
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from benchmarks.scenarios import RECOMMEND_SIZES, Scenario, default_chemotypes, standard_scenarios
+
+# Bump when the result layout changes
+RESULTS_SCHEMA = 2
+DEFAULT_REPEAT = 5
+DEFAULT_WARMUP = 1
+# Runs of scenarios at or above this many items are capped at LARGE_REPEAT
+LARGE_ITEMS = 100_000
+LARGE_REPEAT = 2
+# Short scenarios are run this many seconds' worth of times per sample (at most MAX_NUMBER)
+MIN_SAMPLE_S = 0.05
+MAX_NUMBER = 10_000
+# environment() fields that identify like-for-like interpreter and hardware
+FINGERPRINT_FIELDS = ("implementation", "python", "compiler", "system", "machine", "cpu_model", "cpu_count")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a non-empty sample list."""
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def timed_run(scenario: Scenario, state: Any) -> float:
+    if scenario.reset is not None:
+        scenario.reset(state)
+    started = time.perf_counter()
+    scenario.run(state)
+    return time.perf_counter() - started
+
+
+def sample(scenario: Scenario, state: Any, number: int) -> float:
+    """Mean time of `number` runs (resets are not timed)."""
+    return sum(timed_run(scenario, state) for _ in range(number)) / number
+
+
+def calibrate(scenario: Scenario, state: Any) -> int:
+    """Runs per sample so that one sample lasts at least MIN_SAMPLE_S."""
+    elapsed = timed_run(scenario, state)
+    if elapsed >= MIN_SAMPLE_S:
+        return 1
+    return min(MAX_NUMBER, math.ceil(MIN_SAMPLE_S / max(elapsed, 1e-7)))
+
+
+def peak_memory(scenario: Scenario, state: Any) -> int:
+    """Peak bytes allocated by one traced run (on top of what setup already holds)."""
+    if scenario.reset is not None:
+        scenario.reset(state)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        scenario.run(state)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(scenario: Scenario, repeat: int, warmup: int, memory: bool) -> Dict[str, Any]:
+    """
+    Timings of one scenario. Warm-up runs are discarded, and peak memory
+    comes from a separate traced run, since tracemalloc slows allocation.
+    Each sample is the mean of `number` runs, calibrated so that short
+    scenarios are not dominated by timer and scheduler noise.
+    """
+    if scenario.items >= LARGE_ITEMS:
+        repeat = min(repeat, LARGE_REPEAT)
+        warmup = min(warmup, 1)
+    state = scenario.setup()
+    try:
+        for _ in range(warmup):
+            timed_run(scenario, state)
+        number = calibrate(scenario, state)
+        samples = [sample(scenario, state, number) for _ in range(repeat)]
+        peak = peak_memory(scenario, state) if memory else None
+    finally:
+        del state
+        gc.collect()
+
+    median = statistics.median(samples)
+    return {
+        "name": scenario.name,
+        "params": scenario.params,
+        "items": scenario.items,
+        "unit": scenario.unit,
+        "repeat": repeat,
+        "warmup": warmup,
+        "number": number,
+        "samples_s": [round(s, 6) for s in samples],
+        "min_s": round(min(samples), 6),
+        "median_s": round(median, 6),
+        "mean_s": round(statistics.fmean(samples), 6),
+        "p95_s": round(percentile(samples, 95), 6),
+        "max_s": round(max(samples), 6),
+        "stdev_s": round(statistics.stdev(samples), 6) if len(samples) > 1 else 0.0,
+        "throughput_per_s": round(scenario.items / median, 1) if median > 0 else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5,
+                              check=True).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def cpu_model() -> Optional[str]:
+    """CPU model name (platform.processor() is empty on most Linux builds)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+def machine_fingerprint(env: Dict[str, Any]) -> str:
+    """
+    Short hash of the interpreter and hardware fields of environment().
+    Timings are only comparable between runs with the same fingerprint.
+    """
+    fields = [env[key] for key in FINGERPRINT_FIELDS]
+    return hashlib.sha256(json.dumps(fields).encode()).hexdigest()[:16]
+
+
+def environment() -> Dict[str, Any]:
+    """Interpreter, machine and source revision the results were taken on."""
+    env = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "compiler": platform.python_compiler(),
+        "platform": platform.platform(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu_model": cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "commit": git_commit(),
+    }
+    env["fingerprint"] = machine_fingerprint(env)
+    return env
+
+
+def run_benchmarks(scenarios: List[Scenario], repeat: int = DEFAULT_REPEAT, warmup: int = DEFAULT_WARMUP,
+                   memory: bool = True, log=None) -> Dict[str, Any]:
+    """Run every scenario in order and return the machine-readable results document."""
+    results = []
+    for scenario in scenarios:
+        result = measure(scenario, repeat, warmup, memory)
+        results.append(result)
+        if log is not None:
+            peak = result["peak_memory_bytes"]
+            log(f"{result['name']:<34} median {result['median_s'] * 1000:>11.3f} ms  "
+                f"p95 {result['p95_s'] * 1000:>11.3f} ms  {result['throughput_per_s'] or 0:>13,.0f} "
+                f"{result['unit']}/s" + (f"  peak {peak / 1024:,.0f} KiB" if peak is not None else ""))
+    return {
+        "schema": RESULTS_SCHEMA,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": environment(),
+        "config": {"repeat": repeat, "warmup": warmup, "memory": memory},
+        "scenarios": results,
+    }
+
+
+def parse_sizes(text: str) -> tuple:
+    return tuple(int(size.replace("_", "")) for size in text.split(",") if size.strip())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="GreenForge scoring engine benchmarks")
+    parser.add_argument("--sizes", type=parse_sizes, default=RECOMMEND_SIZES,
+                        help="comma-separated product counts for the /recommend scenarios "
+                             f"(default {','.join(map(str, RECOMMEND_SIZES))})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per scenario")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="untimed runs per scenario")
+    parser.add_argument("--only", help="run only scenarios whose name contains this text")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory run")
+    parser.add_argument("--output", "-o", help="write the JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+    if args.repeat <= 0 or args.warmup < 0:
+        parser.error("--repeat must be positive and --warmup non-negative")
+
+    chemotypes = default_chemotypes()
+    if not chemotypes:
+        parser.error("product_catalog is empty or missing; run from the directory holding data/greenforge.db")
+    scenarios = [s for s in standard_scenarios(chemotypes, args.sizes) if not args.only or args.only in s.name]
+
+    results = run_benchmarks(scenarios, args.repeat, args.warmup, not args.no_memory,
+                             log=lambda line: print(line, file=sys.stderr))
+    encoded = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded + "\n")
+    else:
+        print(encoded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from api.recommendation import (
+    Compound,
+    Condition,
+    Product,
+    COMPOUND_REGISTRY,
+    RESPONSE_ALIASES,
+    RESPONSE_CACHE,
+    THERMAL_LUT,
+    calculate_quantum_match,
+    calculate_thermal_availability,
+    classify_conditions,
+    get_compound_data,
+    product_vector,
+)
+from benchmarks.synthetic_catalog import iter_products, load_chemotypes, request_body
+
+# Patient profile every scenario scores against (pain + anxiety + focus covers all profile signals)
+BENCHMARK_PROFILE = {
+    "interface_temp": 365,
+    "conditions": [
+        {"name": "Neuropathic Pain", "severity": 7},
+        {"name": "Anxiety", "severity": 5},
+        {"name": "ADHD Focus", "severity": 4},
+    ],
+}
+# Product counts of the end-to-end /recommend scenarios
+RECOMMEND_SIZES = (10, 1_000, 100_000, 1_000_000)
+# Products scored per calculate_quantum_match run
+ENGINE_PRODUCTS = 1_000
+# Device temperatures each chemotype is evaluated at by the thermal scenario
+THERMAL_TEMPS = range(300, 501, 10)
+# Names absent from every compound table (exercise the negative paths)
+UNKNOWN_COMPOUNDS = ["Benchmarkene", "Unknownol"]
+
+RECOMMEND_PATH = "/api/v1/recommend"
+
+
+class Scenario:
+    """
+    One timed benchmark. setup() runs once and returns the state passed to
+    run(), the timed call; reset(state), when given, runs untimed before
+    every call (e.g. to empty a cache). `items` is the work one run() does,
+    in `unit`s, for throughput.
+    """
+
+    def __init__(self, name: str, items: int, unit: str, setup: Callable[[], Any],
+                 run: Callable[[Any], Any], reset: Optional[Callable[[Any], None]] = None,
+                 params: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.items = items
+        self.unit = unit
+        self.setup = setup
+        self.run = run
+        self.reset = reset
+        self.params = params or {}
+
+
+def lookup_names(chemotypes: List[Dict[str, Any]]) -> List[str]:
+    """Every distinct compound spelling of the chemotypes, plus a few unknown ones."""
+    names = {c["name"] for chemotype in chemotypes for c in chemotype["compounds"]}
+    return sorted(names) + UNKNOWN_COMPOUNDS
+
+
+def lookup_all(names: List[str]) -> None:
+    for name in names:
+        get_compound_data(name)
+
+
+def reload_and_lookup(names: List[str]) -> None:
+    # A forced reload empties every dependent cache, as after a database change
+    COMPOUND_REGISTRY.refresh(force=True)
+    lookup_all(names)
+
+
+def warm_names(names: List[str]) -> List[str]:
+    lookup_all(names)
+    return names
+
+
+def thermal_inputs(chemotypes: List[Dict[str, Any]]) -> List[Tuple[List[Compound], float]]:
+    compound_lists = [[Compound(**c) for c in chemotype["compounds"]] for chemotype in chemotypes]
+    inputs = [(compounds, float(temp)) for temp in THERMAL_TEMPS for compounds in compound_lists]
+    for compounds, temp_f in inputs:
+        calculate_thermal_availability(compounds, temp_f)  # Builds the LUT rows outside the timing
+    return inputs
+
+
+def thermal_all(inputs: List[Tuple[List[Compound], float]]) -> None:
+    for compounds, temp_f in inputs:
+        calculate_thermal_availability(compounds, temp_f)
+
+
+def match_inputs(chemotypes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    conditions = [Condition(**c) for c in BENCHMARK_PROFILE["conditions"]]
+    products = [Product(**p) for p in iter_products(chemotypes, ENGINE_PRODUCTS)]
+    state = {
+        "conditions": conditions,
+        "profiles": classify_conditions(conditions),
+        "temp_f": float(BENCHMARK_PROFILE["interface_temp"]),
+        "products": [(product_vector(p), p.growStyle) for p in products],
+    }
+    match_all(state)
+    return state
+
+
+def match_all(state: Dict[str, Any]) -> None:
+    conditions, profiles, temp_f = state["conditions"], state["profiles"], state["temp_f"]
+    for vector, grow_style in state["products"]:
+        calculate_quantum_match(conditions, vector, temp_f, grow_style, profiles)
+
+
+async def asgi_post(app, path: str, body: bytes) -> Tuple[int, bytes]:
+    """POST `body` straight to an ASGI app; returns (status, response body)."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 8000),
+    }
+    sent = False
+    status = 0
+    chunks = []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+def recommend_inputs(chemotypes: List[Dict[str, Any]], size: int) -> Dict[str, Any]:
+    from main import app
+
+    return {
+        "app": app,
+        "loop": asyncio.new_event_loop(),
+        "body": request_body(BENCHMARK_PROFILE, iter_products(chemotypes, size)),
+    }
+
+
+def clear_response_caches(state: Dict[str, Any]) -> None:
+    # Every run must score; a cached response would only time the lookup
+    RESPONSE_CACHE.clear()
+    RESPONSE_ALIASES.clear()
+
+
+def recommend(state: Dict[str, Any]) -> None:
+    status, body = state["loop"].run_until_complete(asgi_post(state["app"], RECOMMEND_PATH, state["body"]))
+    if status != 200 or body.startswith(b'{"error"'):
+        raise RuntimeError(f"{RECOMMEND_PATH} failed ({status}): {body[:200]!r}")
+
+
+def standard_scenarios(chemotypes: List[Dict[str, Any]],
+                       sizes: Tuple[int, ...] = RECOMMEND_SIZES) -> List[Scenario]:
+    """The standard benchmark set, in run order."""
+    names = lookup_names(chemotypes)
+    thermal_calls = len(chemotypes) * len(THERMAL_TEMPS)
+    scenarios = [
+        Scenario("get_compound_data.cold", len(names), "lookups", lambda: names, reload_and_lookup),
+        Scenario("get_compound_data.warm", len(names), "lookups", lambda: warm_names(names), lookup_all),
+        Scenario("calculate_thermal_availability", thermal_calls, "calls",
+                 lambda: thermal_inputs(chemotypes), thermal_all),
+        Scenario("calculate_quantum_match", ENGINE_PRODUCTS, "products",
+                 lambda: match_inputs(chemotypes), match_all),
+    ]
+    for size in sizes:
+        scenarios.append(Scenario(f"recommend.{size}", size, "products",
+                                  lambda size=size: recommend_inputs(chemotypes, size), recommend,
+                                  reset=clear_response_caches, params={"products": size}))
+    return scenarios
+
+
+def default_chemotypes() -> List[Dict[str, Any]]:
+    """Catalog chemotypes from the live database (registry and LUT loaded first)."""
+    COMPOUND_REGISTRY.refresh(force=True)
+    THERMAL_LUT.refresh(force=True)
+    return load_chemotypes()
@@ -0,0 +1,48 @@
+import json
+import random
+from typing import Any, Dict, Iterator, List, Optional
+
+from api.catalog import load_catalog_rows
+from api.recommendation import catalog_row_to_compounds
+
+# Relative spread applied to every compound amount of a seeded chemotype
+DEFAULT_JITTER = 0.15
+
+
+def load_chemotypes(rows: Optional[List[tuple]] = None) -> List[Dict[str, Any]]:
+    """One {"strain", "growStyle", "compounds"} chemotype per product_catalog row."""
+    rows = load_catalog_rows() if rows is None else rows
+    return [{"strain": row[0], "growStyle": row[1], "compounds": catalog_row_to_compounds(row)} for row in rows]
+
+
+def iter_products(chemotypes: List[Dict[str, Any]], count: int, seed: int = 0,
+                  jitter: float = DEFAULT_JITTER) -> Iterator[Dict[str, Any]]:
+    """
+    `count` synthetic /recommend products, drawn from the catalog chemotypes.
+
+    Each product copies a randomly chosen chemotype (compound names, order and
+    grow style) and scales every amount by a factor in [1 - jitter, 1 + jitter],
+    rounded to the catalog's two decimals. The same seed always yields the same
+    products, so runs are comparable release over release.
+    """
+    if not chemotypes:
+        raise ValueError("No chemotypes to seed from (is product_catalog empty?)")
+    rng = random.Random(seed)
+    for i in range(count):
+        base = chemotypes[rng.randrange(len(chemotypes))]
+        yield {
+            "name": f"{base['strain']} #{i}",
+            "growStyle": base["growStyle"],
+            "compounds": [{"name": c["name"], "val": round(c["val"] * rng.uniform(1 - jitter, 1 + jitter), 2)}
+                          for c in base["compounds"]],
+        }
+
+
+def request_body(user_profile: Dict[str, Any], products: Iterator[Dict[str, Any]], **fields: Any) -> bytes:
+    """
+    Encoded /recommend body for `products`, built product by product so large
+    catalogs never exist as one nested Python structure.
+    """
+    head = json.dumps({"user_profile": user_profile, **fields})[:-1]
+    items = b",".join(json.dumps(product).encode() for product in products)
+    return head.encode() + b',"product_list":[' + items + b"]}"
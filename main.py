@@ -1,10 +1,19 @@
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from contextlib import asynccontextmanager
 import os
 
-from api.recommendation import router
+from api.recommendation import router, COMPOUND_REGISTRY, THERMAL_LUT, DB_POOL, EXECUTOR, RESPONSE_CACHE, RESPONSE_ALIASES, compound_cache_stats, current_signature
+from api.parallel_scoring import PARALLEL_SCORER
+from api.catalog import router as catalog_router, PRODUCT_CATALOG
+from api.temperature_sweep import router as sweep_router
+from api.profile_batch import router as batch_router
+from api.strain_search import router as search_router, STRAIN_SEARCH
+from api.bulk_ingest import router as bulk_router
+from api.response_cache import ResponseCacheMiddleware
+from api.metrics import METRICS, CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware
 
 
 @asynccontextmanager
@@ -21,10 +30,27 @@ async def lifespan(app: FastAPI):
     else:
         print(f"⚠ WARNING: Database not found at {db_path}")
 
+    COMPOUND_REGISTRY.refresh(force=True)
+    print(f"✓ Compound registry: {len(COMPOUND_REGISTRY)} compounds loaded")
+    THERMAL_LUT.refresh(force=True)
+    print(f"✓ Thermal LUT: {THERMAL_LUT.compound_count} compounds × {THERMAL_LUT.row_count} temperatures")
+    PRODUCT_CATALOG.refresh(force=True)
+    print(f"✓ Product catalog: {len(PRODUCT_CATALOG)} products loaded")
+    STRAIN_SEARCH.refresh()
+    if not STRAIN_SEARCH.available:
+        print("⚠ WARNING: Strain search index not built (run python -m api.strain_search)")
+    elif STRAIN_SEARCH.stale:
+        print("⚠ WARNING: Strain search index is older than product_catalog (run python -m api.strain_search)")
+    else:
+        print("✓ Strain search index: ready")
+
     print("🚀 GreenForge Engine: ONLINE")
 
     yield
 
+    PARALLEL_SCORER.shutdown()
+    EXECUTOR.shutdown()
+    DB_POOL.close_all()
     print("🛑 GreenForge Engine: OFFLINE")
 
 
@@ -35,6 +61,17 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Byte-identical repeat /recommend requests are answered before body parsing
+# (the bulk path returns the same bytes, so both share one cache)
+for recommend_path in ("/api/v1/recommend", "/api/v1/recommend/bulk"):
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        path=recommend_path,
+        cache=RESPONSE_CACHE,
+        aliases=RESPONSE_ALIASES,
+        signature=current_signature,
+    )
+
 # CORS setup
 app.add_middleware(
     CORSMiddleware,
@@ -44,8 +81,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request counts and latency; added last so it wraps every other
+# middleware and also sees response cache hits
+app.add_middleware(MetricsMiddleware)
+
 # Mount the recommendation router
 app.include_router(router)
+app.include_router(catalog_router)
+app.include_router(sweep_router)
+app.include_router(batch_router)
+app.include_router(search_router)
+app.include_router(bulk_router)
 
 
 @app.get("/")
@@ -56,6 +102,12 @@ async def root():
         "engine": "GreenForge v1.0",
         "endpoints": {
             "recommend": "/api/v1/recommend",
+            "recommend_catalog": "/api/v1/recommend/catalog",
+            "temperature_sweep": "/api/v1/recommend/temperature-sweep",
+            "recommend_batch": "/api/v1/recommend/batch",
+            "recommend_bulk": "/api/v1/recommend/bulk",
+            "strain_search": "/api/v1/search/strains",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -69,10 +121,19 @@ async def health_check():
     return {
         "status": "healthy" if db_exists else "degraded",
         "database": "connected" if db_exists else "missing",
-        "api_version": "v1"
+        "api_version": "v1",
+        "compound_cache": compound_cache_stats(),
+        "response_cache": RESPONSE_CACHE.stats(),
+        "executor": EXECUTOR.stats()
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Request, engine stage and cache metrics in Prometheus text format."""
+    return Response(METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",  # ✅ must match the lowercase filename
@@ -0,0 +1,91 @@
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The repo keeps the seeded database in Data/; the API opens data/greenforge.db
+SEED_DB = os.path.join(ROOT, "Data", "greenforge.db")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+_workdir = None
+_previous_cwd = None
+
+
+def pytest_configure(config):
+    """Run the session from a scratch directory holding a copy of the seeded database."""
+    global _workdir, _previous_cwd
+    _workdir = tempfile.mkdtemp(prefix="greenforge-tests-")
+    os.makedirs(os.path.join(_workdir, "data"))
+    shutil.copyfile(SEED_DB, os.path.join(_workdir, "data", "greenforge.db"))
+    _previous_cwd = os.getcwd()
+    os.chdir(_workdir)
+
+
+def pytest_unconfigure(config):
+    if _previous_cwd is not None:
+        os.chdir(_previous_cwd)
+    if _workdir is not None:
+        shutil.rmtree(_workdir, ignore_errors=True)
+
+
+# Pain, anxiety and focus together exercise every profile signal
+PROFILE = {
+    "interface_temp": 365,
+    "conditions": [
+        {"name": "Neuropathic Pain", "severity": 7},
+        {"name": "Anxiety", "severity": 5},
+        {"name": "ADHD Focus", "severity": 4},
+    ],
+}
+# One of each cultivation modifier branch, plus one with none
+GROW_STYLES = ["living_soil", "outdoor", "drought_stress", "hydroponic", "organic", "indoor"]
+
+
+def seeded_compound_names():
+    conn = sqlite3.connect(SEED_DB)
+    try:
+        return [row[0] for table in ("cannabinoids", "terpenes", "flavonoids")
+                for row in conn.execute(f"SELECT name FROM {table} ORDER BY name")]
+    finally:
+        conn.close()
+
+
+@pytest.fixture(scope="session")
+def product_dicts():
+    """Seeded random products from the database's compounds, plus the edge cases every engine must handle."""
+    rng = random.Random(7)
+    names = seeded_compound_names()
+    products = []
+    for i in range(200):
+        compounds = [{"name": "THC", "val": round(rng.uniform(8, 32), 2)}]
+        for name in rng.sample(names, rng.randint(1, 6)):
+            if name != "THC":
+                spelling = name.lower() if rng.random() < 0.2 else name
+                compounds.append({"name": spelling, "val": round(rng.uniform(0.05, 3.0), 2)})
+        products.append({"name": f"Product {i}", "growStyle": rng.choice(GROW_STYLES), "compounds": compounds})
+    products += [
+        {"name": "No compounds", "growStyle": "indoor", "compounds": []},
+        {"name": "Unknown compound", "growStyle": "living_soil",
+         "compounds": [{"name": "Testerpene", "val": 1.5}, {"name": "THC", "val": 22.0}]},
+        {"name": "Market reality", "growStyle": "hydroponic",
+         "compounds": [{"name": "THC", "val": 31.0}, {"name": "Myrcene", "val": 0.4}]},
+        {"name": "Repeated compound", "growStyle": "indoor",
+         "compounds": [{"name": "Myrcene", "val": 0.6}, {"name": "myrcene", "val": 0.3}, {"name": "CBD", "val": 4.0}]},
+    ]
+    return products
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,67 @@
+import pytest
+
+from api.batch_scoring import score_products_vectorized
+from api.recommendation import Compound, Condition, Product, calculate_quantum_match
+from conftest import PROFILE
+
+TEMPERATURES = (300.0, 365.0, 430.0)
+
+
+def comparable(analysis):
+    # Warnings are deduplicated through a set, so only their contents are fixed
+    return {**analysis, "warnings": sorted(analysis["warnings"])}
+
+
+@pytest.fixture(scope="module")
+def conditions():
+    return [Condition(**c) for c in PROFILE["conditions"]]
+
+
+@pytest.fixture(scope="module")
+def products(product_dicts):
+    return [Product(**p) for p in product_dicts]
+
+
+@pytest.mark.parametrize("temp_f", TEMPERATURES)
+def test_vectorized_matches_scalar(conditions, products, temp_f):
+    expected = [calculate_quantum_match(conditions, p.compounds, temp_f, p.growStyle) for p in products]
+    actual = score_products_vectorized(conditions, products, temp_f)
+    assert [comparable(a) for a in actual] == [comparable(a) for a in expected]
+
+
+def test_empty_compounds_have_scored_keys(conditions):
+    product = Product(name="Empty", growStyle="indoor", compounds=[])
+    scored = calculate_quantum_match(conditions, [Compound(name="THC", val=20.0)], 365.0, "indoor")
+    empty = calculate_quantum_match(conditions, product.compounds, 365.0, product.growStyle)
+    assert empty.keys() == scored.keys()
+    assert empty["safety_zone"] == scored["safety_zone"]
+    assert score_products_vectorized(conditions, [product], 365.0) == [empty]
+
+
+@pytest.mark.parametrize("scoring_mode", ["standard", "vectorized", "parallel"])
+@pytest.mark.parametrize("top_k", [None, 1])
+def test_recommend_survives_empty_compounds(client, scoring_mode, top_k):
+    response = client.post("/api/v1/recommend", json={
+        "user_profile": PROFILE,
+        "scoring_mode": scoring_mode,
+        "top_k": top_k,
+        "product_list": [
+            {"name": "Empty", "growStyle": "indoor", "compounds": []},
+            {"name": "Scored", "growStyle": "indoor", "compounds": [{"name": "Myrcene", "val": 0.8}]},
+        ],
+    })
+    assert response.status_code == 200
+    results = {r["product"]: r for r in response.json()["results"]}
+    assert len(results) == (top_k or 2)
+    if "Empty" in results:
+        assert results["Empty"]["matchScore"] == 0.0
+
+
+def test_recommend_modes_agree(client, product_dicts):
+    standard, vectorized = (
+        client.post("/api/v1/recommend", json={
+            "user_profile": PROFILE, "product_list": product_dicts, "scoring_mode": mode,
+        }).json()["results"]
+        for mode in ("standard", "vectorized")
+    )
+    assert [comparable(r) for r in vectorized] == [comparable(r) for r in standard]
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from api.bulk_ingest import parse_bulk_request, parse_standard_request
+from api.recommendation import EXECUTOR, RESPONSE_ALIASES, RESPONSE_CACHE
+from conftest import PROFILE
+
+
+def post(client, path, content):
+    # Both paths share the response cache; every call here must really score
+    RESPONSE_CACHE.clear()
+    RESPONSE_ALIASES.clear()
+    body = content if isinstance(content, bytes) else json.dumps(content).encode()
+    return client.post(path, content=body, headers={"content-type": "application/json"})
+
+
+def assert_same_response(client, content):
+    single = post(client, "/api/v1/recommend", content)
+    bulk = post(client, "/api/v1/recommend/bulk", content)
+    assert bulk.status_code == single.status_code
+    assert bulk.headers["content-type"] == single.headers["content-type"]
+    assert bulk.content == single.content
+    return single
+
+
+@pytest.mark.parametrize("fields", [
+    {},
+    {"scoring_mode": "vectorized"},
+    {"top_k": 15},
+    {"stream": True},
+    {"stream": True, "top_k": 5, "include_summary": False},
+])
+def test_bulk_matches_recommend(client, product_dicts, fields):
+    response = assert_same_response(client, {"user_profile": PROFILE, "product_list": product_dicts, **fields})
+    assert response.status_code == 200
+
+
+def test_bulk_pages_match_recommend(client, product_dicts):
+    content = {"user_profile": PROFILE, "product_list": product_dicts, "top_k": 50}
+    for _ in range(3):
+        page = assert_same_response(client, content).json()
+        content["cursor"] = page["next_cursor"]
+
+
+@pytest.mark.parametrize("content", [
+    {"user_profile": PROFILE, "product_list": []},
+    {"user_profile": {"interface_temp": 365, "conditions": []}, "product_list": [
+        {"name": "A", "growStyle": "Indoor", "compounds": [{"name": "THC", "val": 20}]}]},
+    {"user_profile": PROFILE, "product_list": [
+        {"name": "Coerced", "growStyle": "Indoor", "compounds": [{"name": "THC", "val": "21.5"}]}]},
+    {"user_profile": PROFILE, "product_list": [{"name": "No grow style", "compounds": []}]},
+    {"user_profile": PROFILE, "product_list": [
+        {"name": "Bad amount", "growStyle": "Indoor", "compounds": [{"name": "THC", "val": "lots"}]}]},
+    {"product_list": []},
+    b"{not json",
+    b"",
+])
+def test_bulk_matches_recommend_errors_and_coercions(client, content):
+    assert_same_response(client, content)
+
+
+def test_fallback_parse_runs_on_executor(client, monkeypatch):
+    ran = []
+    run = EXECUTOR.run
+
+    async def recording_run(fn, *args, **kwargs):
+        ran.append(fn)
+        return await run(fn, *args, **kwargs)
+
+    monkeypatch.setattr(EXECUTOR, "run", recording_run)
+    response = post(client, "/api/v1/recommend/bulk", {"user_profile": PROFILE, "product_list": [
+        {"name": "Bad amount", "growStyle": "Indoor", "compounds": [{"name": "THC", "val": "lots"}]}]})
+    assert response.status_code == 422
+    assert ran == [parse_bulk_request, parse_standard_request]
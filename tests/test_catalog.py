@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from api.catalog import ProductCatalog, load_catalog_rows
+from conftest import PROFILE, SEED_DB
+
+
+def seeded_rows(where=""):
+    conn = sqlite3.connect(SEED_DB)
+    try:
+        return conn.execute(
+            f"SELECT strain_name, grow_style FROM product_catalog {where} ORDER BY strain_name, grow_style"
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def catalog():
+    return ProductCatalog(load_catalog_rows, lambda: "seed")
+
+
+def keys(products):
+    return [(p.name, p.growStyle) for p in products]
+
+
+def test_unfiltered_is_whole_catalog_in_order(catalog):
+    assert keys(catalog.select()) == seeded_rows()
+    assert len(catalog) == len(seeded_rows())
+
+
+def test_grow_style_filter_is_case_insensitive(catalog):
+    expected = seeded_rows("WHERE grow_style = 'hydroponic'")
+    assert expected
+    assert keys(catalog.select(grow_styles=["Hydroponic"])) == expected
+
+
+def test_values_within_a_filter_are_ored(catalog):
+    expected = seeded_rows("WHERE grow_style IN ('hydroponic', 'living_soil')")
+    assert keys(catalog.select(grow_styles=["living_soil", "HYDROPONIC"])) == expected
+
+
+def test_archetype_filter(catalog):
+    expected = seeded_rows("WHERE archetype = 'Gas Fuel'")
+    assert expected
+    assert keys(catalog.select(archetypes=["gas fuel"])) == expected
+
+
+def test_filters_are_anded(catalog):
+    expected = seeded_rows("WHERE archetype IN ('Gas Fuel', 'Coma Sedation') AND grow_style = 'drought_stress'")
+    assert len(expected) == 2
+    assert keys(catalog.select(grow_styles=["drought_stress"], archetypes=["Gas Fuel", "Coma Sedation"])) == expected
+
+
+@pytest.mark.parametrize("filters", [
+    {"grow_styles": ["aeroponic"]},
+    {"archetypes": ["Unknown"]},
+    {"grow_styles": []},
+    {"grow_styles": ["hydroponic"], "archetypes": ["Unknown"]},
+])
+def test_unmatched_filters_select_nothing(catalog, filters):
+    assert catalog.select(**filters) == []
+
+
+def test_reloads_only_when_signature_changes():
+    signature = ["v1"]
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return load_catalog_rows()[:len(loads)]
+
+    catalog = ProductCatalog(loader, lambda: signature[0])
+    assert len(catalog.select()) == 1
+    assert catalog.refresh() is False
+    signature[0] = "v2"
+    assert catalog.refresh() is True
+    assert len(catalog.select()) == 2
+
+
+def test_catalog_endpoint_scores_filtered_products(client):
+    filters = {"grow_styles": ["living_soil"], "archetypes": ["Nootropic Focus", "Gas Fuel"]}
+    catalog = client.post("/api/v1/recommend/catalog", json={"user_profile": PROFILE, **filters}).json()
+    products = ProductCatalog(load_catalog_rows, lambda: "seed").select(**filters)
+    direct = client.post("/api/v1/recommend", json={
+        "user_profile": PROFILE, "product_list": [p.model_dump() for p in products],
+    }).json()
+    assert len(catalog["results"]) == 2
+    assert catalog == direct
@@ -0,0 +1,124 @@
+import sqlite3
+
+import pytest
+
+from api.compound_aliases import DEFAULT_COMPOUND_ALIASES, AliasIndex, alias_key
+from api.compound_registry import CompoundRegistry
+from api.recommendation import compound_row_to_data
+from conftest import PROFILE
+
+TABLES = [("cannabinoids", "cannabinoid"), ("terpenes", "terpene")]
+
+
+@pytest.mark.parametrize("spelling", [
+    "Alpha-Pinene", "alpha pinene", "ALPHA_PINENE", "alpha‐pinene", "alpha – pinene", " alpha--pinene ",
+    "ａｌｐｈａ－ｐｉｎｅｎｅ",
+])
+def test_alias_key_folds_spelling(spelling):
+    assert alias_key(spelling) == "alpha-pinene"
+
+
+def test_default_aliases_resolve():
+    index = AliasIndex(DEFAULT_COMPOUND_ALIASES, ["Alpha-Pinene", "Caryophyllene", "THC"])
+    assert index.canonical("α-pinene") == "ALPHA-PINENE"
+    assert index.canonical("Pinene") == "ALPHA-PINENE"
+    assert index.canonical("beta caryophyllene") == "CARYOPHYLLENE"
+    assert index.canonical("Δ9-THC") == "THC"
+    assert index.canonical("delta 9 thc") == "THC"
+
+
+def test_unknown_names_keep_their_spelling():
+    index = AliasIndex(DEFAULT_COMPOUND_ALIASES, ["THC"])
+    assert index.canonical("Testerpene") == "TESTERPENE"
+    assert index.canonical("alpha pinene x") == "ALPHA PINENE X"
+
+
+def test_compound_names_beat_default_aliases():
+    # A compound table that lists plain Pinene keeps it apart from Alpha-Pinene
+    index = AliasIndex(DEFAULT_COMPOUND_ALIASES, ["Alpha-Pinene", "Pinene"])
+    assert index.canonical("pinene") == "PINENE"
+    assert index.canonical("α-Pinene") == "ALPHA-PINENE"
+
+
+def test_overrides_beat_names_and_defaults():
+    index = AliasIndex(DEFAULT_COMPOUND_ALIASES, ["Alpha-Pinene", "Pinene", "Beta-Pinene"],
+                       overrides={"Pinene": "Beta-Pinene", "BCP": "Humulene"})
+    assert index.canonical("Pinene") == "BETA-PINENE"
+    assert index.canonical("bcp") == "HUMULENE"
+    assert index.canonical("Beta-Caryophyllene") == "CARYOPHYLLENE"
+
+
+def test_chains_resolve_to_final_target():
+    index = AliasIndex(DEFAULT_COMPOUND_ALIASES, ["Trans-Ocimene"], overrides={"Ocimene": "Trans-Ocimene"})
+    assert index.canonical("β-Ocimene") == "TRANS-OCIMENE"
+    assert index.canonical("ocimene") == "TRANS-OCIMENE"
+
+    hops = AliasIndex({"a": "b", "b": "c", "c": "d"})
+    assert [hops.canonical(name) for name in "abcd"] == ["D", "D", "D", "D"]
+
+
+def test_alias_cycles_terminate():
+    index = AliasIndex({"a": "b", "b": "a"}, overrides={"x": "y", "y": "z", "z": "x"})
+    assert index.canonical("a") in {"A", "B"}
+    assert index.canonical("x") in {"X", "Y", "Z"}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "compounds.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE cannabinoids (name TEXT PRIMARY KEY, boiling_point REAL)")
+    conn.execute("CREATE TABLE terpenes (name TEXT PRIMARY KEY, boiling_point REAL)")
+    conn.executemany("INSERT INTO cannabinoids VALUES (?, ?)", [("THC", 157.0)])
+    conn.executemany("INSERT INTO terpenes VALUES (?, ?)", [("Alpha-Pinene", 155.0), ("Limonene", 176.0)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def registry(db_path, **options):
+    return CompoundRegistry(db_path, TABLES, compound_row_to_data, check_interval=0.0,
+                            aliases=DEFAULT_COMPOUND_ALIASES, alias_table="compound_aliases", **options)
+
+
+@pytest.mark.parametrize("preload", [True, False])
+def test_registry_serves_every_spelling_from_one_row(db_path, preload):
+    compounds = registry(db_path, preload=preload)
+    rows = [compounds.get(name) for name in ("Alpha-Pinene", "pinene", "α-Pinene", "alpha pinene")]
+    assert rows[0]["name"] == "Alpha-Pinene"
+    assert all(row is rows[0] for row in rows)
+    assert compounds.resolve(["Tetrahydrocannabinol", "Testerpene"]) == \
+        {"Tetrahydrocannabinol": compounds.get("THC"), "Testerpene": None}
+
+
+def test_alias_table_overrides_and_reloads(db_path):
+    compounds = registry(db_path)
+    assert compounds.get("Citrus") is None
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE compound_aliases (alias TEXT PRIMARY KEY, canonical TEXT)")
+    conn.executemany("INSERT INTO compound_aliases VALUES (?, ?)",
+                     [("Citrus", "D-Limonene"), ("Pinene", "Limonene")])
+    conn.commit()
+    conn.close()
+    # Table rows beat the defaults, and chain through them (Citrus → D-Limonene → Limonene)
+    assert compounds.get("citrus")["name"] == "Limonene"
+    assert compounds.get("Pinene")["name"] == "Limonene"
+    assert compounds.get("α-Pinene")["name"] == "Alpha-Pinene"
+
+
+def test_recommend_scores_aliases_like_table_names(client):
+    def product(name, pinene):
+        return {"name": name, "growStyle": "indoor",
+                "compounds": [{"name": "THC", "val": 18.0}, {"name": pinene, "val": 1.1}]}
+
+    spellings = ["Alpha-Pinene", "Pinene", "α-Pinene", "alpha pinene"]
+    body = client.post("/api/v1/recommend", json={
+        "user_profile": PROFILE, "product_list": [product(s, s) for s in spellings],
+    }).json()
+    results = {r["product"]: r for r in body["results"]}
+    reference = results["Alpha-Pinene"]
+    for spelling in spellings:
+        result = results[spelling]
+        assert (result["matchScore"], result["analysis"]) == (reference["matchScore"], reference["analysis"])
+        # Response keys keep the request's spelling
+        assert result["thermal_details"][spelling] == reference["thermal_details"]["Alpha-Pinene"]
@@ -0,0 +1,115 @@
+import sqlite3
+
+import pytest
+
+from api.compound_registry import CompoundRegistry
+from api.recommendation import (
+    COMPOUND_REGISTRY,
+    DB_PATH,
+    THERMAL_LUT,
+    Condition,
+    Product,
+    calculate_quantum_match,
+    compound_row_to_data,
+    product_vector,
+)
+from conftest import PROFILE
+
+TABLES = [("cannabinoids", "cannabinoid"), ("terpenes", "terpene")]
+
+
+def execute(db_path, sql, *params):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "compounds.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE cannabinoids (name TEXT PRIMARY KEY, boiling_point REAL)")
+    conn.execute("CREATE TABLE terpenes (name TEXT PRIMARY KEY, boiling_point REAL)")
+    conn.executemany("INSERT INTO cannabinoids VALUES (?, ?)", [("THC", 157.0), ("CBD", 180.0)])
+    conn.executemany("INSERT INTO terpenes VALUES (?, ?)", [("Myrcene", 167.0), ("Limonene", 176.0)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def registry(db_path, **options):
+    return CompoundRegistry(db_path, TABLES, compound_row_to_data, check_interval=0.0, **options)
+
+
+def test_reload_follows_database_changes(db_path):
+    compounds = registry(db_path)
+    assert compounds.get("myrcene")["boiling_point_c"] == 167.0
+    version = compounds.version
+    reloads = []
+    compounds.add_reload_listener(lambda: reloads.append(compounds.version))
+    assert not compounds.refresh()
+
+    execute(db_path, "UPDATE terpenes SET boiling_point = 190.0 WHERE name = 'Myrcene'")
+    assert compounds.get("MYRCENE")["boiling_point_c"] == 190.0
+    assert compounds.version == version + 1
+    assert reloads == [version + 1]
+
+    execute(db_path, "DELETE FROM terpenes WHERE name = 'Limonene'")
+    assert compounds.get("Limonene") is None
+
+
+def test_on_demand_misses_are_retried_after_reload(db_path):
+    compounds = registry(db_path, preload=False)
+    assert compounds.resolve(["THC", "Pinene"]) == {"THC": compounds.get("THC"), "Pinene": None}
+    assert compounds.negative_cache.get("PINENE")
+
+    execute(db_path, "INSERT INTO terpenes VALUES ('Pinene', 155.0)")
+    assert compounds.get("pinene")["boiling_point_c"] == 155.0
+
+
+def test_interned_ids_survive_reloads(db_path):
+    compounds = registry(db_path)
+    ids = [compounds.intern(name) for name in ("THC", "Myrcene", "Made-up")]
+    compounds.refresh(force=True)
+    assert [compounds.intern(name) for name in ("THC", "Myrcene", "Made-up")] == ids
+    assert [compounds.name_of(i) for i in ids] == ["THC", "Myrcene", "Made-up"]
+
+
+@pytest.fixture
+def myrcene_boiling_point():
+    """Lets a test change Myrcene's boiling point in the served database; restored afterwards."""
+    conn = sqlite3.connect(DB_PATH)
+    original = conn.execute("SELECT boiling_point FROM terpenes WHERE name = 'Myrcene'").fetchone()[0]
+    conn.close()
+    yield original
+    execute(DB_PATH, "UPDATE terpenes SET boiling_point = ? WHERE name = 'Myrcene'", original)
+    COMPOUND_REGISTRY.refresh(force=True)
+    THERMAL_LUT.refresh(force=True)
+
+
+def test_packed_products_rescore_after_reload(myrcene_boiling_point, monkeypatch):
+    monkeypatch.setattr(COMPOUND_REGISTRY, "_check_interval", 0.0)
+    conditions = [Condition(**c) for c in PROFILE["conditions"]]
+    product = Product(name="Packed", growStyle="Living Soil",
+                      compounds=[{"name": "Myrcene", "val": 1.2}, {"name": "THC", "val": 18.0}])
+    vector = product_vector(product)
+    before = calculate_quantum_match(conditions, vector, 365.0, product.growStyle)
+
+    # Above the device temperature: Myrcene drops out of thermal availability
+    execute(DB_PATH, "UPDATE terpenes SET boiling_point = 480 WHERE name = 'Myrcene'")
+    after = calculate_quantum_match(conditions, vector, 365.0, product.growStyle)
+    fresh = calculate_quantum_match(conditions, list(product.compounds), 365.0, product.growStyle)
+    assert after == fresh
+    assert after["thermal_details"] != before["thermal_details"]
+
+
+@pytest.mark.parametrize("temp_f", [300.0, 365.0, 430.0])
+def test_packed_products_score_like_compound_lists(product_dicts, temp_f):
+    conditions = [Condition(**c) for c in PROFILE["conditions"]]
+    for product in (Product(**p) for p in product_dicts):
+        packed = calculate_quantum_match(conditions, product_vector(product), temp_f, product.growStyle)
+        plain = calculate_quantum_match(conditions, list(product.compounds), temp_f, product.growStyle)
+        assert packed == plain, product.name
@@ -0,0 +1,61 @@
+import importlib
+import json
+import sys
+
+import pytest
+from fastapi.responses import JSONResponse
+
+import api.fast_json as fast_json
+from api.recommendation import RecommendationRequest, build_recommendations
+from conftest import PROFILE
+
+EDGE_CASES = [
+    {"floats": [0.0, -0.0, 1.5, 100.0, 1e-7, 1e16, 1e22, 0.00001, 0.1 + 0.2, -2.5e-300, 1.7976931348623157e308]},
+    {"ints": [0, -1, 2 ** 53, 2 ** 63 - 1, 2 ** 64, -(2 ** 70)]},
+    {"text": ["", "null", "1e-05", "0.0000", "Ω Caryophyllene", "⚠️ MARKET REALITY", " ", "\x00\x1f", "\"\\"]},
+    {"nested": {"empty": {}, "list": [], "none": None, "flags": [True, False]}},
+    [1, "two", 3.0, None],
+    {1: "non-str key"},
+]
+
+
+def stdlib_bytes(content):
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+@pytest.fixture(scope="module")
+def recommendation(product_dicts):
+    return build_recommendations(RecommendationRequest(user_profile=PROFILE, product_list=product_dicts))
+
+
+@pytest.fixture
+def without_orjson(monkeypatch):
+    """api.fast_json reloaded as if orjson were not installed (restored afterwards)."""
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    importlib.reload(fast_json)
+    assert fast_json.orjson is None
+    yield fast_json
+    monkeypatch.undo()
+    importlib.reload(fast_json)
+
+
+@pytest.mark.parametrize("content", EDGE_CASES)
+def test_matches_json_dumps(content):
+    assert fast_json.encode_json(content) == stdlib_bytes(content) == JSONResponse(content).body
+
+
+def test_matches_json_dumps_for_recommendations(recommendation):
+    assert fast_json.encode_json(recommendation) == stdlib_bytes(recommendation)
+    assert fast_json.FastJSONResponse(recommendation).body == JSONResponse(recommendation).body
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf")])
+def test_rejects_non_finite_floats(value):
+    with pytest.raises(ValueError):
+        fast_json.encode_json({"score": value})
+
+
+def test_stdlib_fallback_is_byte_identical(without_orjson, recommendation):
+    for content in EDGE_CASES + [recommendation]:
+        assert without_orjson.encode_json(content) == JSONResponse(content).body
@@ -0,0 +1,111 @@
+import sqlite3
+
+import pytest
+
+from api.materialized_scores import MATERIALIZED_PROFILES, MATERIALIZED_TEMPS, materialize_scores
+from api.recommendation import COMPOUND_REGISTRY, DB_PATH
+from conftest import PROFILE
+
+CHANGED_PRODUCT = ("Jack Herer", "hydroponic")
+
+
+def comparable(response):
+    return {**response, "results": [{**r, "warnings": sorted(r["warnings"])} for r in response["results"]]}
+
+
+def catalog(client, temp_f=365, **fields):
+    response = client.post("/api/v1/recommend/catalog", json={
+        "user_profile": {**PROFILE, "interface_temp": temp_f}, **fields,
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+def assert_parity(client, temp_f=365, **fields):
+    """Materialized response equals standard mode apart from its stats; returns the stats."""
+    materialized = catalog(client, temp_f, scoring_mode="materialized", **fields)
+    stats = materialized.pop("materialized")
+    assert comparable(materialized) == comparable(catalog(client, temp_f, **fields))
+    return stats
+
+
+@pytest.fixture(autouse=True)
+def poll_database(monkeypatch):
+    # Notice the catalog edits below without waiting for the registry's poll interval
+    monkeypatch.setattr(COMPOUND_REGISTRY, "_check_interval", 0.0)
+
+
+@pytest.fixture(scope="module")
+def materialized():
+    stats = materialize_scores()
+    yield stats
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.execute("DROP TABLE catalog_scores")
+        conn.execute("DROP TABLE catalog_score_rows")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_falls_back_to_live_scoring_before_first_run(client):
+    stats = assert_parity(client)
+    assert stats == {"temp_bucket_f": 365, "stored": 0, "live": stats["live"]}
+    assert stats["live"] > 0
+
+
+def test_first_run_stores_every_bucket(materialized):
+    assert materialized["recomputed"] == materialized["products"] > 0
+    assert materialized["rows_written"] == \
+        materialized["products"] * len(MATERIALIZED_TEMPS) * len(MATERIALIZED_PROFILES)
+    assert materialize_scores()["recomputed"] == 0
+
+
+@pytest.mark.parametrize("temp_f", [MATERIALIZED_TEMPS[0], 365, MATERIALIZED_TEMPS[-1]])
+def test_matches_live_scoring(client, materialized, temp_f):
+    stats = assert_parity(client, temp_f)
+    assert stats == {"temp_bucket_f": temp_f, "stored": materialized["products"], "live": 0}
+
+
+def test_matches_live_scoring_with_filters(client, materialized):
+    stats = assert_parity(client, grow_styles=["living_soil"], archetypes=["Gas Fuel", "Coma Sedation"])
+    assert stats["stored"] == 2
+
+
+@pytest.mark.parametrize("page_size", [1, 4, 7])
+def test_top_k_pages_match_live_scoring(client, materialized, page_size):
+    cursor, pages = None, 0
+    while True:
+        stats = assert_parity(client, top_k=page_size, cursor=cursor)
+        assert stats["live"] == 0
+        cursor = catalog(client, top_k=page_size, cursor=cursor)["next_cursor"]
+        pages += 1
+        if cursor is None:
+            break
+    assert pages == -(-materialized["products"] // page_size)
+
+
+def test_off_grid_temperature_is_scored_live(client, materialized):
+    stats = assert_parity(client, 365.5)
+    assert stats == {"temp_bucket_f": None, "stored": 0, "live": materialized["products"]}
+
+
+def test_changed_product_is_live_until_refreshed(client, materialized):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        (thc,) = conn.execute("SELECT thc FROM product_catalog WHERE strain_name = ? AND grow_style = ?",
+                              CHANGED_PRODUCT).fetchone()
+        conn.execute("UPDATE product_catalog SET thc = ? WHERE strain_name = ? AND grow_style = ?",
+                     (thc + 9.5, *CHANGED_PRODUCT))
+        conn.commit()
+
+        assert assert_parity(client) == \
+            {"temp_bucket_f": 365, "stored": materialized["products"] - 1, "live": 1}
+        assert materialize_scores()["recomputed"] == 1
+        assert assert_parity(client)["live"] == 0
+    finally:
+        conn.execute("UPDATE product_catalog SET thc = ? WHERE strain_name = ? AND grow_style = ?",
+                     (thc, *CHANGED_PRODUCT))
+        conn.commit()
+        conn.close()
+    assert materialize_scores()["recomputed"] == 1
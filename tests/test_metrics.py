@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+from api.cache import LRUCache
+from api.metrics import (
+    CONTENT_TYPE,
+    PRODUCTS_PER_REQUEST,
+    REQUESTS,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    StageTimings,
+    cache_collector,
+)
+from api.recommendation import RESPONSE_ALIASES, RESPONSE_CACHE
+from conftest import PROFILE
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    RESPONSE_CACHE.clear()
+    RESPONSE_ALIASES.clear()
+
+
+def series(text):
+    """Exposition lines other than comments, as {name{labels}: value}."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = value
+    return samples
+
+
+def test_counter_exposition():
+    counter = Counter("test_total", "Things counted", ("route", "status"))
+    counter.inc(("/b", "200"))
+    counter.inc(("/a", "500"), 2)
+    counter.inc(("/a", "500"))
+    assert counter.render() == [
+        "# HELP test_total Things counted",
+        "# TYPE test_total counter",
+        'test_total{route="/a",status="500"} 3',
+        'test_total{route="/b",status="200"} 1',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("test_total", "Things counted", ("route",))
+    counter.inc(('a"b\\c\nd',))
+    assert counter.render()[-1] == 'test_total{route="a\\"b\\\\c\\nd"} 1'
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Time taken", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, ("s",))
+    assert histogram.render() == [
+        "# HELP test_seconds Time taken",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{stage="s",le="0.1"} 2',
+        'test_seconds_bucket{stage="s",le="1.0"} 3',
+        'test_seconds_bucket{stage="s",le="+Inf"} 4',
+        'test_seconds_sum{stage="s"} 3.65',
+        'test_seconds_count{stage="s"} 4',
+    ]
+    assert histogram.count(("s",)) == 4
+    assert histogram.count(("other",)) == 0
+
+
+def test_unlabelled_histogram():
+    histogram = Histogram("test_items", "Items", (), buckets=(10,))
+    histogram.observe(4)
+    assert series("\n".join(histogram.render())) == {
+        'test_items_bucket{le="10"}': "1", 'test_items_bucket{le="+Inf"}': "1",
+        "test_items_sum": "4.0", "test_items_count": "1",
+    }
+
+
+def test_cache_collector_reads_stats_at_scrape_time():
+    cache = LRUCache(2, name="scratch")
+    collect = cache_collector([cache])
+    assert series("\n".join(collect()))['greenforge_cache_hits_total{cache="scratch"}'] == "0"
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+    for key in "cde":
+        cache.put(key, 1)
+    samples = series("\n".join(collect()))
+    assert samples['greenforge_cache_hits_total{cache="scratch"}'] == "1"
+    assert samples['greenforge_cache_misses_total{cache="scratch"}'] == "1"
+    assert samples['greenforge_cache_evictions_total{cache="scratch"}'] == "2"
+    assert samples['greenforge_cache_hit_ratio{cache="scratch"}'] == "0.5"
+    assert samples['greenforge_cache_entries{cache="scratch"}'] == "2"
+
+
+def test_registry_renders_metrics_then_collectors():
+    registry = MetricsRegistry()
+    registry.register(Counter("test_total", "Things counted")).inc()
+    registry.add_collector(lambda: ["# TYPE extra gauge", "extra 1"])
+    assert registry.render() == ("# HELP test_total Things counted\n# TYPE test_total counter\n"
+                                 "test_total 1\n# TYPE extra gauge\nextra 1\n")
+
+
+def test_nested_stages_are_not_counted_twice():
+    timings = StageTimings()
+    with timings.stage("outer"):
+        timings.add("inner", 0.5)
+    assert timings.seconds["inner"] == 0.5
+    assert timings.seconds["outer"] < 0.5
+
+
+def test_metrics_endpoint(client):
+    client.get("/api/v1/thermal-zones")
+    client.get("/no/such/route")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    samples = series(response.text)
+    assert float(samples['greenforge_http_requests_total{route="/api/v1/thermal-zones",method="GET",status="200"}']) >= 1
+    assert float(samples['greenforge_http_requests_total{route="<unmatched>",method="GET",status="404"}']) >= 1
+    assert any(sample.startswith("greenforge_http_request_duration_seconds_count") for sample in samples)
+    assert 'greenforge_cache_hit_ratio{cache="recommend_responses"}' in samples
+    for family in ("greenforge_engine_stage_duration_seconds", "greenforge_recommend_products"):
+        assert f"# TYPE {family} histogram" in response.text
+
+
+def test_raw_cache_hits_are_recorded(client, product_dicts):
+    raw = json.dumps({"user_profile": PROFILE, "product_list": product_dicts[:12]}).encode()
+    headers = {"content-type": "application/json"}
+    assert client.post("/api/v1/recommend", content=raw, headers=headers).headers["x-cache"] == "MISS"
+    count, total = PRODUCTS_PER_REQUEST.count(), PRODUCTS_PER_REQUEST._series[()][1]
+    hits = REQUESTS.value(("/api/v1/recommend", "POST", "200"))
+
+    assert client.post("/api/v1/recommend", content=raw, headers=headers).headers["x-cache"] == "HIT"
+    assert PRODUCTS_PER_REQUEST.count() == count + 1
+    assert PRODUCTS_PER_REQUEST._series[()][1] == total + 12
+    assert REQUESTS.value(("/api/v1/recommend", "POST", "200")) == hits + 1
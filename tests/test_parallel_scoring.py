@@ -0,0 +1,43 @@
+import pytest
+
+from api.parallel_scoring import ParallelScorer
+from api.recommendation import Condition, Product, calculate_quantum_match, classify_conditions
+from conftest import PROFILE
+
+
+def comparable(analysis):
+    return {**analysis, "warnings": sorted(analysis["warnings"])}
+
+
+@pytest.fixture(scope="module")
+def conditions():
+    return [Condition(**c) for c in PROFILE["conditions"]]
+
+
+def test_parallel_matches_scalar(conditions, product_dicts):
+    products = [Product(**p) for p in product_dicts]
+    # Small chunks and no in-process cutoff, so the worker pool really runs
+    scorer = ParallelScorer(max_workers=2, chunk_size=37, min_products=1)
+    try:
+        actual = scorer.score(conditions, products, 365.0, classify_conditions(conditions))
+    finally:
+        scorer.shutdown()
+    expected = [calculate_quantum_match(conditions, p.compounds, 365.0, p.growStyle) for p in products]
+    assert [comparable(a) for a in actual] == [comparable(a) for a in expected]
+
+
+def test_rejects_non_positive_sizes():
+    with pytest.raises(ValueError):
+        ParallelScorer(max_workers=0)
+    with pytest.raises(ValueError):
+        ParallelScorer(chunk_size=0)
+
+
+def test_recommend_parallel_matches_standard(client, product_dicts):
+    standard, parallel = (
+        client.post("/api/v1/recommend", json={
+            "user_profile": PROFILE, "product_list": product_dicts, "scoring_mode": mode,
+        }).json()["results"]
+        for mode in ("standard", "parallel")
+    )
+    assert [comparable(r) for r in parallel] == [comparable(r) for r in standard]
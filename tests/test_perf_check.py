@@ -0,0 +1,68 @@
+import pytest
+
+from benchmarks.perf_check import MIN_DELTA_S, compare, compare_scenario
+
+MEDIAN_THRESHOLD = 0.15
+P95_THRESHOLD = 0.25
+
+
+def scenario(name, median_s, p95_s):
+    return {"name": name, "median_s": median_s, "p95_s": p95_s, "repeat": 7}
+
+
+def check(current, baseline, min_delta_s=MIN_DELTA_S):
+    return compare_scenario(current, baseline, MEDIAN_THRESHOLD, P95_THRESHOLD, min_delta_s)
+
+
+@pytest.mark.parametrize("median_s, status", [
+    (0.110, "ok"),
+    (0.114, "ok"),
+    (0.116, "regression"),
+    (0.086, "ok"),
+    (0.084, "improved"),
+])
+def test_median_threshold(median_s, status):
+    result = check(scenario("s", median_s, 0.2), scenario("s", 0.1, 0.2))
+    assert result["status"] == status
+    assert result["median_s"]["regressed"] == (status == "regression")
+    assert result["median_s"]["delta"] == round((median_s - 0.1) / 0.1, 4)
+
+
+def test_p95_threshold_is_separate():
+    baseline = scenario("s", 0.1, 0.2)
+    assert check(scenario("s", 0.1, 0.249), baseline)["status"] == "ok"
+    result = check(scenario("s", 0.1, 0.251), baseline)
+    assert result["status"] == "regression"
+    assert result["p95_s"]["regressed"] and not result["median_s"]["regressed"]
+    # A p95 improvement alone is not reported as one
+    assert check(scenario("s", 0.1, 0.1), baseline)["status"] == "ok"
+
+
+def test_small_absolute_slowdowns_are_noise():
+    baseline = scenario("s", 0.0001, 0.0002)
+    assert check(scenario("s", 0.0002, 0.0003), baseline)["status"] == "ok"
+    assert check(scenario("s", 0.0002, 0.0003), baseline, min_delta_s=0.00005)["status"] == "regression"
+    assert check(scenario("s", 0.00001, 0.0002), baseline)["status"] == "ok"
+
+
+def test_zero_baseline_never_regresses():
+    result = check(scenario("s", 0.5, 0.5), scenario("s", 0.0, 0.0))
+    assert result["status"] == "ok"
+    assert result["median_s"]["delta"] is None
+
+
+def test_compare_reports_new_and_missing():
+    baseline = {"scenarios": {"kept": {"median_s": 0.1, "p95_s": 0.2}, "gone": {"median_s": 0.1, "p95_s": 0.2}}}
+    results = {"scenarios": [scenario("kept", 0.2, 0.2), scenario("added", 0.1, 0.1)]}
+    comparisons = compare(results, baseline)
+    assert [(c["name"], c["status"]) for c in comparisons] == [
+        ("kept", "regression"), ("added", "new"), ("gone", "missing")]
+    assert comparisons[0]["median_s"]["threshold"] == MEDIAN_THRESHOLD
+
+
+def test_compare_passes_thresholds_through():
+    baseline = {"scenarios": {"s": {"median_s": 0.1, "p95_s": 0.2}}}
+    results = {"scenarios": [scenario("s", 0.11, 0.2)]}
+    assert compare(results, baseline)[0]["status"] == "ok"
+    assert compare(results, baseline, median_threshold=0.05)[0]["status"] == "regression"
+    assert compare(results, baseline, median_threshold=0.05, min_delta_s=0.02)[0]["status"] == "ok"
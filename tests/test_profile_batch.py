@@ -0,0 +1,60 @@
+from api.profile_batch import BATCH_MAX_PROFILES
+from conftest import PROFILE
+
+PROFILES = [
+    PROFILE,
+    {"interface_temp": 410, "conditions": [{"name": "Insomnia", "severity": 8}]},
+    {"interface_temp": 365, "conditions": [{"name": "Nausea", "severity": 3}]},
+]
+
+
+def recommend(client, body):
+    response = client.post("/api/v1/recommend", json=body)
+    assert response.status_code == 200
+    return response.json()
+
+
+def batch(client, body):
+    response = client.post("/api/v1/recommend/batch", json=body)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_batch_entries_match_recommend(client, product_dicts):
+    body = batch(client, {"user_profiles": PROFILES, "product_list": product_dicts})
+    assert (body["profiles_scored"], body["products_scored"]) == (len(PROFILES), len(product_dicts))
+    assert body["temperatures_compiled"] == 2
+    for profile, entry in zip(PROFILES, body["results"]):
+        assert entry == recommend(client, {"user_profile": profile, "product_list": product_dicts})
+
+
+def test_batch_cursors_page_like_recommend(client, product_dicts):
+    cursors = [None] * len(PROFILES)
+    for _ in range(3):
+        entries = batch(client, {"user_profiles": PROFILES, "product_list": product_dicts,
+                                 "top_k": 40, "cursors": cursors})["results"]
+        for profile, cursor, entry in zip(PROFILES, cursors, entries):
+            assert entry == recommend(client, {"user_profile": profile, "product_list": product_dicts,
+                                               "top_k": 40, "cursor": cursor})
+        cursors = [entry["next_cursor"] for entry in entries]
+        assert all(cursors)
+
+
+def test_batch_reports_per_profile_errors(client, product_dicts):
+    profiles = [PROFILE, {"interface_temp": 365}, PROFILE]
+    entries = batch(client, {"user_profiles": profiles, "product_list": product_dicts[:5],
+                             "top_k": 2, "cursors": [None, None, "garbage"]})["results"]
+    assert entries[0]["results"]
+    assert entries[1] == {"error": "Missing conditions in user_profile", "results": []}
+    assert entries[2] == {"error": "Invalid cursor", "results": []}
+
+
+def test_batch_rejects_misaligned_cursors(client, product_dicts):
+    body = batch(client, {"user_profiles": PROFILES, "product_list": product_dicts, "top_k": 5, "cursors": [None]})
+    assert body == {"error": "cursors must have one entry per user profile", "results": []}
+
+
+def test_batch_rejects_oversized_or_empty_queues(client, product_dicts):
+    too_many = batch(client, {"user_profiles": [PROFILE] * (BATCH_MAX_PROFILES + 1), "product_list": []})
+    assert too_many["error"] == f"Batch exceeds {BATCH_MAX_PROFILES} profiles"
+    assert batch(client, {"user_profiles": [], "product_list": []})["error"] == "Missing user_profiles"
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from api.ranking import TopK, decode_cursor, encode_cursor, score_upper_bound
+from api.recommendation import (
+    THERMAL_LUT,
+    Condition,
+    Product,
+    calculate_quantum_match,
+    classify_conditions,
+    resolve_request_compounds,
+)
+from conftest import PROFILE
+
+
+def comparable(result):
+    return {**result, "warnings": sorted(result["warnings"])}
+
+
+def recommend(client, product_dicts, **fields):
+    return client.post("/api/v1/recommend", json={"user_profile": PROFILE, "product_list": product_dicts, **fields})
+
+
+def test_top_k_keeps_ties_in_input_order():
+    selector = TopK(3)
+    for index, score in enumerate([5.0, 9.0, 5.0, 5.0, 1.0, 9.0]):
+        selector.push(score, index, {"index": index})
+    assert [item["index"] for item in selector.ranked()] == [1, 5, 0]
+    assert len(selector) == 3
+
+
+def test_top_k_after_cursor_skips_earlier_ranks():
+    selector = TopK(10, after=(5.0, 0))
+    for index, score in enumerate([5.0, 9.0, 5.0, 5.0, 1.0]):
+        selector.push(score, index, {"index": index})
+    assert [item["index"] for item in selector.ranked()] == [2, 3, 4]
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor((1.0, 2))[:-2], "WyJhIiwgMV0"])
+def test_decode_rejects_malformed_cursors(cursor):
+    assert decode_cursor(cursor) is None
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor((42.5, 17))) == (42.5, 17)
+
+
+def test_upper_bound_never_below_score(product_dicts):
+    conditions = [Condition(**c) for c in PROFILE["conditions"]]
+    profiles = classify_conditions(conditions)
+    products = [Product(**p) for p in product_dicts]
+    resolve_request_compounds(products)
+    for temp_f in (300.0, 365.0, 430.0):
+        row = THERMAL_LUT.row(temp_f)
+        for product in products:
+            score = calculate_quantum_match(conditions, product.compounds, temp_f, product.growStyle, profiles)["score"]
+            assert score_upper_bound(conditions, product.compounds, product.growStyle, profiles, row) >= score
+
+
+@pytest.mark.parametrize("scoring_mode", ["standard", "vectorized"])
+@pytest.mark.parametrize("page_size", [7, 50])
+def test_cursor_pages_cover_full_ranking(client, product_dicts, scoring_mode, page_size):
+    full = recommend(client, product_dicts, scoring_mode=scoring_mode).json()["results"]
+    paged, cursor = [], None
+    while True:
+        page = recommend(client, product_dicts, scoring_mode=scoring_mode, top_k=page_size, cursor=cursor).json()
+        paged += page["results"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        assert len(page["results"]) == page_size
+    assert [comparable(r) for r in paged] == [comparable(r) for r in full]
+
+
+def test_standard_mode_prunes(client, product_dicts):
+    *_, trailer = recommend(client, product_dicts, stream=True, top_k=3).text.splitlines()
+    assert json.loads(trailer)["summary"]["pruned"] > 0
+
+
+@pytest.mark.parametrize("fields, error", [
+    ({"cursor": encode_cursor((10.0, 3))}, "cursor requires top_k"),
+    ({"top_k": 5, "cursor": "garbage"}, "Invalid cursor"),
+])
+def test_recommend_rejects_bad_cursor(client, product_dicts, fields, error):
+    assert recommend(client, product_dicts, **fields).json() == {"error": error, "results": []}
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+from fastapi import Request
+
+from api.recommendation import COMPOUND_REGISTRY, DB_PATH, RESPONSE_ALIASES, RESPONSE_CACHE, current_signature
+from api.response_cache import REFERENCE_CACHE_CONTROL, ReferenceResponses
+from conftest import PROFILE
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    RESPONSE_CACHE.clear()
+    RESPONSE_ALIASES.clear()
+
+
+@pytest.fixture
+def body(product_dicts):
+    return {"user_profile": PROFILE, "product_list": product_dicts[:40], "top_k": 10}
+
+
+def post(client, payload):
+    raw = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return client.post("/api/v1/recommend", content=raw, headers={"content-type": "application/json"})
+
+
+def test_repeated_body_is_served_from_cache(client, body):
+    first = post(client, body)
+    second = post(client, body)
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+
+
+def test_equivalent_spelling_hits_canonical_key(client, body):
+    first = post(client, body)
+    respelled = {"top_k": 10, "product_list": body["product_list"],
+                 "user_profile": {"conditions": PROFILE["conditions"], "interface_temp": "365.0", "note": "x"}}
+    second = post(client, respelled)
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+    # The new spelling is now a raw alias too
+    assert post(client, respelled).headers["x-cache"] == "HIT"
+
+
+@pytest.mark.parametrize("change", [{"top_k": 9}, {"scoring_mode": "vectorized"}, {"cursor": None, "top_k": None}])
+def test_response_shaping_fields_are_part_of_the_key(client, body, change):
+    post(client, body)
+    assert post(client, {**body, **change}).headers["x-cache"] == "MISS"
+
+
+def test_errors_are_never_cached(client, body):
+    for _ in range(2):
+        assert post(client, {**body, "scoring_mode": "bogus"}).headers["x-cache"] == "MISS"
+    unkeyed = {**body, "user_profile": {"interface_temp": 365}}
+    assert post(client, unkeyed).headers["x-cache"] == "BYPASS"
+
+
+def test_streams_are_not_cached(client, body):
+    post(client, {**body, "stream": True})
+    assert len(RESPONSE_CACHE) == 0
+
+
+def test_database_change_invalidates(client, body, monkeypatch):
+    monkeypatch.setattr(COMPOUND_REGISTRY, "_check_interval", 0.0)
+    post(client, body)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        (bp,) = conn.execute("SELECT boiling_point FROM terpenes WHERE name = 'Myrcene'").fetchone()
+        conn.execute("UPDATE terpenes SET boiling_point = ? WHERE name = 'Myrcene'", (bp + 1,))
+        conn.commit()
+        assert post(client, body).headers["x-cache"] == "MISS"
+    finally:
+        conn.execute("UPDATE terpenes SET boiling_point = ? WHERE name = 'Myrcene'", (bp,))
+        conn.commit()
+        conn.close()
+
+
+def test_signature_is_not_polled_between_checks(monkeypatch):
+    COMPOUND_REGISTRY.refresh(force=True)
+    monkeypatch.setattr(COMPOUND_REGISTRY, "_check_interval", 3600.0)
+    assert not COMPOUND_REGISTRY.refresh_due
+    monkeypatch.setattr(COMPOUND_REGISTRY, "refresh", lambda force=False: pytest.fail("polled"))
+    assert asyncio.run(current_signature()) == COMPOUND_REGISTRY.cached_signature
+
+
+def test_due_signature_is_polled(monkeypatch):
+    monkeypatch.setattr(COMPOUND_REGISTRY, "_check_interval", 0.0)
+    assert COMPOUND_REGISTRY.refresh_due
+    assert asyncio.run(current_signature()) == COMPOUND_REGISTRY.cached_signature is not None
+
+
+@pytest.mark.parametrize("path", ["/api/v1/compounds", "/api/v1/thermal-zones", "/api/v1/strains"])
+def test_reference_body_carries_etag_and_cache_control(client, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == REFERENCE_CACHE_CONTROL
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    second = client.get(path)
+    assert second.headers["etag"] == etag
+    assert second.content == first.content
+
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"stale", {etag}', "*"])
+def test_current_etag_gets_304(client, if_none_match):
+    etag = client.get("/api/v1/compounds").headers["etag"]
+    response = client.get("/api/v1/compounds", headers={"If-None-Match": if_none_match.format(etag=etag)})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == REFERENCE_CACHE_CONTROL
+
+
+def test_stale_etag_gets_full_body(client):
+    response = client.get("/api/v1/compounds", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.json()
+
+
+def test_database_change_moves_reference_etag(client, monkeypatch):
+    monkeypatch.setattr(COMPOUND_REGISTRY, "_check_interval", 0.0)
+    before = client.get("/api/v1/compounds")
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        (bp,) = conn.execute("SELECT boiling_point FROM terpenes WHERE name = 'Myrcene'").fetchone()
+        conn.execute("UPDATE terpenes SET boiling_point = ? WHERE name = 'Myrcene'", (bp + 1,))
+        conn.commit()
+        after = client.get("/api/v1/compounds", headers={"If-None-Match": before.headers["etag"]})
+        assert after.status_code == 200
+        assert after.headers["etag"] != before.headers["etag"]
+        assert after.content != before.content
+    finally:
+        conn.execute("UPDATE terpenes SET boiling_point = ? WHERE name = 'Myrcene'", (bp,))
+        conn.commit()
+        conn.close()
+    # Back to the original data, so back to the original tag
+    assert client.get("/api/v1/compounds").headers["etag"] == before.headers["etag"]
+
+
+def test_unchanged_signature_keeps_stored_body():
+    calls = []
+
+    async def signature():
+        return "v1"
+
+    def build():
+        calls.append(1)
+        return {"items": len(calls)}
+
+    responses = ReferenceResponses(signature)
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+    bodies = [asyncio.run(responses.respond(request, "items", build)).body for _ in range(2)]
+    assert bodies[0] == bodies[1] == b'{"items":1}'
+
+
+def test_error_payloads_are_not_stored():
+    calls = []
+
+    async def signature():
+        return "v1"
+
+    def build():
+        calls.append(1)
+        return {"error": "Database not found"}
+
+    responses = ReferenceResponses(signature)
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+    for _ in range(2):
+        response = asyncio.run(responses.respond(request, "items", build))
+        assert "etag" not in response.headers
+    assert len(calls) == 2
@@ -0,0 +1,145 @@
+import base64
+import json
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from api.db_pool import ConnectionPool
+from api.recommendation import DB_PATH
+from api.strain_search import StrainSearch, build_search_index, decode_search_cursor, encode_search_cursor
+
+
+def table_names(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    finally:
+        conn.close()
+
+
+def file_state(db_path):
+    stat = os.stat(db_path)
+    return stat.st_mtime_ns, stat.st_size, table_names(db_path)
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_api_never_writes_the_database(client):
+    # The seed database has no search tables; serving must not create them
+    before = file_state(DB_PATH)
+    response = client.get("/api/v1/search/strains", params={"q": "og"})
+    assert "not built" in response.json()["error"]
+    assert file_state(DB_PATH) == before
+
+
+@pytest.fixture(scope="module")
+def indexed_db(tmp_path_factory):
+    path = tmp_path_factory.mktemp("search") / "greenforge.db"
+    shutil.copyfile(DB_PATH, path)
+    assert build_search_index(str(path))["rebuilt"]
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def search(indexed_db):
+    pool = ConnectionPool(indexed_db)
+    yield StrainSearch(indexed_db, pool)
+    pool.close_all()
+
+
+def names(page):
+    return [result["strain_name"] for result in page["results"]]
+
+
+def test_offline_build_is_idempotent(indexed_db):
+    assert {"strain_search_names", "strain_search_fts", "strain_search_meta"} <= table_names(indexed_db)
+    assert not build_search_index(indexed_db)["rebuilt"]
+
+
+def test_search_reads_an_offline_index(search):
+    search.refresh()
+    assert search.available and not search.stale
+
+
+def test_stale_index_is_reported(indexed_db, tmp_path):
+    path = str(tmp_path / "stale.db")
+    shutil.copyfile(indexed_db, path)
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE strain_search_meta SET value = 'outdated' WHERE key = 'fingerprint'")
+    conn.commit()
+    conn.close()
+    pool = ConnectionPool(path)
+    search = StrainSearch(path, pool)
+    search.refresh()
+    pool.close_all()
+    assert search.available and search.stale
+
+
+def test_prefix_pages_with_keyset_cursor(search):
+    first = search.search("G", mode="prefix", limit=2)
+    assert names(first) == ["Girl Scout Cookies", "GMO"]
+    second = search.search("G", limit=2, cursor=first["next_cursor"])
+    assert names(second) == ["Granddaddy Purple"]
+    assert second["mode"] == "prefix" and second["next_cursor"] is None
+
+
+def test_auto_falls_back_to_contains_then_fuzzy(search):
+    contains = search.search("diesel")
+    assert (contains["mode"], names(contains)) == ("contains", ["Sour Diesel"])
+    fuzzy = search.search("jak herer")
+    assert fuzzy["mode"] == "fuzzy"
+    assert names(fuzzy)[0] == "Jack Herer"
+    assert fuzzy["results"][0]["similarity"] == 0.9
+
+
+def test_fuzzy_pages_match_single_page(search):
+    full = search.search("dre", mode="fuzzy", limit=100)
+    paged, cursor = [], None
+    while True:
+        page = search.search("dre", mode="fuzzy", limit=1, cursor=cursor)
+        paged += page["results"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert paged == full["results"]
+
+
+@pytest.mark.parametrize("mode, key", [
+    ("prefix", ["gmo"]),
+    ("contains", ["sour diesel"]),
+    ("fuzzy", [0.75, "blue dream"]),
+    ("fuzzy", [1, "acdc"]),
+])
+def test_cursor_round_trip(mode, key):
+    assert decode_search_cursor(encode_search_cursor(mode, key)) == (mode, key)
+
+
+@pytest.mark.parametrize("payload", [
+    ["fuzzy", [1]],
+    ["fuzzy", ["blue dream", 0.75]],
+    ["fuzzy", [True, "gmo"]],
+    ["fuzzy", [0.5, "gmo", "extra"]],
+    ["prefix", [{"a": 1}]],
+    ["prefix", []],
+    ["prefix", ["gmo", "acdc"]],
+    ["contains", [3]],
+    ["contains", "gmo"],
+    ["auto", ["gmo"]],
+    ["prefix"],
+    {"prefix": ["gmo"]},
+])
+def test_malformed_cursor_keys_are_rejected(client, search, payload):
+    cursor = raw_cursor(payload)
+    assert decode_search_cursor(cursor) is None
+    assert search.search("g", cursor=cursor) == {"error": "Invalid cursor", "results": []}
+    response = client.get("/api/v1/search/strains", params={"q": "g", "cursor": cursor})
+    assert response.status_code == 200
+    assert response.json() == {"error": "Invalid cursor", "results": []}
+
+
+def test_garbage_cursor_is_rejected(search):
+    assert search.search("g", cursor="%%%") == {"error": "Invalid cursor", "results": []}
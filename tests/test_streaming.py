@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+import api.streaming as streaming
+from api.recommendation import NDJSON_MEDIA_TYPE
+from conftest import PROFILE
+
+
+def comparable(result):
+    return {**result, "warnings": sorted(result["warnings"])}
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Several chunks (and a short last one) for the 204 test products
+    monkeypatch.setattr(streaming, "STREAM_CHUNK_SIZE", 37)
+
+
+def recommend(client, product_dicts, **fields):
+    return client.post("/api/v1/recommend", json={"user_profile": PROFILE, "product_list": product_dicts, **fields})
+
+
+def ndjson_lines(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+    assert response.text.endswith("\n")
+    return [json.loads(line) for line in response.text.split("\n")[:-1]]
+
+
+@pytest.mark.parametrize("scoring_mode", ["standard", "vectorized"])
+def test_stream_writes_every_product_in_input_order(client, product_dicts, scoring_mode):
+    records = ndjson_lines(recommend(client, product_dicts, stream=True, scoring_mode=scoring_mode))
+    *results, trailer = records
+    assert [r["product"] for r in results] == [p["name"] for p in product_dicts]
+
+    body = recommend(client, product_dicts, scoring_mode=scoring_mode).json()
+    # Stable sort of the unranked stream reproduces the full ranking, ties included
+    ranked = sorted(results, key=lambda r: r["matchScore"], reverse=True)
+    assert [comparable(r) for r in ranked] == [comparable(r) for r in body["results"]]
+
+    summary = trailer["summary"]
+    assert summary == {
+        **{key: value for key, value in body.items() if key != "results"},
+        "products_scored": len(product_dicts),
+        "results_emitted": len(product_dicts),
+        "ranked": False,
+        "top_k": None,
+        "next_cursor": None,
+        "pruned": 0,
+    }
+
+
+@pytest.mark.parametrize("top_k", [1, 10, 500])
+def test_stream_top_k_matches_ranked_response(client, product_dicts, top_k):
+    *results, trailer = ndjson_lines(recommend(client, product_dicts, stream=True, top_k=top_k))
+    expected = recommend(client, product_dicts, top_k=top_k).json()
+    assert [comparable(r) for r in results] == [comparable(r) for r in expected["results"]]
+    assert trailer["summary"]["next_cursor"] == expected["next_cursor"]
+    assert trailer["summary"]["ranked"] is True
+    assert trailer["summary"]["results_emitted"] == min(top_k, len(product_dicts))
+
+
+def test_stream_without_summary(client, product_dicts):
+    records = ndjson_lines(recommend(client, product_dicts[:5], stream=True, include_summary=False))
+    assert [r["product"] for r in records] == [p["name"] for p in product_dicts[:5]]
+    assert all("summary" not in r for r in records)
+
+
+def test_stream_of_no_products_is_only_the_summary(client):
+    records = ndjson_lines(recommend(client, [], stream=True, top_k=3))
+    assert len(records) == 1
+    assert records[0]["summary"]["results_emitted"] == 0
+
+
+@pytest.mark.parametrize("fields, error", [
+    ({"top_k": 0}, "top_k must be positive"),
+    ({"scoring_mode": "quantum"}, "Unknown scoring_mode 'quantum'"),
+])
+def test_stream_rejects_invalid_request_before_streaming(client, product_dicts, fields, error):
+    response = recommend(client, product_dicts, stream=True, **fields)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json() == {"error": error, "results": []}
+
+
+@pytest.mark.parametrize("scoring_mode", ["standard", "vectorized"])
+@pytest.mark.parametrize("top_k", [1, 7, 300])
+def test_top_k_is_prefix_of_full_ranking(client, product_dicts, scoring_mode, top_k):
+    full = recommend(client, product_dicts, scoring_mode=scoring_mode).json()
+    page = recommend(client, product_dicts, scoring_mode=scoring_mode, top_k=top_k).json()
+    assert [comparable(r) for r in page["results"]] == [comparable(r) for r in full["results"][:top_k]]
+    assert {k: v for k, v in page.items() if k not in ("results", "next_cursor")} == \
+        {k: v for k, v in full.items() if k != "results"}
+
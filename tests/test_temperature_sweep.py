@@ -0,0 +1,132 @@
+import json
+
+import pytest
+
+from api.recommendation import (
+    Condition,
+    Product,
+    calculate_quantum_match,
+    get_compound_data,
+    get_thermal_safety_zone,
+)
+from api.temperature_sweep import SAFETY_RISK_LEVELS, SWEEP_MAX_POINTS, sweep_temperatures
+from api.thermal_lut import DEGRADATION_START_OFFSET_F, VOLATILIZATION_GRADIENT_F
+from conftest import PROFILE
+
+CONDITIONS = [Condition(**c) for c in PROFILE["conditions"]]
+
+
+def sweep(client, products, **fields):
+    # json.dumps writes NaN/Infinity literals, which the request parser accepts
+    response = client.post("/api/v1/recommend/temperature-sweep", content=json.dumps({
+        "user_profile": {"conditions": PROFILE["conditions"]}, "product_list": products, **fields,
+    }), headers={"content-type": "application/json"})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture(scope="module")
+def sample(product_dicts):
+    # Every 10th generated product plus the edge cases
+    return product_dicts[:200:10] + product_dicts[200:]
+
+
+@pytest.mark.parametrize("fields", [
+    {},
+    {"min_temp_f": 330, "max_temp_f": 420, "step_f": 0.7},
+    {"min_temp_f": 380.25, "max_temp_f": 381, "step_f": 0.25},
+])
+def test_curve_matches_per_temperature_engine(client, sample, fields):
+    body = sweep(client, sample, **fields)
+    for product, result in zip(sample, body["results"]):
+        model = Product(**product)
+        for point in result["curve"]:
+            expected = calculate_quantum_match(CONDITIONS, model.compounds, point["temp_f"], model.growStyle)
+            assert point["score"] == expected["score"], (product["name"], point["temp_f"])
+            assert point["risk"] == expected["safety_zone"]["risk"]
+
+
+@pytest.mark.parametrize("max_risk", SAFETY_RISK_LEVELS)
+def test_optimum_is_best_allowed_point(client, sample, max_risk):
+    body = sweep(client, sample, step_f=2.5, max_risk=max_risk.lower())
+    allowed = SAFETY_RISK_LEVELS[:SAFETY_RISK_LEVELS.index(max_risk) + 1]
+    assert body["max_risk"] == max_risk
+    for result in body["results"]:
+        candidates = [p for p in result["curve"] if p["risk"] in allowed]
+        best = max(p["score"] for p in candidates)
+        # Ties go to the lowest temperature
+        first = next(p for p in candidates if p["score"] == best)
+        optimal = result["optimal"]
+        assert (optimal["temp_f"], optimal["score"]) == (first["temp_f"], best)
+        assert optimal["safety_zone"] == get_thermal_safety_zone(first["temp_f"])
+
+
+def test_no_optimum_when_range_is_too_risky(client, sample):
+    body = sweep(client, sample[:2], min_temp_f=450, max_temp_f=500, max_risk="LOW")
+    assert [r["optimal"] for r in body["results"]] == [None, None]
+
+
+def test_state_changes_for_humulene(client):
+    product = {"name": "Humulene", "growStyle": "indoor", "compounds": [{"name": "Humulene", "val": 1.0}]}
+    bp = get_compound_data("Humulene")["boiling_point_f"]
+    body = sweep(client, [product])
+    assert body["results"][0]["state_changes"] == [
+        {"compound": "Humulene", "temp_f": bp - VOLATILIZATION_GRADIENT_F, "from": "locked", "to": "partially_active"},
+        {"compound": "Humulene", "temp_f": bp, "from": "partially_active", "to": "fully_active"},
+        {"compound": "Humulene", "temp_f": bp + DEGRADATION_START_OFFSET_F, "from": "fully_active", "to": "degrading"},
+    ]
+    # Only changes inside the swept range; degradation must also start below its top
+    narrow = sweep(client, [product], min_temp_f=bp - 5, max_temp_f=bp + DEGRADATION_START_OFFSET_F)
+    assert [c["to"] for c in narrow["results"][0]["state_changes"]] == ["fully_active"]
+
+
+def test_state_changes_skip_unknown_and_repeated_compounds(client):
+    products = [
+        {"name": "Unknown", "growStyle": "indoor", "compounds": [{"name": "Testerpene", "val": 1.0}]},
+        {"name": "Repeated", "growStyle": "indoor",
+         "compounds": [{"name": "Humulene", "val": 1.0}, {"name": "humulene", "val": 0.5}]},
+    ]
+    body = sweep(client, products)
+    assert body["results"][0]["state_changes"] == []
+    assert [c["compound"] for c in body["results"][1]["state_changes"]] == ["Humulene"] * 3
+
+
+@pytest.mark.parametrize("low, high, step, expected", [
+    (365, 365, 5, [365.0]),
+    (300, 310, 5, [300.0, 305.0, 310.0]),
+    (300, 311, 5, [300.0, 305.0, 310.0]),
+    (300, 300.3, 0.1, [300.0, 300.1, 300.2, 300.3]),
+    (400, 401, 0.3, [400.0, 400.3, 400.6, 400.9]),
+])
+def test_sweep_points(low, high, step, expected):
+    assert sweep_temperatures(low, high, step) == expected
+
+
+def test_largest_allowed_sweep(client):
+    product = {"name": "THC", "growStyle": "indoor", "compounds": [{"name": "THC", "val": 20.0}]}
+    body = sweep(client, [product], min_temp_f=300, max_temp_f=500, step_f=0.1)
+    assert body["temperatures_evaluated"] == SWEEP_MAX_POINTS
+    assert (body["min_temp_f"], body["max_temp_f"]) == (300.0, 500.0)
+
+
+@pytest.mark.parametrize("fields, error", [
+    ({"step_f": 0}, "step_f must be positive"),
+    ({"step_f": -5}, "step_f must be positive"),
+    ({"min_temp_f": 400, "max_temp_f": 350}, "min_temp_f must not exceed max_temp_f"),
+    ({"step_f": 0.09}, f"Sweep exceeds {SWEEP_MAX_POINTS} temperatures"),
+    ({"min_temp_f": -1e308, "max_temp_f": 1e308}, f"Sweep exceeds {SWEEP_MAX_POINTS} temperatures"),
+    ({"max_risk": "EXTREME"}, "Unknown max_risk 'EXTREME'"),
+    ({"min_temp_f": float("nan")}, "min_temp_f, max_temp_f and step_f must be finite"),
+    ({"max_temp_f": float("inf")}, "min_temp_f, max_temp_f and step_f must be finite"),
+    ({"min_temp_f": float("-inf")}, "min_temp_f, max_temp_f and step_f must be finite"),
+    ({"step_f": float("inf")}, "min_temp_f, max_temp_f and step_f must be finite"),
+    ({"step_f": float("nan")}, "min_temp_f, max_temp_f and step_f must be finite"),
+])
+def test_rejects_unusable_ranges(client, sample, fields, error):
+    assert sweep(client, sample[:1], **fields) == {"error": error, "results": []}
+
+
+def test_rejects_missing_conditions(client, sample):
+    response = client.post("/api/v1/recommend/temperature-sweep",
+                           json={"user_profile": {}, "product_list": sample[:1]})
+    assert response.json() == {"error": "Missing conditions in user_profile", "results": []}